@@ -0,0 +1,212 @@
+"""Benchmark of the getters against simulated devices of 8, 64 and 512 ports.
+
+Each device has as many flows as ports, and 4 MAC forwarding entries per flow.
+For every getter it records the wall time, the CPU time spent parsing, the
+exchanges with the device and the peak memory allocated, see measure.
+
+Run from the repository root:
+
+    python benchmarks/bench_getters.py                  # print the results
+    python benchmarks/bench_getters.py --update         # write the baseline
+    python benchmarks/bench_getters.py --check          # fail on regressions
+
+--latency adds a delay to every exchange, to see the share of the round trips.
+--replay DIR runs the getters against a recording of a real device instead, see
+napalm_adva/utils/recording.py, with its timings divided by --speed.
+--check fails when round trips increase at all, when the peak memory grows beyond
+--threshold and the parse CPU beyond --cpu-threshold times the baseline. CPU time
+varies by half between runs on a busy machine, so its threshold is wide, to only
+catch parsing gone wrong. Wall times of a few milliseconds are noise, they are
+printed but never fail the check.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from napalm_adva import AdvaDriver  # noqa: E402
+from napalm_adva.simulator import SyntheticDevice  # noqa: E402
+from napalm_adva.simulator.connection import SimulatedConnection  # noqa: E402
+from napalm_adva.utils import textfsm_cache  # noqa: E402
+from napalm_adva.utils.recording import ReplayConnection  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_getters.json")
+
+SCALES = (8, 64, 512)
+
+GETTERS = (
+    "get_facts",
+    "get_interfaces",
+    "get_interfaces_ip",
+    "get_interfaces_vlans",
+    "get_vlans",
+    "get_lldp_neighbors",
+    "get_static_routes",
+    "get_mac_address_table",
+    "get_config",
+    "get_snapshot",
+)
+
+# Time differences below this many seconds are noise, never regressions
+MIN_DELTA = 0.005
+
+
+def _driver(connect):
+    driver = AdvaDriver("bench", "admin", "pwd")
+    driver.device = connect()
+    parse = driver._parse
+    driver.parse_cpu = 0.0
+
+    def timed_parse(template_name, raw_text):
+        start = time.process_time()
+        try:
+            return parse(template_name, raw_text)
+        finally:
+            driver.parse_cpu += time.process_time() - start
+
+    driver._parse = timed_parse
+    return driver
+
+
+def measure(connect, getter, repeat=3):
+    """Run getter on a new driver for each connection from connect, returns its metrics
+
+    wall_time and parse_cpu are the best of repeat runs, after a warm up run.
+    peak_memory is measured in a separate run, as tracemalloc slows everything down.
+    """
+    getattr(_driver(connect), getter)()
+
+    wall_time = parse_cpu = float("inf")
+    for _ in range(repeat):
+        driver = _driver(connect)
+        start = time.perf_counter()
+        getattr(driver, getter)()
+        wall_time = min(wall_time, time.perf_counter() - start)
+        parse_cpu = min(parse_cpu, driver.parse_cpu)
+
+    driver = _driver(connect)
+    tracemalloc.start()
+    try:
+        getattr(driver, getter)()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_time": round(wall_time, 6),
+        "parse_cpu": round(parse_cpu, 6),
+        "round_trips": driver.round_trips,
+        "peak_memory": peak_memory,
+    }
+
+
+def run(scales=SCALES, getters=GETTERS, latency=0, repeat=3):
+    """Returns {scale: {getter: metrics}}, scales as strings like in the baseline"""
+    textfsm_cache.warm_templates()
+    results = {}
+    for scale in scales:
+        device = SyntheticDevice(ports=scale, flows=scale, fwd_entries=4 * scale)
+        results[str(scale)] = {
+            getter: measure(lambda: SimulatedConnection(device, latency), getter, repeat)
+            for getter in getters
+        }
+    return results
+
+
+def run_replay(directory, getters=GETTERS, speed=None, repeat=3):
+    """Returns {"replay": {getter: metrics}} for the getters found in the recording"""
+    textfsm_cache.warm_templates()
+    results = {}
+    for getter in getters:
+        try:
+            results[getter] = measure(lambda: ReplayConnection(directory, speed), getter, repeat)
+        except IOError as e:
+            print(f"Skipping {getter}: {e}")
+    return {"replay": results}
+
+
+def regressions(results, baseline, threshold, cpu_threshold=3.0):
+    """Returns a line for every metric of results worse than baseline
+
+    Round trips regress when they increase, peak memory when it grows beyond
+    threshold times the baseline, and parse CPU beyond cpu_threshold times the
+    baseline. Wall time is not compared.
+    """
+    found = []
+    for scale, getters in results.items():
+        for getter, metrics in getters.items():
+            expected = baseline.get(scale, {}).get(getter)
+            if expected is None:
+                continue
+            for name, value in metrics.items():
+                limit = expected[name]
+                if name == "round_trips":
+                    regressed = value > limit
+                elif name == "peak_memory":
+                    regressed = value > limit * threshold
+                elif name == "parse_cpu":
+                    regressed = value > limit * cpu_threshold and value - limit > MIN_DELTA
+                else:
+                    regressed = False
+                if regressed:
+                    found.append(f"{getter} at {scale} ports: {name} {value} > {limit}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--getters", nargs="+", default=GETTERS)
+    parser.add_argument("--latency", type=float, default=0, help="seconds per exchange")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=1.5, help="of the peak memory")
+    parser.add_argument("--cpu-threshold", type=float, default=3.0, help="of the parse CPU")
+    parser.add_argument("--replay", help="directory of a recording")
+    parser.add_argument("--speed", type=float, default=None, help="replay speed up")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--update", action="store_true", help="write the results as baseline")
+    mode.add_argument("--check", action="store_true", help="fail on regressions")
+    args = parser.parse_args()
+
+    if args.replay:
+        results = run_replay(args.replay, args.getters, args.speed, args.repeat)
+    else:
+        results = run(args.scales, args.getters, args.latency, args.repeat)
+
+    print(
+        f"{'getter':<24} {'ports':>5} {'wall (ms)':>10} {'parse (ms)':>10} "
+        f"{'round trips':>11} {'peak (KiB)':>10}"
+    )
+    for scale, getters in results.items():
+        for getter, metrics in getters.items():
+            print(
+                f"{getter:<24} {scale:>5} {metrics['wall_time'] * 1e3:>10.2f} "
+                f"{metrics['parse_cpu'] * 1e3:>10.2f} {metrics['round_trips']:>11} "
+                f"{metrics['peak_memory'] / 1024:>10.1f}"
+            )
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {args.baseline}")
+
+    elif args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.threshold, args.cpu_threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
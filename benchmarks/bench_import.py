@@ -0,0 +1,106 @@
+"""Cold start benchmark, from importing the driver to the first get_facts.
+
+Every run is a fresh interpreter started with -X importtime, after a warm up run
+that writes the bytecode, as installing the package does. It reports the time
+to import AdvaDriver, the part of it spent in napalm_adva's own modules, the time
+from creating the driver to the result of the first get_facts against an
+in-process simulated device, and which config push dependencies got loaded.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget 10  # fails when own imports take longer
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed to change the config, must not be loaded by getters
+LAZY_MODULES = ("tftpy", "napalm_adva.utils.tftp")
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from napalm_adva import AdvaDriver
+imported = time.perf_counter()
+
+from napalm_adva.simulator import SyntheticDevice
+from napalm_adva.simulator.connection import SimulatedConnection
+device = SyntheticDevice()
+
+started = time.perf_counter()
+driver = AdvaDriver("bench", "admin", "pwd")
+driver.device = SimulatedConnection(device)
+driver.get_facts()
+done = time.perf_counter()
+
+print(imported - start, done - started)
+print(" ".join(m for m in %r if m in sys.modules))
+""" % (LAZY_MODULES,)
+
+
+def _own_import_time(importtime):
+    """Seconds spent in napalm_adva modules themselves, from -X importtime output"""
+    total = 0
+    for line in importtime.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name == "napalm_adva" or name.startswith("napalm_adva."):
+            if not name.startswith("napalm_adva.simulator"):
+                total += int(self_us)
+    return total / 1e6
+
+
+def run_once():
+    """Returns (import seconds, own import seconds, first get_facts seconds, lazy loaded)"""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times, loaded = (result.stdout.splitlines() + [""])[:2]
+    import_time, get_facts_time = (float(t) for t in times.split())
+    return import_time, _own_import_time(result.stderr), get_facts_time, loaded.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, help="milliseconds for the own imports")
+    args = parser.parse_args()
+
+    run_once()
+    runs = [run_once() for _ in range(args.runs)]
+    import_time = statistics.median(r[0] for r in runs)
+    own_time = statistics.median(r[1] for r in runs)
+    get_facts_time = statistics.median(r[2] for r in runs)
+    loaded = sorted({m for r in runs for m in r[3]})
+
+    print(f"{'import AdvaDriver (ms)':<28} {import_time * 1e3:>8.1f}")
+    print(f"{'  napalm_adva modules (ms)':<28} {own_time * 1e3:>8.1f}")
+    print(f"{'first get_facts (ms)':<28} {get_facts_time * 1e3:>8.1f}")
+    print(f"{'config push modules loaded':<28} {', '.join(loaded) or 'none':>8}")
+
+    failed = False
+    if loaded:
+        print("REGRESSION config push modules loaded by get_facts: " + ", ".join(loaded))
+        failed = True
+    if args.budget is not None and own_time * 1e3 > args.budget:
+        print(f"REGRESSION napalm_adva imports take {own_time * 1e3:.1f} > {args.budget} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
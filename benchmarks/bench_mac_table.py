@@ -0,0 +1,52 @@
+"""Memory benchmark of the compact MAC address table against a list of dicts.
+
+Run from the repository root:
+
+    python benchmarks/bench_mac_table.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from napalm_adva.utils.mac_table import MacTable, int_to_mac  # noqa: E402
+
+
+def _entries(count):
+    """Entries as get_mac_address_table builds them, over 64 access ports"""
+    for i in range(count):
+        yield {
+            "mac": int_to_mac(0x84C807000000 + i),
+            "interface": "access-1-1-1-%d" % (i % 64 + 3),
+            "vlan": -1,
+            "static": i % 10 == 0,
+            "active": True,
+            "moves": -1,
+            "last_move": -1.0,
+        }
+
+
+def _measure(build, count):
+    """Return the result of build and the bytes it holds"""
+    tracemalloc.start()
+    result = build(_entries(count))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(count=100000):
+    dicts, dicts_size = _measure(list, count)
+    table, table_size = _measure(MacTable.from_dicts, count)
+    assert table.to_dicts() == dicts
+
+    print(f"{'format':<16} {'entries':>8} {'memory (MB)':>12} {'bytes/entry':>12}")
+    for name, size in (("list of dicts", dicts_size), ("MacTable", table_size)):
+        print(f"{name:<16} {count:>8} {size / 1e6:>12.1f} {size / count:>12.0f}")
+    print(f"MacTable uses {dicts_size / table_size:.0f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark of netmiko timing reads against the prompt-driven reads of the driver.
+
+Both read the output of the same commands from the simulator over SSH. A timing
+read waits for the output to go quiet, the prompt-driven read returns as soon as
+the prompt appears, see AdvaDriver._read.
+
+Run from the repository root:
+
+    python benchmarks/bench_reads.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from napalm_adva import AdvaDriver  # noqa: E402
+from napalm_adva.simulator import AdvaSimulator, SyntheticDevice  # noqa: E402
+
+COMMANDS = (
+    "show system",
+    "show ports",
+    "show access-port access-1-1-1-3",
+    "show running-config delta",
+)
+
+
+def _best(read, command, number):
+    best = float("inf")
+    for _ in range(number):
+        start = time.perf_counter()
+        read(command)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(number=5, ports=64):
+    with AdvaSimulator(SyntheticDevice(ports=ports)) as simulator:
+        driver = AdvaDriver(
+            "127.0.0.1", "admin", "pwd", optional_args={"port": simulator.port}
+        )
+        driver.open()
+        try:
+            print(f"{'command':<34} {'timing (ms)':>12} {'prompt (ms)':>12} {'speedup':>8}")
+            for command in COMMANDS:
+                timing = _best(driver.device.send_command_timing, command, number)
+                prompt = _best(driver._read, command, number)
+                print(
+                    f"{command:<34} {timing * 1e3:>12.1f} {prompt * 1e3:>12.1f} "
+                    f"{timing / prompt:>7.1f}x"
+                )
+        finally:
+            driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Micro-benchmark of template parsing.
+
+Compares napalm textfsm_extractor, the compiled template cache and, where there
+is one, the native parser.
+
+Run from the repository root:
+
+    python benchmarks/bench_textfsm.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from napalm.base.helpers import textfsm_extractor as napalm_textfsm_extractor  # noqa: E402
+
+from napalm_adva import AdvaDriver  # noqa: E402
+from napalm_adva.utils import native_parser, textfsm_cache  # noqa: E402
+
+MOCKED_DATA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test", "unit", "mocked_data"
+)
+
+CASES = [
+    ("show_port_details", "test_get_interfaces/default/show_access_port_access_1_1_1_3.txt"),
+    ("show_system", "test_get_facts/default/show_system.txt"),
+    ("show_shelf_info", "test_get_facts/default/show_shelf_info.txt"),
+    ("show_flow", "test_get_vlans/default/show_flow_flow_1_1_1_3_1.txt"),
+    ("show_ports", "test_get_interfaces/default/show_ports.txt"),
+    ("list_fwd_entries", "test_get_mac_address_table/default/list_fwd_entries.txt"),
+]
+
+
+def main(number=2000):
+    driver = AdvaDriver("bench", "admin", "pwd")
+    textfsm_cache.warm_templates()
+
+    print(
+        f"{'template':<20} {'napalm (us)':>12} {'cached (us)':>12} {'speedup':>8} "
+        f"{'native (us)':>12} {'speedup':>8}"
+    )
+    for template_name, filename in CASES:
+        with open(os.path.join(MOCKED_DATA, filename)) as f:
+            raw_text = f.read()
+
+        assert napalm_textfsm_extractor(
+            driver, template_name, raw_text
+        ) == textfsm_cache.textfsm_extractor(driver, template_name, raw_text)
+
+        napalm_time = timeit.timeit(
+            lambda: napalm_textfsm_extractor(driver, template_name, raw_text), number=number
+        )
+        cached_time = timeit.timeit(
+            lambda: textfsm_cache.textfsm_extractor(driver, template_name, raw_text),
+            number=number,
+        )
+        line = (
+            f"{template_name:<20} {napalm_time / number * 1e6:>12.1f} "
+            f"{cached_time / number * 1e6:>12.1f} {napalm_time / cached_time:>7.1f}x"
+        )
+
+        if native_parser.supports(template_name):
+            native_time = timeit.timeit(
+                lambda: native_parser.parse_labels(template_name, raw_text), number=number
+            )
+            line += (
+                f" {native_time / number * 1e6:>12.1f} {napalm_time / native_time:>7.1f}x"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
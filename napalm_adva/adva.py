@@ -24,27 +24,168 @@ import ipaddress
 import difflib
 from threading import Thread
 import socket
-import time
-import io
 import re
 import logging
+import time
 
 from napalm.base import NetworkDriver
-from napalm.base.helpers import textfsm_extractor
 from napalm.base.exceptions import (
     ConnectionException,
     SessionLockedException,
     MergeConfigException,
     ReplaceConfigException,
     CommandErrorException,
+    CommandTimeoutException,
 )
 
 from netmiko import ConnectHandler
-import tftpy
+from netmiko.exceptions import ReadTimeout
+
+from napalm_adva.utils import (
+    cli_context,
+    config_parser,
+    connection_pool,
+    metrics,
+    native_parser,
+    recording,
+    snapshot,
+    transport,
+)
+from napalm_adva.utils.command_cache import CommandCache
+from napalm_adva.utils.mac_table import MacTable
+from napalm_adva.utils.mac_tracker import MacTracker
+from napalm_adva.utils.read_timeouts import ReadTimeouts
+from napalm_adva.utils.textfsm_cache import textfsm_extractor
 
 logger = logging.getLogger(__name__)
 logging.getLogger("tftpy.TftpServer").setLevel(logging.ERROR)
 
+# Printed before the output of show running-config, while the device generates it
+CONFIG_BANNER = "Preparing configuration file..."
+
+# Seconds get_interfaces and get_sfp_inventory share the port details by default,
+# long enough for the getters of one poll, short enough for polling every minute
+PORT_DETAILS_TTL = 10
+
+# optional_args consumed by the driver itself, everything else goes to netmiko
+DRIVER_OPTIONAL_ARGS = (
+    "batch_port_details",
+    "candidate_transport",
+    "command_cache",
+    "connection_pool",
+    "inband_max_bytes",
+    "mac_tracking",
+    "metrics",
+    "parser",
+    "port_details_ttl",
+    "read_timeouts",
+    "record",
+    "shared_tftp",
+    "skip_noop_commits",
+    "tftp_address",
+    "tftp_listen_address",
+    "tftp_listen_port",
+    "transfer_timeout",
+)
+
+SHOW_PORTS = (cli_context.HOME, "show ports")
+FLOW_PARTITION = (cli_context.HOME, "show running-config delta partition flow")
+MGMTTNL_PARTITION = (cli_context.HOME, "show running-config delta partition mgmttnl")
+
+# Commands per pipelined write of get_snapshot, a large device is not sent hundreds at once
+SNAPSHOT_BATCH_SIZE = 64
+
+# Per-port details, get_snapshot only pipelines them with batch_port_details
+PORT_DETAIL_COMMANDS = ("show network-port ", "show access-port ")
+
+# Getters get_snapshot runs by default, the ones usually polled together
+SNAPSHOT_GETTERS = (
+    "get_facts",
+    "get_interfaces",
+    "get_interfaces_ip",
+    "get_interfaces_vlans",
+    "get_vlans",
+    "get_lldp_neighbors",
+)
+
+# (context, command) outputs each getter reads, see get_snapshot
+SNAPSHOT_COMMANDS = {
+    "get_facts": (
+        (cli_context.HOME, "show system"),
+        SHOW_PORTS,
+        (cli_context.NETWORK_ELEMENT, "show shelf-info"),
+    ),
+    "get_interfaces": (SHOW_PORTS,),
+    "get_sfp_inventory": (SHOW_PORTS,),
+    "get_interfaces_ip": (MGMTTNL_PARTITION,),
+    "get_interfaces_vlans": (SHOW_PORTS, FLOW_PARTITION, MGMTTNL_PARTITION),
+    "get_vlans": (FLOW_PARTITION, MGMTTNL_PARTITION),
+    "get_lldp_neighbors": ((cli_context.HOME, "show lldp detail"),),
+    "get_static_routes": ((cli_context.HOME, "show ip-routes"),),
+    "get_config": ((cli_context.HOME, "show running-config delta"),),
+}
+
+# Method returning the further outputs a getter reads, from its SNAPSHOT_COMMANDS outputs
+SNAPSHOT_FOLLOWUPS = {
+    "get_interfaces": "_port_detail_followups",
+    "get_sfp_inventory": "_port_detail_followups",
+    "get_interfaces_vlans": "_flow_followups",
+    "get_vlans": "_flow_followups",
+}
+
+
+def _strip_banner(output):
+    """Remove CONFIG_BANNER and the blank lines after it from the start of output"""
+    stripped = output.lstrip()
+    if stripped.startswith(CONFIG_BANNER):
+        return stripped[len(CONFIG_BANNER):].lstrip("\r\n")
+    return output
+
+
+def _as_set(value):
+    """None, a single name or a collection of names as None or a set"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def _port_may_match(port, ports, flows):
+    """Whether access port can hold an entry allowed by the port and flow filters
+
+    Flows are named after their access port, flow-1-1-1-3-1 is on access-1-1-1-3.
+    """
+    if ports is not None and port not in ports:
+        return False
+    if flows is not None:
+        prefix = "flow-%s-" % port.split("-", 1)[-1]
+        return any(not f.startswith("flow-") or f.startswith(prefix) for f in flows)
+    return True
+
+
+def _not_available(value):
+    return value in ("", "Not Available", "N/A")
+
+
+def _available(value):
+    """value, or "" when the device shows it as not available"""
+    return "" if _not_available(value) else value
+
+
+def _as_int(value):
+    """value as an int, -1 when it is not a number"""
+    return int(value) if value.isdigit() else -1
+
+
+def _mac_entry_matches(entry, mac_prefix=None, static=None):
+    if mac_prefix is not None and not entry["mac"].lower().startswith(mac_prefix.lower()):
+        return False
+    if static is not None and entry["static"] != static:
+        return False
+    return True
+
+
 class AdvaDriver(NetworkDriver):
     """Napalm driver for Adva."""
 
@@ -63,12 +204,118 @@ class AdvaDriver(NetworkDriver):
             optional_args = {}
         self.optional_args = optional_args
 
+        # Send all per-port detail commands in one pipelined exchange
+        self.batch_port_details = optional_args.get("batch_port_details", False)
+
+        # Number of exchanges with the device, see send_command/send_command_batch
+        self.round_trips = 0
+        # Outputs read ahead by get_snapshot, by (context, command)
+        self._snapshot = None
+
+        # Cache of command output, enabled with True or a dict of CommandCache arguments
+        command_cache = optional_args.get("command_cache")
+        if command_cache:
+            if command_cache is True:
+                command_cache = {}
+            self.command_cache = CommandCache(**command_cache)
+        else:
+            self.command_cache = None
+
+        # Reuse SSH sessions across open/close, True or a dict of ConnectionPool arguments
+        pool = optional_args.get("connection_pool")
+        if pool:
+            if pool is True:
+                pool = {}
+            self.connection_pool = connection_pool.get_pool(**pool)
+        else:
+            self.connection_pool = None
+
+        # "native" parses Label : value outputs without TextFSM, see utils/native_parser.py
+        self.parser = optional_args.get("parser", "textfsm")
+        if self.parser not in ("textfsm", "native"):
+            raise ValueError("parser must be textfsm or native, not %s" % self.parser)
+
+        # Track the MAC address table between polls, True or a dict of MacTracker arguments
+        mac_tracking = optional_args.get("mac_tracking")
+        if mac_tracking:
+            if mac_tracking is True:
+                mac_tracking = {}
+            self.mac_tracker = MacTracker(**mac_tracking)
+        else:
+            self.mac_tracker = None
+        # Seconds the parsed port details are shared between getters, 0 to read them each time
+        self.port_details_ttl = optional_args.get("port_details_ttl", PORT_DETAILS_TTL)
+        # (expiry, port details) of the last port details read
+        self._port_details = None
+
+        # Seconds to wait for the prompt per command, a dict of ReadTimeouts arguments
+        self.read_timeouts = ReadTimeouts(**optional_args.get("read_timeouts", {}))
+
+        # CLI context the session is in, see utils/cli_context.py
+        self._cli_context = cli_context.HOME
+        # Whether the driver moved the CLI there, rather than commands without a context
+        self._driver_context = False
+
+        # Seconds to wait for the device to download a candidate
+        self.transfer_timeout = optional_args.get("transfer_timeout", 60)
+        # Serve candidates from the process wide TFTP server, see utils/tftp.py
+        self.shared_tftp = optional_args.get("shared_tftp", False)
+        # Address the device downloads candidates from, found from the SSH session if unset
+        self.tftp_address = optional_args.get("tftp_address")
+        # Address and UDP port the TFTP server binds, port 69 needs root
+        self.tftp_listen_address = optional_args.get("tftp_listen_address", "")
+        self.tftp_listen_port = optional_args.get("tftp_listen_port", 69)
+        # Transport and size, bytes and duration of the last candidate transfer
+        self.transfer_metrics = None
+
+        # "tftp", "cli" or "auto" for cli up to inband_max_bytes, see utils/transport.py
+        self.candidate_transport = optional_args.get("candidate_transport", "tftp")
+        if self.candidate_transport not in ("tftp", "cli", "auto"):
+            raise ValueError(
+                "candidate_transport must be tftp, cli or auto, not %s" % self.candidate_transport
+            )
+        self.inband_max_bytes = optional_args.get("inband_max_bytes", transport.INBAND_MAX_BYTES)
+        # Transport of the loaded candidate
+        self._transport = None
+
         self.merge_candidate = False
         self.replace_candidate = False
+        # Return from commit_config without committing when compare_config is empty
+        self.skip_noop_commits = optional_args.get("skip_noop_commits", False)
+        # Whether the last commit_config was skipped, see skip_noop_commits
+        self.commit_skipped = False
+        # show running-config delta, read once for compare_config until the next commit
+        self._running_config = None
+
+        # Directory to record every exchange of the session to, see utils/recording.py
+        self.record = optional_args.get("record")
+
+        # Command, parse and getter metrics, True, a dict of Metrics arguments or a Metrics
+        metrics_args = optional_args.get("metrics")
+        if metrics_args:
+            if metrics_args is True:
+                metrics_args = {}
+            if isinstance(metrics_args, dict):
+                metrics_args = metrics.Metrics(**metrics_args)
+            self.metrics = metrics_args
+            metrics.instrument(self, self.metrics)
+        else:
+            self.metrics = None
 
     def open(self):
         """Implement the NAPALM method open (mandatory)"""
+        if self.connection_pool is not None:
+            self.device = self.connection_pool.acquire(
+                self._pool_key, self._connect, self._check_connection
+            )
+        else:
+            self.device = self._connect()
+        self._cli_context = cli_context.HOME
+        self._driver_context = False
+        if self.record:
+            self.device = recording.RecordingConnection(self.device, self, self.record)
 
+    def _connect(self):
         device = {
             'device_type':"generic",
             'ip':self.hostname,
@@ -80,31 +327,294 @@ class AdvaDriver(NetworkDriver):
             'auth_timeout':self.timeout,
             'verbose':False,
         }
-        device.update(self.optional_args)
+        device.update(
+            {k: v for k, v in self.optional_args.items() if k not in DRIVER_OPTIONAL_ARGS}
+        )
 
         try:
-            self.device = ConnectHandler(**device)
-            self.device.session_preparation()
-            self.device.send_command("", expect_string=r"-->")
+            connection = ConnectHandler(**device)
+            connection.session_preparation()
+            connection.send_command("", expect_string=r"-->")
 
         except Exception:
             raise ConnectionException(
                 "Cannot connect to switch: %s:%s" % (self.hostname, self.port)
             )
+        return connection
+
+    @property
+    def _pool_key(self):
+        return (self.hostname, self.optional_args.get("port", self.port), self.username)
+
+    def _check_connection(self, connection):
+        """Health check of a pooled session, which also returns the CLI to home"""
+        if not connection.is_alive():
+            return False
+        self.round_trips += 1
+        connection.send_command("home", expect_string=r"-->")
+        return True
 
     def close(self):
         """Implement the NAPALM method close (mandatory)"""
-        self.device.disconnect()
+        if isinstance(self.device, recording.RecordingConnection):
+            self.device.save()
+            self.device = self.device.connection
+
+        if self.connection_pool is not None:
+            if self.device is not None:
+                self.connection_pool.release(self._pool_key, self.device)
+            # The session may be handed to another driver from now on
+            self.device = None
+        else:
+            self.device.disconnect()
+        if self.metrics is not None:
+            self.metrics.export(self.hostname)
 
-    def send_command(self, command_list, expect_string=r"-->"):
+    def send_command(self, command_list, expect_string=r"-->", context=None):
         """Convenience function for self.device.send_command
         Supports a single command, or a list of commands
+
+        With context, the CLI is first moved to that context, see _navigate.
+        Without, the command runs from home, or from where the previous command
+        without a context left the CLI, see _command_context. A list of commands
+        returns to home at the end.
         """
+        output = self._snapshot_get(context, command_list)
+        if output is not None:
+            return output
+
+        target = self._command_context(context)
+        if target is not None:
+            self._navigate(target)
+        self._driver_context = context is not None
+
         if type(command_list) == str:
-            return self.device.send_command(command_list, expect_string=expect_string)
+            output = self._cache_get(command_list)
+            if output is None:
+                output = self._read(command_list, expect_string)
+                self._cache_set(command_list, output)
+            self._update_cli_context(command_list)
+            return output
+
+        command_list = list(command_list) + ["home"]
+        self.round_trips += len(command_list)
+        for command in command_list:
+            self._update_cli_context(command)
+        started = time.perf_counter()
+        output = self.device.send_multiline(command_list, expect_string=expect_string)
+        self._record_command(command_list, started, output)
+        return output
+
+    def send_command_timing(self, command, context=None):
+        """Kept for compatibility, reads up to the prompt like send_command
+
+        Waiting for the output to go quiet delayed every command, see _read.
+        """
+        return self.send_command(command, context=context)
+
+    def send_command_batch(self, command_list, expect_string=r"-->", context=None):
+        """Send a list of commands in one pipelined exchange
 
-        command_list.append("home")
-        return self.device.send_multiline(command_list, expect_string=expect_string)
+        All commands are written to the channel at once, and the combined output
+        is read back until the echo of the last command is followed by a prompt.
+        Returns the output of each command, in the same order as command_list.
+        The commands must not change the CLI context.
+        """
+        outputs = [self._snapshot_get(context, command) for command in command_list]
+        if None not in outputs:
+            return outputs
+
+        target = self._command_context(context)
+        if target is not None:
+            self._navigate(target)
+        self._driver_context = context is not None
+
+        outputs = [self._cache_get(command) for command in command_list]
+        missing = [c for c, output in zip(command_list, outputs) if output is None]
+        if not missing:
+            return outputs
+
+        self.round_trips += 1
+        started = time.perf_counter()
+        self.device.write_channel("".join(f"{command}\n" for command in missing))
+        output = self.device.read_until_pattern(
+            pattern=rf"{re.escape(missing[-1])}\s*\n[\s\S]*?{expect_string}",
+            read_timeout=min(
+                self.read_timeouts.maximum, sum(self.read_timeouts.get(c) for c in missing)
+            ),
+        )
+        self._record_command(missing, started, output)
+        missing_outputs = iter(self._split_batch_output(output, missing, expect_string))
+
+        for index, command in enumerate(command_list):
+            if outputs[index] is None:
+                outputs[index] = next(missing_outputs)
+                self._cache_set(command, outputs[index])
+        return outputs
+
+    def _snapshot_get(self, context, command):
+        """Output of command in context read ahead by get_snapshot, if any"""
+        if self._snapshot is None or context is None or not isinstance(command, str):
+            return None
+        return self._snapshot.get((tuple(context), command))
+
+    def _command_context(self, context):
+        """Context to move the CLI to before a command sent with context
+
+        The getters leave the CLI in the context of their last command. A command
+        sent without a context after them runs from home, where the CLI always was
+        between getters before contexts were tracked. Commands without a context
+        after that run where the previous one left the CLI, so callers can still
+        navigate themselves.
+        """
+        if context is None and self._driver_context:
+            return cli_context.HOME
+        return context
+
+    def _navigate(self, context):
+        """Move the CLI to context with the fewest navigation commands
+
+        The prompt after each command is checked against the context the driver
+        expects. On a mismatch the context is unknown, and the driver starts over
+        from home once.
+        """
+        for attempt in range(2):
+            for command in cli_context.plan(self._cli_context, context):
+                output = self._read(
+                    command, cli_context.expect_string(command), strip_prompt=False
+                )
+                self._update_cli_context(command, output)
+                if self._cli_context is None:
+                    break
+
+            if self._cli_context == tuple(context):
+                return
+
+        raise CommandErrorException("Unable to enter CLI context: %s" % ", ".join(context))
+
+    def _read(self, command, expect_string=r"-->", strip_prompt=True):
+        """Send command and return its output, as soon as the prompt appears
+
+        The only read path of the driver: it reads up to expect_string instead of
+        waiting for the output to go quiet. It waits at most the read timeout of the
+        command, learned from its earlier latencies, see utils/read_timeouts.py.
+        """
+        self.round_trips += 1
+        read_timeout = self.read_timeouts.get(command)
+        started = time.perf_counter()
+        try:
+            output = self.device.send_command(
+                command,
+                expect_string=expect_string,
+                strip_prompt=strip_prompt,
+                read_timeout=read_timeout,
+            )
+        except ReadTimeout:
+            raise CommandTimeoutException(
+                "No prompt after %r within %s seconds" % (command, read_timeout)
+            )
+        self._record_command(command, started, output)
+        return output
+
+    def _record_command(self, command, started, output):
+        """Record an exchange started at perf_counter started
+
+        Feeds the read timeouts, and the metrics if they are enabled.
+        """
+        elapsed = time.perf_counter() - started
+        if isinstance(command, str):
+            self.read_timeouts.observe(command, elapsed)
+        if self.metrics is not None:
+            self.metrics.record_command(self.hostname, command, elapsed, output)
+
+    def _cache_get(self, command):
+        """Return cached output of command in the current CLI context, if any"""
+        if self.command_cache is None or not self.command_cache.get_ttl(command):
+            return None
+        if self._cli_context is None:
+            return None
+        return self.command_cache.get(self._cli_context, command)
+
+    def _cache_set(self, command, output):
+        if self.command_cache is not None and self._cli_context is not None:
+            self.command_cache.set(self._cli_context, command, output)
+
+    def _invalidate_cache(self):
+        self._port_details = None
+        if self.command_cache is not None:
+            self.command_cache.invalidate()
+
+    def _update_cli_context(self, command, output=None):
+        """Track the CLI context after command was sent
+
+        output ending with the prompt, as read with strip_prompt=False, is checked
+        against the tracked context.
+        """
+        self._cli_context = cli_context.enter(self._cli_context, command)
+
+        if output and self._cli_context is not None and cli_context.is_navigation(command):
+            prompt = output.rstrip().rpartition("\n")[2]
+            if "-->" in prompt and not cli_context.matches(self._cli_context, prompt):
+                logger.warning(
+                    "Prompt %r after %r is not the prompt of %s",
+                    prompt,
+                    command,
+                    self._cli_context,
+                )
+                self._cli_context = None
+
+    def _split_batch_output(self, output, command_list, expect_string=r"-->"):
+        """Split pipelined output into per command chunks
+
+        Every chunk starts after the prompt line echoing its command, and ends at
+        the next prompt line. The output may start with the bare echo of the first
+        command, when its prompt was already read.
+        """
+        prompt = re.compile(rf"{expect_string}\s*(.*?)\s*$")
+        pending = list(command_list)
+        chunks = []
+        current = None
+
+        for index, line in enumerate(output.replace("\r\n", "\n").split("\n")):
+            match = prompt.search(line)
+            if not match:
+                # The prompt before the first command was read by the previous command
+                if index == 0 and pending and line.strip() == pending[0]:
+                    pending.pop(0)
+                    current = []
+                elif current is not None:
+                    current.append(line)
+                continue
+
+            if current is not None:
+                chunks.append("\n".join(current))
+                current = None
+            if pending and match.group(1) == pending[0]:
+                pending.pop(0)
+                current = []
+
+        if current is not None:
+            chunks.append("\n".join(current))
+
+        if pending or len(chunks) != len(command_list):
+            raise CommandErrorException(
+                "Unable to split batched output, missing: %s" % ", ".join(pending)
+            )
+
+        return chunks
+
+    def _parse(self, template_name, raw_text):
+        """Parse raw_text into the rows of the TextFSM template template_name"""
+        started = time.perf_counter()
+        if self.parser == "native" and native_parser.supports(template_name):
+            rows = native_parser.parse_labels(template_name, raw_text)
+        else:
+            rows = textfsm_extractor(self, template_name, raw_text)
+        if self.metrics is not None:
+            self.metrics.record_parse(
+                self.hostname, template_name, time.perf_counter() - started
+            )
+        return rows
 
     def is_alive(self):
         try:
@@ -114,16 +624,18 @@ class AdvaDriver(NetworkDriver):
             return {"is_alive": False}
 
     def get_facts(self):
-        show_system = self.send_command("show system")
-        system_info = textfsm_extractor(self, "show_system", show_system)[0]
+        show_system = self.send_command("show system", context=cli_context.HOME)
+        show_ports = self.send_command("show ports", context=cli_context.HOME)
+        show_shelf_info = self.send_command(
+            "show shelf-info", context=cli_context.NETWORK_ELEMENT
+        )
 
-        self.send_command("network-element ne-1", expect_string=r"NE-1-->")
-        show_shelf_info = self.send_command("show shelf-info")
-        self.send_command("home", expect_string=r"-->")
-        serial_number = textfsm_extractor(self, "show_shelf_info", show_shelf_info)[0]
+        return self._build_facts(show_system, show_shelf_info, show_ports)
 
-        show_ports = self.device.send_command_timing("show ports")
-        interfaces = textfsm_extractor(self, "show_ports", show_ports)
+    def _build_facts(self, show_system, show_shelf_info, show_ports):
+        system_info = self._parse("show_system", show_system)[0]
+        serial_number = self._parse("show_shelf_info", show_shelf_info)[0]
+        interfaces = self._parse("show_ports", show_ports)
         interface_list = [p["port"] for p in interfaces]
 
         uptime = 0
@@ -161,47 +673,207 @@ class AdvaDriver(NetworkDriver):
         else:
             return float(speed.split("-")[1])
 
+    def get_snapshot(self, getters=SNAPSHOT_GETTERS):
+        """Return the results of several getters, reading every output they share once
+
+        The outputs the getters read, see SNAPSHOT_COMMANDS and SNAPSHOT_FOLLOWUPS,
+        are read first, in one pipelined exchange per CLI context and in the order
+        that navigates the least. The getters then build their results from these
+        outputs, so the results are the ones of calling the getters one by one.
+        Getters without a declaration read their outputs as usual.
+
+        :param getters: names of the getters
+        :return: dict of getter name to result
+        """
+        self._snapshot = {}
+        try:
+            self._read_snapshot(self._snapshot_commands(getters))
+            self._read_snapshot(self._snapshot_followups(getters))
+            return {getter: getattr(self, getter)() for getter in getters}
+        finally:
+            self._snapshot = None
+
+    def _read_snapshot(self, commands):
+        for context, command_list in snapshot.plan(self._cli_context, commands):
+            for batch in self._snapshot_batches(command_list):
+                outputs = self.send_command_batch(batch, context=context)
+                self._snapshot.update(((context, c), o) for c, o in zip(batch, outputs))
+
+    def _snapshot_batches(self, command_list):
+        """Split the commands of one context into the pipelined writes of get_snapshot
+
+        Like in get_interfaces, the per-port details are sent one at a time unless
+        batch_port_details is set. No write has more than SNAPSHOT_BATCH_SIZE commands.
+        """
+        batch = []
+        for command in command_list:
+            if not self.batch_port_details and command.startswith(PORT_DETAIL_COMMANDS):
+                yield [command]
+                continue
+            batch.append(command)
+            if len(batch) == SNAPSHOT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _snapshot_commands(self, getters):
+        return [c for getter in getters for c in SNAPSHOT_COMMANDS.get(getter, ())]
+
+    def _snapshot_followups(self, getters):
+        names = dict.fromkeys(SNAPSHOT_FOLLOWUPS[g] for g in getters if g in SNAPSHOT_FOLLOWUPS)
+        commands = [c for name in names for c in getattr(self, name)()]
+        return [c for c in commands if c not in self._snapshot]
+
+    def _port_detail_followups(self):
+        if self._cached_port_details() is not None:
+            return []
+        interface_list = self._parse_interface_list(self._snapshot[SHOW_PORTS])
+        return [(cli_context.HOME, c) for c in self._port_detail_commands(interface_list)]
+
+    def _flow_followups(self):
+        flows = self._parse_flows(self._snapshot[FLOW_PARTITION])
+        return [
+            (cli_context.HOME, f"show flow {flow_name}")
+            for flow_name, flow_data in flows.items()
+            if None in flow_data.values()
+        ]
+
     def get_interfaces(self):
-        show_ports = self.send_command("show ports")
-        ports = textfsm_extractor(self, "show_ports", show_ports)
-        interface_list = [p["port"] for p in ports]
+        return self._build_interfaces(self._get_port_details())
 
-        result = {}
-        for i in interface_list:
-            if "network" in i:
-                show_network_port = self.device.send_command_timing(
-                    f"show network-port {i}"
-                )
-                port_details = textfsm_extractor(
-                    self, "show_port_details", show_network_port
-                )[0]
-            else:
-                show_access_port = self.device.send_command_timing(
-                    f"show access-port {i}"
-                )
-                port_details = textfsm_extractor(
-                    self, "show_port_details", show_access_port
-                )[0]
+    def get_sfp_inventory(self):
+        """Return the name, vendor, part and serial number and more of every SFP"""
+        return self._build_sfp_inventory(self._get_port_details())
+
+    def _get_port_details(self):
+        """Parsed details of every port, shared by get_interfaces and
+        get_sfp_inventory, see port_details_ttl
+        """
+        details = self._cached_port_details()
+        if details is not None:
+            return details
+
+        round_trips = self.round_trips
+        show_ports = self.send_command("show ports", context=cli_context.HOME)
+        interface_list = self._parse_interface_list(show_ports)
+        commands = self._port_detail_commands(interface_list)
+
+        if self.batch_port_details:
+            outputs = self.send_command_batch(commands, context=cli_context.HOME)
+        else:
+            outputs = [self.send_command(command, context=cli_context.HOME) for command in commands]
+        logger.debug("Port details used %d round-trips", self.round_trips - round_trips)
 
+        return self._store_port_details(interface_list, outputs)
+
+    def _cached_port_details(self):
+        if self._port_details is not None and self._port_details[0] > time.monotonic():
+            return self._port_details[1]
+        return None
+
+    def _store_port_details(self, interface_list, port_detail_outputs):
+        """Parse the output of each port once, and keep it for port_details_ttl"""
+        details = {
+            i: self._parse("show_port_details", output)[0]
+            for i, output in zip(interface_list, port_detail_outputs)
+        }
+        if self.port_details_ttl:
+            self._port_details = (time.monotonic() + self.port_details_ttl, details)
+        return details
+
+    def _parse_interface_list(self, show_ports):
+        return [p["port"] for p in self._parse("show_ports", show_ports)]
+
+    def _port_detail_commands(self, interface_list):
+        """Commands showing the details of each port, see PORT_DETAIL_COMMANDS"""
+        return [
+            f"show network-port {i}" if "network" in i else f"show access-port {i}"
+            for i in interface_list
+        ]
+
+    def _build_interfaces(self, port_details):
+        result = {}
+        for i, details in port_details.items():
             result[i] = {
-                "description": port_details["alias"],
-                "is_enabled": port_details["adminstate"] == "in-service",
-                "is_up": port_details["operationalstate"] == "normal",
-                "mac_address": port_details["macaddress"],
-                "mtu": int(port_details["mtu"]),
-                "speed": self._get_port_speed(port_details["speed"]),
+                "description": details["alias"],
+                "is_enabled": details["adminstate"] == "in-service",
+                "is_up": details["operationalstate"] == "normal",
+                "mac_address": details["macaddress"],
+                "mtu": int(details["mtu"]),
+                "speed": self._get_port_speed(details["speed"]),
                 "last_flapped": -1.0,
             }
 
         return result
 
-    def get_interfaces_ip(self):
-        show_run_mgmttnl = self.send_command(
-            "show running-config delta partition mgmttnl"
+    def _build_sfp_inventory(self, port_details):
+        result = {}
+        for i, details in port_details.items():
+            if _not_available(details["sfpname"]):
+                continue
+            result[i] = {
+                "name": details["sfpname"],
+                "vendor": _available(details["sfpvendor"]),
+                "part_number": _available(details["sfppartnumber"]),
+                "serial_number": _available(details["sfpserial"]),
+                "hardware_revision": _available(details["sfprevision"]),
+                "manufacture_date": _available(details["sfpdate"]),
+                "connector": _available(details["sfpconnector"]),
+                "media_type": _available(details["sfpmediatype"]),
+                "link_length": _as_int(details["sfplinklength"]),
+                "wavelength": _as_int(details["sfpwavelength"]),
+            }
+
+        return result
+
+    def _get_flows(self):
+        """Return flow data keyed by flow name, read from the flow partition
+
+        Fields the running config does not carry are read with show flow.
+        """
+        show_flows = self.send_command(
+            "show running-config delta partition flow", context=cli_context.HOME
+        )
+        flows = self._parse_flows(show_flows)
+
+        for flow_name, flow_data in flows.items():
+            if None in flow_data.values():
+                show_flow = self.send_command(f"show flow {flow_name}", context=cli_context.HOME)
+                self._complete_flow(flow_data, show_flow)
+
+        return flows
+
+    def _parse_flows(self, show_flows):
+        """Flow data keyed by flow name, fields missing from the config are None"""
+        flows = config_parser.get_flows(config_parser.parse_running_config(show_flows))
+        return dict(config_parser.iter_flows(flows))
+
+    def _complete_flow(self, flow_data, show_flow):
+        """Fill the fields of flow_data missing from the config from show flow"""
+        show_flow_data = self._parse("show_flow", show_flow)[0]
+        for key, value in flow_data.items():
+            if value is None:
+                flow_data[key] = show_flow_data[key]
+
+    def _get_mgmt_tunnels(self):
+        """Return management tunnels, read from the mgmttnl partition"""
+        show_mgmt_tnl = self.send_command(
+            "show running-config delta partition mgmttnl", context=cli_context.HOME
+        )
+        return self._parse_mgmt_tunnels(show_mgmt_tnl)
+
+    def _parse_mgmt_tunnels(self, show_mgmt_tnl):
+        return config_parser.get_mgmt_tunnels(
+            config_parser.parse_running_config(show_mgmt_tnl)
         )
-        info = textfsm_extractor(self, "show_run_mgmttnl", show_run_mgmttnl)
+
+    def get_interfaces_ip(self):
+        return self._build_interfaces_ip(self._get_mgmt_tunnels())
+
+    def _build_interfaces_ip(self, mgmt_tunnels):
         result = {}
-        for i in info:
+        for i in mgmt_tunnels:
             result[i["port"]] = {
                 "ipv4": {
                     i["ipaddress"]: {
@@ -215,10 +887,14 @@ class AdvaDriver(NetworkDriver):
         return result
 
     def get_interfaces_vlans(self):
-        show_ports = self.send_command("show ports")
-        ports = textfsm_extractor(self, "show_ports", show_ports)
-        interface_list = [p["port"] for p in ports]
+        show_ports = self.send_command("show ports", context=cli_context.HOME)
+        return self._build_interfaces_vlans(
+            self._parse_interface_list(show_ports),
+            self._get_flows(),
+            self._get_mgmt_tunnels(),
+        )
 
+    def _build_interfaces_vlans(self, interface_list, flows, mgmt_flows):
         result = {}
         for i in interface_list:
             if "network" in i:
@@ -234,11 +910,7 @@ class AdvaDriver(NetworkDriver):
                 "tagged-native-vlan": False,
             }
 
-        show_flows = self.send_command("show running-config delta partition flow")
-        flows = textfsm_extractor(self, "show_run_flow", show_flows)
-        for flow in flows:
-            show_flow = self.send_command(f"show flow {flow['flowname']}")
-            flow_data = textfsm_extractor(self, "show_flow", show_flow)[0]
+        for flow_data in flows.values():
             if flow_data["adminstate"] == "in-service":
                 result[flow_data["accessinterface"]]["access-vlan"] = flow_data["vlan"]
                 result[flow_data["networkinterface"]]["trunk-vlans"].append(
@@ -246,8 +918,6 @@ class AdvaDriver(NetworkDriver):
                 )
 
         # get management vlans
-        show_mgmt_tnl = self.send_command("show running-config delta partition mgmttnl")
-        mgmt_flows = textfsm_extractor(self, "show_run_mgmttnl", show_mgmt_tnl)
         if mgmt_flows:
             for mgmt_flow in mgmt_flows:
                 result[mgmt_flow["port"]]["trunk-vlans"].append(mgmt_flow["vlan"])
@@ -255,14 +925,13 @@ class AdvaDriver(NetworkDriver):
         return result
 
     def get_vlans(self):
+        return self._build_vlans(self._get_flows(), self._get_mgmt_tunnels())
+
+    def _build_vlans(self, flows, mgmt_flows):
         result = {}
 
         # get customer flow vlans
-        show_flows = self.send_command("show running-config delta partition flow")
-        flows = textfsm_extractor(self, "show_run_flow", show_flows)
-        for flow in flows:
-            show_flow = self.send_command(f"show flow {flow['flowname']}")
-            flow_data = textfsm_extractor(self, "show_flow", show_flow)[0]
+        for flow_data in flows.values():
             if flow_data["adminstate"] == "in-service":
                 result[flow_data["vlan"]] = {
                     "name": flow_data["circuitname"],
@@ -273,8 +942,6 @@ class AdvaDriver(NetworkDriver):
                 }
 
         # get management flow vlans
-        show_mgmt_tnl = self.send_command("show running-config delta partition mgmttnl")
-        mgmt_flows = textfsm_extractor(self, "show_run_mgmttnl", show_mgmt_tnl)
         if mgmt_flows:
             for mgmt_flow in mgmt_flows:
                 result[mgmt_flow["vlan"]] = {
@@ -285,8 +952,12 @@ class AdvaDriver(NetworkDriver):
         return result
 
     def get_lldp_neighbors(self):
-        show_lldp_detail = self.send_command("show lldp detail")
-        lldp_neighbours = textfsm_extractor(self, "show_lldp_detail", show_lldp_detail)
+        return self._build_lldp_neighbors(
+            self.send_command("show lldp detail", context=cli_context.HOME)
+        )
+
+    def _build_lldp_neighbors(self, show_lldp_detail):
+        lldp_neighbours = self._parse("show_lldp_detail", show_lldp_detail)
 
         result = {}
         for i in lldp_neighbours:
@@ -297,8 +968,12 @@ class AdvaDriver(NetworkDriver):
         return result
 
     def get_static_routes(self):
-        show_ip_routes = self.send_command("show ip-routes")
-        static_routes = textfsm_extractor(self, "show_ip_routes", show_ip_routes)
+        return self._build_static_routes(
+            self.send_command("show ip-routes", context=cli_context.HOME)
+        )
+
+    def _build_static_routes(self, show_ip_routes):
+        static_routes = self._parse("show_ip_routes", show_ip_routes)
 
         result = []
         for i in static_routes:
@@ -316,46 +991,81 @@ class AdvaDriver(NetworkDriver):
         return result
 
     def get_mac_address_table(self):
-        self.send_command("network-element ne-1", expect_string=r"NE-1-->")
-        self.send_command("configure nte nte", expect_string=r"NE-1:nte(.*)-1-1-1-->")
+        if self.mac_tracker is None:
+            return list(self.iter_mac_address_table())
+        return self.mac_tracker.update(self._iter_fwd_entries())[0]
 
-        show_ports = self.send_command("show ports")
-        access_ports = textfsm_extractor(self, "show_ports_up_access", show_ports)
+    def get_mac_address_table_changes(self):
+        """Return the MAC address table entries added, removed and moved since the last poll
 
-        mac_address_table = []
-        for p in access_ports:
-            self.send_command(
-                f"configure access-port {p['port']}",
-                expect_string=rf"-NE-1:{p['port']}",
-            )
-            show_flows = self.send_command("list flows")
-            flows = textfsm_extractor(self, "show_port_flows", show_flows)
+        Polls the full table, like get_mac_address_table. Without mac_tracking
+        the first call starts tracking, and reports every entry as added.
+        """
+        if self.mac_tracker is None:
+            self.mac_tracker = MacTracker()
+        return self.mac_tracker.update(self._iter_fwd_entries())[1]
 
-            for flow in flows:
-                self.send_command(
-                    f"configure flow {flow['flow']}",
-                    expect_string=rf"NE-1:{flow['flow']}",
+    def get_mac_address_table_compact(self):
+        """Return the MAC address table as a MacTable, see utils/mac_table.py
+
+        Holds the same entries as get_mac_address_table in a fraction of the memory,
+        the dicts of each flow are dropped once they are added to the table.
+        """
+        if self.mac_tracker is None:
+            return MacTable.from_dicts(self.iter_mac_address_table())
+        return MacTable.from_dicts(self.mac_tracker.update(self._iter_fwd_entries())[0])
+
+    def iter_mac_address_table(self, port=None, flow=None, mac_prefix=None, static=None):
+        """Yield the MAC address table flow by flow, as each flow is read
+
+        :param port: access port, or list of access ports, whose flows are read
+        :param flow: flow, or list of flows, to read
+        :param mac_prefix: only yield MACs starting with this, e.g. "00:00:5e"
+        :param static: True yields static entries only, False dynamic entries only
+
+        Access ports and flows that cannot match the filters are not entered.
+        """
+        for entry in self._iter_fwd_entries(port, flow):
+            if _mac_entry_matches(entry, mac_prefix, static):
+                yield entry
+
+    def _iter_fwd_entries(self, port=None, flow=None):
+        """Yield the entries of the flows allowed by the filters"""
+        ports, flows = _as_set(port), _as_set(flow)
+        show_ports = self.send_command("show ports", context=cli_context.NTE)
+
+        for p in self._parse("show_ports_up_access", show_ports):
+            if not _port_may_match(p["port"], ports, flows):
+                continue
+
+            port_context = cli_context.NTE + (f"configure access-port {p['port']}",)
+            show_flows = self.send_command("list flows", context=port_context)
+
+            for f in self._parse("show_port_flows", show_flows):
+                if flows is not None and f["flow"] not in flows:
+                    continue
+
+                list_fwd = self.send_command(
+                    "list fwd-entries", context=port_context + (f"configure flow {f['flow']}",)
                 )
-                list_fwd = self.send_command("list fwd-entries")
-                macs = textfsm_extractor(self, "list_fwd_entries", list_fwd)
-                self.send_command("back", expect_string=rf"NE-1:{p['port']}")
-
-                for mac in macs:
-                    mac_address_table.append(
-                        {
-                            "mac": mac["mac"],
-                            "interface": mac["port"],
-                            "vlan": -1,
-                            "static": bool(mac["type"] == "static"),
-                            "active": bool(mac["status"] == "Valid"),
-                            "moves": -1,
-                            "last_move": -1.0,
-                        }
-                    )
-
-            self.send_command("back", expect_string=rf"NE-1:nte(.*)-1-1-1-->")
-
-        return mac_address_table
+                yield from self._build_mac_entries(list_fwd)
+
+    def _build_mac_entries(self, list_fwd):
+        result = []
+        for mac in self._parse("list_fwd_entries", list_fwd):
+            result.append(
+                {
+                    "mac": mac["mac"],
+                    "interface": mac["port"],
+                    "vlan": -1,
+                    "static": bool(mac["type"] == "static"),
+                    "active": bool(mac["status"] == "Valid"),
+                    "moves": -1,
+                    "last_move": -1.0,
+                }
+            )
+
+        return result
 
     def get_config(self, retrieve="all", sanitized=False):
         """Implementation of get_config for Adva.
@@ -373,27 +1083,49 @@ class AdvaDriver(NetworkDriver):
 
         if retrieve in ("running", "all"):
             command = "show running-config delta"
-            output = self.send_command(command)
-            configs["running"] = output
+            output = self.send_command(command, context=cli_context.HOME)
+            configs["running"] = _strip_banner(output)
 
         if retrieve in ("startup", "all"):
             command = "show running-config delta"
-            output = self.send_command(command)
-            configs["startup"] = output
+            output = self.send_command(command, context=cli_context.HOME)
+            configs["startup"] = _strip_banner(output)
 
         return configs
 
     def compare_config(self):
-        raise NotImplementedError("Config compare not supported on merge configs")
+        """Unified diff of the running config and the loaded candidate
+
+        Computed locally from the structure of both configs, see config_parser.diff.
+        The running config is read once and reused until the next commit.
+        """
+        if self.merge_candidate:
+            return config_parser.diff(self._get_running_config(), self.merge_candidate)
+        if self.replace_candidate:
+            return config_parser.diff(
+                self._get_running_config(), self.replace_candidate, replace=True
+            )
+        return ""
+
+    def _get_running_config(self):
+        if self._running_config is None:
+            self._running_config = _strip_banner(
+                self.send_command("show running-config delta", context=cli_context.HOME)
+            )
+        return self._running_config
 
     def discard_config(self):
+        self._invalidate_cache()
         self.merge_candidate = False
         self.replace_candidate = False
+        self._transport = None
 
     def load_merge_candidate(self, filename=None, config=None):
         if filename and config:
             raise MergeConfigException("Cannot specify both filename and config")
 
+        self._invalidate_cache()
+
         if filename:
             with open(filename, "r") as stream:
                 self.merge_candidate = stream.read()
@@ -401,16 +1133,14 @@ class AdvaDriver(NetworkDriver):
         if config:
             self.merge_candidate = self._clean_config(config)
 
-        # Transfer merge candidate
-        self._transfer_file(self.merge_candidate)
-
-        # Validate merge candidate
-        self._validate_candidate(self.merge_candidate)
+        self._load_candidate(self.merge_candidate)
 
     def load_replace_candidate(self, filename=None, config=None):
         if filename and config:
             raise ReplaceConfigException("Cannot specify both filename and config")
 
+        self._invalidate_cache()
+
         if filename:
             with open(filename, "r") as stream:
                 self.replace_candidate = stream.read()
@@ -418,15 +1148,25 @@ class AdvaDriver(NetworkDriver):
         if config:
             self.replace_candidate = self._clean_config(config)
 
-        # Transfer replace candidate
-        self._transfer_file(self.replace_candidate)
+        self._load_candidate(self.replace_candidate, replace=True)
+
+    def _load_candidate(self, candidate, replace=False):
+        """Put candidate on the device with the transport chosen for its size"""
+        self._transport = transport.select(
+            self.candidate_transport, candidate, replace, self.inband_max_bytes
+        )
+        self._transport.put(self, candidate)
 
-        # Validate merge candidate
-        self._validate_candidate(self.replace_candidate)
+        # Only a staged candidate is on the device to validate
+        if self._transport.staged:
+            self._validate_candidate(candidate)
 
     def commit_config(self, message=""):
         """
-        Send self.merge_candidate to running-config via tftp
+        Load the transferred candidate into the running-config, or apply a merge
+        candidate over the CLI when it was loaded with the cli transport
+
+        With skip_noop_commits, a candidate that changes nothing is discarded instead.
         """
 
         if self.merge_candidate and self.replace_candidate:
@@ -435,14 +1175,31 @@ class AdvaDriver(NetworkDriver):
         if not self.merge_candidate and not self.replace_candidate:
             raise MergeConfigException("No candidate loaded")
 
-        if self.merge_candidate:
-            result = self.send_command(["admin config", "load candidate", "home"])
+        self.commit_skipped = self.skip_noop_commits and not self.compare_config()
+        if self.commit_skipped:
+            logger.info("Candidate does not change the running config, not committing")
+            self.discard_config()
+            return
+
+        self._invalidate_cache()
+        self._running_config = None
+
+        if self.merge_candidate and self._transport and not self._transport.staged:
+            self.transfer_metrics = self._transport.apply(self, self.merge_candidate)
+            if self.metrics is not None:
+                self.metrics.record_transfer(self.hostname, self.transfer_metrics)
+        elif self.merge_candidate:
+            result = self.send_command("load candidate", context=cli_context.ADMIN_CONFIG)
             if 'ConfigFile load failed' in result:
-                show_configfile_status = self.send_command("show configfile-status")
-                configfile_status = textfsm_extractor(self, "show_configfile_status", show_configfile_status)
+                show_configfile_status = self.send_command(
+                    "show configfile-status", context=cli_context.HOME
+                )
+                configfile_status = self._parse("show_configfile_status", show_configfile_status)
                 raise MergeConfigException(configfile_status[0]['error'])
         elif self.replace_candidate:
-            self.send_command(["admin config", "restart-with-configfile candidate yes"])
+            self.send_command(
+                "restart-with-configfile candidate yes", context=cli_context.ADMIN_CONFIG
+            )
 
     def _clean_config(self, content):
         ''' Ensure config content is in the correct format:
@@ -457,62 +1214,158 @@ class AdvaDriver(NetworkDriver):
         return content
 
     def _transfer_file(self, filecontent, destfile='candidate'):
-        # Transfer merge candidate with tftp
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Setup TFTP server
-            tftp_server = tftpy.TftpServer(
-                tftproot=temp_dir,
-                dyn_file_func=self._tftp_handler(filecontent),
+        # Transfer merge candidate with tftp. Only config changes need tftpy, so it is
+        # imported here, to keep it out of the startup of getter-only processes
+        import tftpy
+
+        from napalm_adva.utils import tftp
+
+        content = (
+            "# DO NOT EDIT THIS LINE. FILE_TYPE=CONFIGURATION_FILE VERSION=13.1.1\n"
+            + filecontent
+        )
+
+        if self.shared_tftp:
+            service = tftp.get_service(
+                listenip=self.tftp_listen_address, listenport=self.tftp_listen_port
             )
-            tftp_thread = Thread(target=tftp_server.listen)
-            tftp_thread.daemon = True
-            tftp_thread.start()
-
-            self.send_command(["configure system", "tftp enabled", "home"])
-            result = self.send_command(
-                [
-                    "admin config",
-                    f"transfer-file tftp get ip-address {self._get_ipaddress()} {destfile} yes",
-                    "home",
-                ]
+            with service.serve(content, destfile, self.transfer_timeout) as (filename, transfer):
+                finished = self._tftp_get(filename, transfer)
+        else:
+            filename = destfile
+            transfer = tftp.TftpTransfer(content)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Setup TFTP server
+                tftp_server = tftpy.TftpServer(
+                    tftproot=temp_dir,
+                    dyn_file_func=self._tftp_handler(transfer, destfile),
+                )
+                tftp_thread = Thread(
+                    target=tftp_server.listen,
+                    kwargs={
+                        "listenip": self.tftp_listen_address,
+                        "listenport": self.tftp_listen_port,
+                        "timeout": tftp.SOCKET_TIMEOUT,
+                    },
+                )
+                tftp_thread.daemon = True
+                tftp_thread.start()
+
+                finished = self._tftp_get(destfile, transfer)
+
+                tftp_server.stop(now=True)
+                tftp_thread.join()
+
+        self.transfer_metrics = dict(transfer.metrics(), transport="tftp")
+        if self.metrics is not None:
+            self.metrics.record_transfer(self.hostname, self.transfer_metrics)
+        if not (finished and transfer.success) and filename != destfile:
+            self._remove_file(filename)
+        if not finished:
+            raise CommandTimeoutException(
+                "Device did not download %s within %s seconds" % (destfile, self.transfer_timeout)
+            )
+        if not transfer.success:
+            raise CommandErrorException(
+                "Transfer of %s failed after %d of %d bytes"
+                % (destfile, transfer.bytes, len(transfer.content))
             )
-            logger.info(result)
+        logger.info(
+            "Transferred %d bytes in %.2f seconds", transfer.bytes, transfer.duration
+        )
+        # The shared server serves a one-time filename, the device stores it as is
+        if filename != destfile:
+            self._rename_file(filename, destfile)
+
+    def _tftp_get(self, filename, transfer):
+        """Make the device download filename, and wait for the transfer to finish"""
+        self.send_command("tftp enabled", context=cli_context.SYSTEM)
+        result = self.send_command(
+            f"transfer-file tftp get ip-address {self._get_ipaddress()} {filename} yes",
+            context=cli_context.ADMIN_CONFIG,
+        )
+        logger.info(result)
+
+        # Server downloads in the background, and signals when the device has the file
+        return transfer.wait(self.transfer_timeout)
+
+    def _rename_file(self, filename, destfile):
+        """Rename a downloaded file on the device to destfile
 
-            # Server downloads in the background. Sleep to wait for it
-            time.sleep(5)
+        The destfile of a previous push is deleted first. When that or the rename
+        fails, filename is deleted, so one-time files do not pile up on the flash.
+        """
+        try:
+            if destfile in self._list_files():
+                self._admin_config_command(f"delete {destfile}")
+            self._admin_config_command(f"rename {filename} {destfile}")
+        except CommandErrorException:
+            self._remove_file(filename)
+            raise
+
+    def _remove_file(self, filename):
+        """Delete filename from the device if it is there, failures are only logged"""
+        try:
+            if filename in self._list_files():
+                self._admin_config_command(f"delete {filename}")
+        except CommandErrorException as e:
+            logger.warning("Could not delete %s: %s", filename, e)
 
-            tftp_server.stop()
-            tftp_thread.join()
+    def _list_files(self):
+        """Names of the files on the device
 
-    def _tftp_handler(self, merge_candidate):
-        """tftp handler. return merge candidate no matter what is requested."""
+        list prints a table, |name |... rows, the names are the first cell of each row.
+        """
+        output = self.send_command("list", context=cli_context.ADMIN_CONFIG)
+        return {
+            line.strip().strip("|").split("|")[0].strip() for line in output.splitlines()
+        }
+
+    def _admin_config_command(self, command):
+        """Send command in admin config, raising CommandErrorException on a CLI error"""
+        result = self.send_command(command, context=cli_context.ADMIN_CONFIG)
+        if transport.CLI_ERROR.search(result):
+            raise CommandErrorException("%s failed: %s" % (command, result.strip()))
+        return result
+
+    def _tftp_handler(self, transfer, destfile='candidate'):
+        """tftp handler. return the transfer for destfile"""
 
         def _handler(fn, raddress=None, rport=None):
-            if fn == "candidate":
-                return io.StringIO(
-                    "# DO NOT EDIT THIS LINE. FILE_TYPE=CONFIGURATION_FILE VERSION=13.1.1\n"
-                    + merge_candidate
-                )
+            if fn == destfile:
+                return transfer.open()
 
         return _handler
 
     def _get_ipaddress(self):
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("1.1.1.1", 1))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
+        """Address of this host as the device sees it, for the device to download from
 
-    def _validate_candidate(self, candidate_config):
-        self.send_command("admin config")
+        The local address of the SSH session is the one the device reaches this host
+        on. Behind NAT, set the tftp_address optional argument.
+        """
+        if self.tftp_address:
+            return self.tftp_address
 
-        list_configfile = self.send_command("list")
-        if 'candidate' not in list_configfile:
+        try:
+            return self.device.remote_conn.get_transport().sock.getsockname()[0]
+        except AttributeError:
+            # No paramiko session, take the source address of the route to the device
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                s.connect((self.hostname, 1))
+                return s.getsockname()[0]
+            finally:
+                s.close()
+
+    def _validate_candidate(self, candidate_config):
+        if 'candidate' not in self._list_files():
             raise MergeConfigException(
                 "Candidate config not transferred to device"
             )
 
-        configfile_data = self.send_command("show configfile candidate")
+        configfile_data = self.send_command(
+            "show configfile candidate", context=cli_context.ADMIN_CONFIG
+        )
 
         # Strip command output and config file header from output
         configfile_data = re.sub(
@@ -0,0 +1,426 @@
+"""
+asyncio driver for Adva.
+
+AsyncAdvaDriver has the getters of AdvaDriver as coroutines, over an asyncssh
+session instead of netmiko. It sends the same commands as AdvaDriver and builds
+the results with the same parsing code, so both return identical results.
+
+asyncssh is an optional dependency: pip install napalm-adva[async]
+"""
+
+import asyncio
+import re
+import time
+
+from napalm.base.exceptions import (
+    CommandErrorException,
+    CommandTimeoutException,
+    ConnectionException,
+    ModuleImportError,
+)
+
+from napalm_adva.adva import (
+    SNAPSHOT_GETTERS,
+    AdvaDriver,
+    _as_set,
+    _mac_entry_matches,
+    _port_may_match,
+    _strip_banner,
+)
+from napalm_adva.utils import cli_context, snapshot
+from napalm_adva.utils.mac_table import MacTable
+from napalm_adva.utils.mac_tracker import MacTracker
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+
+class AsyncCLIChannel(object):
+    """Interactive CLI session over asyncssh."""
+
+    def __init__(self, connection, process, timeout=60):
+        self.connection = connection
+        self.process = process
+        self.timeout = timeout
+        self._buffer = ""
+
+    @classmethod
+    async def connect(cls, host, port, username, password, timeout=60, **kwargs):
+        if asyncssh is None:
+            raise ModuleImportError("AsyncAdvaDriver requires asyncssh")
+
+        connection = await asyncio.wait_for(
+            asyncssh.connect(
+                host,
+                port=port,
+                username=username,
+                password=password,
+                known_hosts=None,
+                **kwargs,
+            ),
+            timeout,
+        )
+        process = await connection.create_process(
+            term_type="vt100", term_size=(511, 1000), encoding="utf-8"
+        )
+        return cls(connection, process, timeout)
+
+    def write(self, data):
+        self.process.stdin.write(data)
+
+    async def read_until(self, pattern, timeout=None):
+        """Read until pattern, returns the output up to and including the match"""
+        regex = re.compile(pattern)
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:
+            match = regex.search(self._buffer)
+            if match:
+                output = self._buffer[: match.end()]
+                self._buffer = self._buffer[match.end():]
+                return output
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise CommandTimeoutException("Pattern not detected: %r" % pattern)
+            try:
+                data = await asyncio.wait_for(self.process.stdout.read(65536), remaining)
+            except asyncio.TimeoutError:
+                raise CommandTimeoutException("Pattern not detected: %r" % pattern)
+            if not data:
+                raise ConnectionException("Connection closed by device")
+            self._buffer += data.replace("\r\n", "\n").replace("\r", "\n")
+
+    async def send_command(self, command, expect_string=r"-->", strip_prompt=True, timeout=None):
+        """Send command, and return its output without the echo
+
+        Like netmiko send_command, the command echo is read before looking for
+        expect_string, so the prompt in front of the echo does not match.
+        """
+        self.write(f"{command}\n")
+        if command:
+            await self.read_until(rf"{re.escape(command)}[ \t]*\n")
+
+        output = await self.read_until(expect_string, timeout)
+        if strip_prompt:
+            return output.rpartition("\n")[0]
+        return output
+
+    async def close(self):
+        self.process.close()
+        self.connection.close()
+        await self.connection.wait_closed()
+
+
+class AsyncAdvaDriver(AdvaDriver):
+    """asyncio driver for Adva, every getter is a coroutine."""
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.close()
+
+    def __del__(self):
+        # NetworkDriver closes open sessions here, which needs a running loop
+        pass
+
+    async def open(self):
+        ssh_args = {
+            k: v
+            for k, v in self.optional_args.items()
+            if k in ("client_keys", "passphrase", "agent_path", "config")
+        }
+        try:
+            self.device = await AsyncCLIChannel.connect(
+                self.hostname,
+                self.optional_args.get("port", self.port),
+                self.username,
+                self.password,
+                timeout=self.timeout,
+                **ssh_args,
+            )
+            await self.device.read_until(r"-->")
+        except ModuleImportError:
+            raise
+        except Exception:
+            raise ConnectionException(
+                "Cannot connect to switch: %s:%s" % (self.hostname, self.port)
+            )
+
+    async def close(self):
+        await self.device.close()
+        if self.metrics is not None:
+            self.metrics.export(self.hostname)
+
+    async def send_command(self, command_list, expect_string=r"-->", context=None):
+        """Send a single command, or a list of commands"""
+        output = self._snapshot_get(context, command_list)
+        if output is not None:
+            return output
+
+        target = self._command_context(context)
+        if target is not None:
+            await self._navigate(target)
+        self._driver_context = context is not None
+
+        if type(command_list) == str:
+            output = self._cache_get(command_list)
+            if output is None:
+                output = await self._read(command_list, expect_string)
+                self._cache_set(command_list, output)
+            self._update_cli_context(command_list)
+            return output
+
+        outputs = []
+        for command in list(command_list) + ["home"]:
+            outputs.append(await self._read(command, expect_string))
+            self._update_cli_context(command)
+        return "\n".join(outputs)
+
+    async def send_command_timing(self, command, context=None):
+        """The prompt ends every output, so this reads up to the prompt too"""
+        return await self.send_command(command, context=context)
+
+    async def send_command_batch(self, command_list, expect_string=r"-->", context=None):
+        """Send a list of commands in one pipelined exchange, see AdvaDriver"""
+        outputs = [self._snapshot_get(context, command) for command in command_list]
+        if None not in outputs:
+            return outputs
+
+        target = self._command_context(context)
+        if target is not None:
+            await self._navigate(target)
+        self._driver_context = context is not None
+
+        outputs = [self._cache_get(command) for command in command_list]
+        missing = [c for c, output in zip(command_list, outputs) if output is None]
+        if not missing:
+            return outputs
+
+        self.round_trips += 1
+        started = time.perf_counter()
+        self.device.write("".join(f"{command}\n" for command in missing))
+        output = await self.device.read_until(
+            rf"{re.escape(missing[-1])}\s*\n[\s\S]*?{expect_string}",
+            min(self.read_timeouts.maximum, sum(self.read_timeouts.get(c) for c in missing)),
+        )
+        self._record_command(missing, started, output)
+        missing_outputs = iter(self._split_batch_output(output, missing, expect_string))
+
+        for index, command in enumerate(command_list):
+            if outputs[index] is None:
+                outputs[index] = next(missing_outputs)
+                self._cache_set(command, outputs[index])
+        return outputs
+
+    async def _read(self, command, expect_string=r"-->", strip_prompt=True):
+        """Send command and read up to the prompt, see AdvaDriver._read"""
+        self.round_trips += 1
+        started = time.perf_counter()
+        output = await self.device.send_command(
+            command, expect_string, strip_prompt, self.read_timeouts.get(command)
+        )
+        self._record_command(command, started, output)
+        return output
+
+    async def _navigate(self, context):
+        """Move the CLI to context, see AdvaDriver._navigate"""
+        for attempt in range(2):
+            for command in cli_context.plan(self._cli_context, context):
+                output = await self._read(
+                    command, cli_context.expect_string(command), strip_prompt=False
+                )
+                self._update_cli_context(command, output)
+                if self._cli_context is None:
+                    break
+
+            if self._cli_context == tuple(context):
+                return
+
+        raise CommandErrorException("Unable to enter CLI context: %s" % ", ".join(context))
+
+    async def is_alive(self):
+        try:
+            await self.send_command("")
+            return {"is_alive": True}
+        except (AttributeError, ConnectionException, CommandTimeoutException):
+            return {"is_alive": False}
+
+    async def get_facts(self):
+        show_system = await self.send_command("show system", context=cli_context.HOME)
+        show_ports = await self.send_command("show ports", context=cli_context.HOME)
+        show_shelf_info = await self.send_command(
+            "show shelf-info", context=cli_context.NETWORK_ELEMENT
+        )
+
+        return self._build_facts(show_system, show_shelf_info, show_ports)
+
+    async def get_snapshot(self, getters=SNAPSHOT_GETTERS):
+        """Return the results of several getters, see AdvaDriver"""
+        self._snapshot = {}
+        try:
+            await self._read_snapshot(self._snapshot_commands(getters))
+            await self._read_snapshot(self._snapshot_followups(getters))
+            return {getter: await getattr(self, getter)() for getter in getters}
+        finally:
+            self._snapshot = None
+
+    async def _read_snapshot(self, commands):
+        for context, command_list in snapshot.plan(self._cli_context, commands):
+            for batch in self._snapshot_batches(command_list):
+                outputs = await self.send_command_batch(batch, context=context)
+                self._snapshot.update(((context, c), o) for c, o in zip(batch, outputs))
+
+    async def get_interfaces(self):
+        return self._build_interfaces(await self._get_port_details())
+
+    async def get_sfp_inventory(self):
+        return self._build_sfp_inventory(await self._get_port_details())
+
+    async def _get_port_details(self):
+        """Parsed details of every port, see AdvaDriver"""
+        details = self._cached_port_details()
+        if details is not None:
+            return details
+
+        show_ports = await self.send_command("show ports", context=cli_context.HOME)
+        interface_list = self._parse_interface_list(show_ports)
+        commands = self._port_detail_commands(interface_list)
+
+        if self.batch_port_details:
+            outputs = await self.send_command_batch(commands, context=cli_context.HOME)
+        else:
+            outputs = [
+                await self.send_command(command, context=cli_context.HOME) for command in commands
+            ]
+
+        return self._store_port_details(interface_list, outputs)
+
+    async def _get_flows(self):
+        show_flows = await self.send_command(
+            "show running-config delta partition flow", context=cli_context.HOME
+        )
+        flows = self._parse_flows(show_flows)
+
+        for flow_name, flow_data in flows.items():
+            if None in flow_data.values():
+                show_flow = await self.send_command(
+                    f"show flow {flow_name}", context=cli_context.HOME
+                )
+                self._complete_flow(flow_data, show_flow)
+
+        return flows
+
+    async def _get_mgmt_tunnels(self):
+        show_mgmt_tnl = await self.send_command(
+            "show running-config delta partition mgmttnl", context=cli_context.HOME
+        )
+        return self._parse_mgmt_tunnels(show_mgmt_tnl)
+
+    async def get_interfaces_ip(self):
+        return self._build_interfaces_ip(await self._get_mgmt_tunnels())
+
+    async def get_interfaces_vlans(self):
+        show_ports = await self.send_command("show ports", context=cli_context.HOME)
+        return self._build_interfaces_vlans(
+            self._parse_interface_list(show_ports),
+            await self._get_flows(),
+            await self._get_mgmt_tunnels(),
+        )
+
+    async def get_vlans(self):
+        return self._build_vlans(await self._get_flows(), await self._get_mgmt_tunnels())
+
+    async def get_lldp_neighbors(self):
+        return self._build_lldp_neighbors(
+            await self.send_command("show lldp detail", context=cli_context.HOME)
+        )
+
+    async def get_static_routes(self):
+        return self._build_static_routes(
+            await self.send_command("show ip-routes", context=cli_context.HOME)
+        )
+
+    async def get_mac_address_table(self):
+        if self.mac_tracker is None:
+            return [entry async for entry in self.iter_mac_address_table()]
+        return self.mac_tracker.update(await self._list_fwd_entries())[0]
+
+    async def get_mac_address_table_changes(self):
+        """Return the changes since the last poll, see AdvaDriver"""
+        if self.mac_tracker is None:
+            self.mac_tracker = MacTracker()
+        return self.mac_tracker.update(await self._list_fwd_entries())[1]
+
+    async def get_mac_address_table_compact(self):
+        """Return the MAC address table as a MacTable, see AdvaDriver"""
+        if self.mac_tracker is None:
+            table = MacTable()
+            async for entry in self.iter_mac_address_table():
+                table.append_dict(entry)
+            return table
+        return MacTable.from_dicts(self.mac_tracker.update(await self._list_fwd_entries())[0])
+
+    async def iter_mac_address_table(self, port=None, flow=None, mac_prefix=None, static=None):
+        """Yield the MAC address table flow by flow, see AdvaDriver"""
+        async for entry in self._iter_fwd_entries(port, flow):
+            if _mac_entry_matches(entry, mac_prefix, static):
+                yield entry
+
+    async def _list_fwd_entries(self):
+        return [entry async for entry in self._iter_fwd_entries()]
+
+    async def _iter_fwd_entries(self, port=None, flow=None):
+        ports, flows = _as_set(port), _as_set(flow)
+        show_ports = await self.send_command("show ports", context=cli_context.NTE)
+
+        for p in self._parse("show_ports_up_access", show_ports):
+            if not _port_may_match(p["port"], ports, flows):
+                continue
+
+            port_context = cli_context.NTE + (f"configure access-port {p['port']}",)
+            show_flows = await self.send_command("list flows", context=port_context)
+
+            for f in self._parse("show_port_flows", show_flows):
+                if flows is not None and f["flow"] not in flows:
+                    continue
+
+                list_fwd = await self.send_command(
+                    "list fwd-entries", context=port_context + (f"configure flow {f['flow']}",)
+                )
+                for entry in self._build_mac_entries(list_fwd):
+                    yield entry
+
+    async def get_config(self, retrieve="all", sanitized=False):
+        configs = {
+            "startup": "",
+            "running": "",
+            "candidate": "",
+        }
+
+        if retrieve in ("running", "all"):
+            configs["running"] = _strip_banner(
+                await self.send_command("show running-config delta", context=cli_context.HOME)
+            )
+
+        if retrieve in ("startup", "all"):
+            configs["startup"] = _strip_banner(
+                await self.send_command("show running-config delta", context=cli_context.HOME)
+            )
+
+        return configs
+
+    def load_merge_candidate(self, filename=None, config=None):
+        raise NotImplementedError("Config changes are only supported by AdvaDriver")
+
+    def load_replace_candidate(self, filename=None, config=None):
+        raise NotImplementedError("Config changes are only supported by AdvaDriver")
+
+    def commit_config(self, message=""):
+        raise NotImplementedError("Config changes are only supported by AdvaDriver")
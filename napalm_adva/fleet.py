@@ -0,0 +1,159 @@
+"""Run AdvaDriver getters across many devices concurrently."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from threading import Event
+import logging
+import time
+
+from napalm_adva.adva import AdvaDriver
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """A device or the whole run ran out of time."""
+
+
+class FleetResult(object):
+    """Outcome of one device.
+
+    results maps each getter that succeeded to its return value, errors maps each
+    step that failed ("open", a getter name or "close") to its exception.
+    """
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+        self.results = {}
+        self.errors = {}
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return "FleetResult(%r, results=%s, errors=%s)" % (
+            self.hostname,
+            sorted(self.results),
+            sorted(self.errors),
+        )
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class FleetRunner(object):
+    """Run getters on every device of an inventory, with bounded concurrency.
+
+    :param inventory: list of dicts with hostname, username, password and optionally
+        timeout and optional_args, as passed to the driver
+    :param getters: names of the getters to run on each device, in order
+    :param max_workers: maximum number of devices polled at once
+    :param device_timeout: seconds a device may take from open to its last getter,
+        checked before each getter. It is also the driver timeout, which bounds each
+        command, but a getter already running is not interrupted, so a device can
+        overrun by the time of its last getter.
+    :param deadline: seconds the whole run may take
+    :param driver: driver class, AdvaDriver or a subclass
+    """
+
+    def __init__(
+        self,
+        inventory,
+        getters,
+        max_workers=32,
+        device_timeout=None,
+        deadline=None,
+        driver=AdvaDriver,
+    ):
+        self.inventory = inventory
+        self.getters = getters
+        self.max_workers = max_workers
+        self.device_timeout = device_timeout
+        self.deadline = deadline
+        self.driver = driver
+
+        self._stop = Event()
+
+    def run(self):
+        """Yield a FleetResult for each device, as soon as it finishes
+
+        Devices still running when the deadline passes are yielded with a
+        DeadlineExceeded error, devices not started yet are never opened. Devices
+        that finished in time are yielded with their results, even when the caller
+        took until after the deadline to ask for them.
+        """
+        start = time.monotonic()
+        self._stop.clear()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {executor.submit(self._poll, device): device for device in self.inventory}
+        yielded = set()
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                yielded.add(future)
+                yield future.result()
+        except TimeoutError:
+            self._stop.set()
+            for future in futures:
+                if future.done() and future not in yielded:
+                    yielded.add(future)
+                    yield future.result()
+            for future, device in futures.items():
+                if future in yielded:
+                    continue
+                future.cancel()
+                result = FleetResult(device["hostname"])
+                result.errors["deadline"] = DeadlineExceeded(
+                    "Fleet deadline of %s seconds exceeded" % self.deadline
+                )
+                result.elapsed = time.monotonic() - start
+                yield result
+        finally:
+            # Also when the caller stops iterating early, devices still polling stop
+            self._stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run_all(self):
+        """Return the FleetResult of every device, keyed by hostname"""
+        return {result.hostname: result for result in self.run()}
+
+    def _poll(self, device):
+        result = FleetResult(device["hostname"])
+        start = time.monotonic()
+
+        driver = self.driver(
+            device["hostname"],
+            device["username"],
+            device["password"],
+            timeout=device.get("timeout", self.device_timeout or 60),
+            optional_args=device.get("optional_args"),
+        )
+        try:
+            driver.open()
+        except Exception as e:
+            result.errors["open"] = e
+            result.elapsed = time.monotonic() - start
+            return result
+
+        try:
+            for getter in self.getters:
+                if self._stop.is_set():
+                    result.errors[getter] = DeadlineExceeded("Fleet deadline exceeded")
+                    break
+                if self.device_timeout and time.monotonic() - start > self.device_timeout:
+                    result.errors[getter] = DeadlineExceeded(
+                        "Device timeout of %s seconds exceeded" % self.device_timeout
+                    )
+                    break
+
+                try:
+                    result.results[getter] = getattr(driver, getter)()
+                except Exception as e:
+                    logger.debug("%s failed on %s", getter, device["hostname"], exc_info=True)
+                    result.errors[getter] = e
+        finally:
+            try:
+                driver.close()
+            except Exception as e:
+                result.errors["close"] = e
+
+        result.elapsed = time.monotonic() - start
+        return result
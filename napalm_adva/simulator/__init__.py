@@ -0,0 +1,18 @@
+"""Local simulator of the FSP 150 CLI
+
+The devices, CLI sessions and SimulatedConnection only need the standard library.
+The SSH server, AdvaSimulator and create_server, needs asyncssh and is imported
+when first used.
+"""
+from napalm_adva.simulator.device import SimulatedDevice, SyntheticDevice  # noqa
+from napalm_adva.simulator.session import CLISession  # noqa
+
+__all__ = ("AdvaSimulator", "CLISession", "SimulatedDevice", "SyntheticDevice", "create_server")
+
+
+def __getattr__(name):
+    if name in ("AdvaSimulator", "create_server"):
+        from napalm_adva.simulator import server
+
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
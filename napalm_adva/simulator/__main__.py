@@ -0,0 +1,35 @@
+"""Serve a synthetic FSP 150: python -m napalm_adva.simulator --ports 64"""
+
+import argparse
+import asyncio
+
+from napalm_adva.simulator import SyntheticDevice
+from napalm_adva.simulator.server import create_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ports", type=int, default=8)
+    parser.add_argument("--flows", type=int, default=None)
+    parser.add_argument("--fwd-entries", type=int, default=0)
+    parser.add_argument("--hostname", default=None)
+    parser.add_argument("--host", default="127.0.0.1", help="loopback address to listen on")
+    parser.add_argument("--port", type=int, default=8022)
+    parser.add_argument("--latency", type=float, default=0, help="seconds per command")
+    args = parser.parse_args()
+
+    device = SyntheticDevice(args.ports, args.flows, args.fwd_entries, args.hostname)
+
+    async def serve():
+        server, port = await create_server(device, args.host, args.port, args.latency)
+        print(f"Serving {device.hostname} on {args.host}:{port}")
+        await server.wait_closed()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
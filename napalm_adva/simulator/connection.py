@@ -0,0 +1,63 @@
+"""In-process stand-in for the netmiko connection, talking to a SimulatedDevice."""
+
+import time
+
+from napalm_adva.simulator.session import CLISession
+
+
+class SimulatedConnection(object):
+    """Netmiko-like connection to a simulated device, without SSH.
+
+    Replaces AdvaDriver.device, e.g. to benchmark the driver without the cost of
+    the transport. Each exchange with the device waits for the latency of its
+    command, a pipelined batch waits once for the slowest of its commands.
+
+    :param device: SimulatedDevice answering the commands
+    :param latency: seconds per exchange, or a dict of command prefix to seconds
+    """
+
+    def __init__(self, device, latency=0):
+        self.session = CLISession(device, latency)
+        self.exchanges = 0
+        self.pending_commands = []
+
+    def _exchange(self, commands):
+        self.exchanges += 1
+        delay = max(self.session.delay(command) for command in commands)
+        if delay:
+            time.sleep(delay)
+
+    def send_command(self, command, strip_prompt=True, **kwargs):
+        self._exchange([command])
+        output = self.session.execute(command)
+        if not strip_prompt:
+            output = f"{output}\n{self.session.prompt}" if output else self.session.prompt
+        return output
+
+    def send_command_timing(self, command, **kwargs):
+        return self.send_command(command)
+
+    def send_multiline(self, commands, **kwargs):
+        self._exchange(commands)
+        return "\n".join(self.session.execute(command) for command in commands)
+
+    def write_channel(self, out_data):
+        self.pending_commands.extend(out_data.splitlines())
+
+    def read_until_pattern(self, pattern="", **kwargs):
+        """Echo every pending command followed by its output, like the CLI"""
+        self._exchange(self.pending_commands or [""])
+        # The prompt before the first command was read with the previous command
+        output = ""
+        for command in self.pending_commands:
+            if output:
+                output += f"{self.session.prompt} "
+            output += f"{command}\n{self.session.execute(command)}\n"
+        self.pending_commands = []
+        return output + self.session.prompt
+
+    def is_alive(self):
+        return True
+
+    def disconnect(self):
+        pass
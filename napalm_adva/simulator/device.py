@@ -0,0 +1,258 @@
+"""Devices answering the commands of the driver, for the simulator."""
+
+import os
+import zlib
+
+OUTPUTS = os.path.join(os.path.dirname(__file__), "outputs")
+
+PORTS_HEADER = (
+    "|Port Eid       |Admin State|Operational State|MAC Address      |Service Type |Config Speed\n"
+    "|---------------|-----------|-----------------|-----------------|-------------|--------------|"
+)
+FLOWS_HEADER = (
+    "|EID              |A2N CIR (bps) |A2N EIR (bps) |Flow Type\n"
+    "|-----------------|--------------|--------------|------------------|"
+)
+FWD_ENTRIES_HEADER = (
+    "|MAC Address       |Action     |Port           |Type      |Status    |Remaining Age (Sec)\n"
+    "|------------------|-----------|---------------|----------|----------|--------------------|"
+)
+IP_ROUTES_HEADER = (
+    "|Index|Subnet Mask    |Next Hop       |Destination    |Interface      |Metric|Type\n"
+    "|-----|---------------|---------------|---------------|---------------|------|------|"
+)
+
+_outputs = {}
+
+
+def load_output(name):
+    """Return the output template name, from the outputs directory"""
+    if name not in _outputs:
+        with open(os.path.join(OUTPUTS, f"{name}.txt")) as stream:
+            _outputs[name] = stream.read()
+    return _outputs[name]
+
+
+class SimulatedDevice(object):
+    """Base of the devices served by the simulator.
+
+    The CLI session tracks the context, a list of the names shown in the prompt,
+    e.g. ["NE-1", "ntexg108-1-1-1", "access-1-1-1-3"]. output returns the output
+    of a command in a context, or None for an unknown command.
+    """
+
+    hostname = "SIM-FSP150XG108"
+    nte = "ntexg108-1-1-1"
+
+    def exists(self, name):
+        """Whether an access port or flow can be configured"""
+        return True
+
+    def output(self, context, command):
+        return None
+
+
+class SyntheticDevice(SimulatedDevice):
+    """A generated FSP 150 of any size.
+
+    The first two ports are network ports, the others access ports. Flows are spread
+    round robin over the access ports, and forwarding entries over the flows. Access
+    ports with a flow are in service.
+
+    :param ports: number of ports
+    :param flows: number of flows, one per access port by default
+    :param fwd_entries: number of MAC forwarding entries
+    :param hostname: system name, also the prompt
+    """
+
+    def __init__(self, ports=8, flows=None, fwd_entries=0, hostname=None):
+        if hostname is not None:
+            self.hostname = hostname
+
+        network_ports = min(2, ports)
+        self.ports = {}
+        for index in range(1, ports + 1):
+            kind = "network" if index <= network_ports else "access"
+            self.ports[f"{kind}-1-1-1-{index}"] = {
+                "index": index,
+                "mac": "84:c8:07:00:%02x:%02x" % (index >> 8, index & 0xFF),
+                "adminstate": "in-service" if kind == "network" else "unassigned",
+                "operationalstate": "normal" if kind == "network" else "outage",
+                "service": "Not Available" if kind == "network" else "epl",
+                "speed": "fixed-10g-full" if kind == "network" else "auto-1000-full",
+                "mtu": 9600,
+                "alias": "",
+            }
+
+        access_ports = [name for name in self.ports if name.startswith("access")]
+        network_names = [name for name in self.ports if name.startswith("network")]
+        if flows is None:
+            flows = len(access_ports)
+        if not access_ports or not network_names:
+            flows = 0
+
+        self.flows = {}
+        for j in range(flows):
+            access = access_ports[j % len(access_ports)]
+            name = "flow-%s-%d" % (access.split("-", 1)[1], j // len(access_ports) + 1)
+            self.flows[name] = {
+                "accessinterface": access,
+                "networkinterface": network_names[j % len(network_names)],
+                "vlan": 1000 + j % 3000,
+                "circuitname": f"SIM-{j + 1}",
+            }
+            self.ports[access]["adminstate"] = "in-service"
+            self.ports[access]["operationalstate"] = "normal"
+
+        self.fwd_entries = {name: [] for name in self.flows}
+        flow_names = list(self.flows)
+        for k in range(fwd_entries if flow_names else 0):
+            flow = self.flows[flow_names[k % len(flow_names)]]
+            static = k % 10 == 9
+            self.fwd_entries[flow_names[k % len(flow_names)]].append(
+                (
+                    "02:00:%02x:%02x:%02x:%02x"
+                    % (k >> 24 & 0xFF, k >> 16 & 0xFF, k >> 8 & 0xFF, k & 0xFF),
+                    flow["accessinterface"] if k % 2 else flow["networkinterface"],
+                    "static" if static else "dynamic",
+                    "" if static else str(300 - k % 300),
+                )
+            )
+
+    def exists(self, name):
+        return name in self.ports or name in self.flows
+
+    def output(self, context, command):
+        if command.startswith("show "):
+            return self._show(command[5:])
+        if command == "list flows" and len(context) == 3:
+            return self._list_flows(context[-1])
+        if command == "list fwd-entries" and len(context) == 4:
+            return self._list_fwd_entries(context[-1])
+        return None
+
+    def _show(self, what):
+        words = what.split()
+        if what == "system":
+            return load_output("show_system").format(
+                hostname=self.hostname,
+                model="FSP 150-XG108",
+                version="13.7.1-84",
+                uptime="5 days 2 hrs 24 mins 34 secs",
+            )
+        if what == "shelf-info":
+            return load_output("show_shelf_info").format(
+                shelf="XG108", serial="SIM%010d" % zlib.crc32(self.hostname.encode())
+            )
+        if what == "ports":
+            return self._show_ports()
+        if len(words) == 2 and words[0] in ("network-port", "access-port"):
+            port = self.ports.get(words[1])
+            if port is None or not words[1].startswith(words[0][:-5]):
+                return None
+            return load_output("show_port_details").format(**port)
+        if len(words) == 2 and words[0] == "flow" and words[1] in self.flows:
+            return load_output("show_flow").format(**self.flows[words[1]])
+        if what == "running-config delta":
+            return self._running_config(flows=True, mgmttnl=True)
+        if what == "running-config delta partition flow":
+            return self._running_config(flows=True)
+        if what == "running-config delta partition mgmttnl":
+            return self._running_config(mgmttnl=True)
+        if what == "lldp detail":
+            return self._show_lldp_detail()
+        if what == "ip-routes":
+            return "\n".join(
+                [
+                    IP_ROUTES_HEADER,
+                    "|1    |255.255.255.0  |10.0.0.254     |192.168.0.0    |network-1-1-1-1|1     "
+                    "|static",
+                ]
+            )
+        if what == "configfile-status":
+            return (
+                "            Configuration File Action : load\n"
+                "            Configuration File Status : success\n"
+                "Configuration File Error Information : none"
+            )
+        return None
+
+    def _show_ports(self):
+        lines = [PORTS_HEADER]
+        for name, port in self.ports.items():
+            lines.append(
+                "|%-15s|%-11s|%-17s|%-17s|%-13s|%s"
+                % (
+                    name,
+                    port["adminstate"],
+                    port["operationalstate"],
+                    port["mac"],
+                    port["service"],
+                    port["speed"],
+                )
+            )
+        return "\n".join(lines)
+
+    def _show_lldp_detail(self):
+        entries = []
+        for name, port in self.ports.items():
+            if name.startswith("network"):
+                entries.append(
+                    load_output("show_lldp_detail").format(
+                        localport=name,
+                        index=port["index"],
+                        chassisid="28:99:3a:de:93:%02x" % (port["index"] & 0xFF),
+                        portid=f"Ethernet{port['index']}",
+                        description=f"{self.hostname}:{name}",
+                        hostname=f"SIM-AGG-{port['index']}",
+                    )
+                )
+        return "".join(entries)
+
+    def _running_config(self, flows=False, mgmttnl=False):
+        lines = ["Preparing configuration file...", ""]
+        if mgmttnl:
+            lines += [
+                "#",
+                "#CLI:MANAGEMENT TUNNEL-1  Create",
+                "#",
+                "home",
+                "configure communication",
+                '  add mgmttunnel 1 "DCN" network-1-1-1-1 ethernet vlan-based ipv4-only enabled '
+                "433 disabled 64000 768000 disabled 10.0.0.1 255.255.255.0",
+                "  configure mgmttnl mgmt_tnl-1",
+                "    dhcp-client-id-control disabled",
+                "",
+            ]
+        if flows:
+            for name, flow in self.flows.items():
+                lines += [
+                    "#",
+                    f"#CLI:{name.upper()}  Edit",
+                    "#",
+                    "home",
+                    "network-element ne-1",
+                    f"  configure nte {self.nte}",
+                    f"    configure access-port {flow['accessinterface']}",
+                    f"      configure flow {name}",
+                    f"        access-interface {flow['accessinterface']} network-interface "
+                    f"{flow['networkinterface']} push {flow['vlan']}-0 none "
+                    "n2a-prio-mapping-profile none a2n-prio-mapping-profile none",
+                    f'        circuit-name "{flow["circuitname"]}"',
+                    "",
+                ]
+        lines.append("#end")
+        return "\n".join(lines)
+
+    def _list_flows(self, port):
+        lines = [FLOWS_HEADER]
+        for name, flow in self.flows.items():
+            if flow["accessinterface"] == port:
+                lines.append("|%-17s|%-14s|%-14s|policed-and-shaped" % (name, 832000, 0))
+        return "\n".join(lines)
+
+    def _list_fwd_entries(self, flow):
+        lines = [FWD_ENTRIES_HEADER]
+        for mac, port, kind, age in self.fwd_entries.get(flow, []):
+            lines.append("|%-18s|forward    |%-15s|%-10s|Valid     |%s" % (mac, port, kind, age))
+        return "\n".join(lines)
@@ -0,0 +1,139 @@
+"""SSH server speaking the FSP 150 CLI of a SimulatedDevice.
+
+The server accepts any username and password, so it only binds loopback addresses.
+"""
+
+import asyncio
+import ipaddress
+import threading
+
+import asyncssh
+
+from napalm_adva.simulator.session import CLISession
+
+
+async def _handle(session, process):
+    """Serve a CLISession over an SSH process, until the client disconnects"""
+    process.stdout.write(f"{session.prompt} ")
+    try:
+        while True:
+            line = await process.stdin.readline()
+            if not line:
+                break
+            command = line.strip()
+            process.stdout.write(f"{command}\r\n")
+            if command:
+                delay = session.delay(command)
+                if delay:
+                    await asyncio.sleep(delay)
+                # Netmiko returns the output up to the line of the prompt
+                output = session.execute(command)
+                if output:
+                    output = output.replace("\r\n", "\n")
+                    process.stdout.write(output.replace("\n", "\r\n") + "\r\n")
+            process.stdout.write(f"{session.prompt} ")
+    except asyncssh.BreakReceived:
+        pass
+    finally:
+        process.exit(0)
+
+
+class _Server(asyncssh.SSHServer):
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return True
+
+
+def _check_loopback(host):
+    """Raise ValueError unless host is a loopback address"""
+    if host == "localhost":
+        return
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+    raise ValueError("The simulator accepts any password, it only listens on loopback")
+
+
+async def create_server(device, host="127.0.0.1", port=0, latency=0):
+    """Start an SSH server for device, returns it and the port it listens on
+
+    :param device: SimulatedDevice shared by all sessions, or a callable taking the
+        username and returning the device of the session
+    :param host: loopback address to listen on
+    """
+    _check_loopback(host)
+
+    async def handle_client(process):
+        if callable(device):
+            session_device = device(process.get_extra_info("username"))
+        else:
+            session_device = device
+        await _handle(CLISession(session_device, latency), process)
+
+    server = await asyncssh.create_server(
+        _Server,
+        host,
+        port,
+        server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        process_factory=handle_client,
+        line_editor=False,
+    )
+    return server, server.sockets[0].getsockname()[1]
+
+
+class AdvaSimulator(object):
+    """Simulator running its event loop in a background thread, for blocking clients.
+
+    >>> with AdvaSimulator(SyntheticDevice(ports=64)) as simulator:
+    ...     driver = AdvaDriver("127.0.0.1", "admin", "pwd",
+    ...                         optional_args={"port": simulator.port})
+    """
+
+    def __init__(self, device, host="127.0.0.1", port=0, latency=0):
+        self.device = device
+        self.host = host
+        self.port = port
+        self.latency = latency
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start serving, returns the port"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        future = asyncio.run_coroutine_threadsafe(
+            create_server(self.device, self.host, self.port, self.latency), self._loop
+        )
+        self._server, self.port = future.result()
+        return self.port
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
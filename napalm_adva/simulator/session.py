@@ -0,0 +1,84 @@
+"""The FSP 150 CLI of a SimulatedDevice, without the SSH transport."""
+
+import logging
+
+ERROR = "Error: Invalid command"
+
+logger = logging.getLogger(__name__)
+
+
+class CLISession(object):
+    """One CLI session on a device.
+
+    The prompt follows network-element, configure, back and home like on the device:
+    HOST--> at home, HOST-NE-1--> in the network element and HOST-NE-1:<name>--> in
+    the nte, an access-port or a flow. configure system and admin config keep the
+    prompt of home.
+
+    :param device: SimulatedDevice answering the commands
+    :param latency: seconds before each output, or a dict of command prefix to
+        seconds where the longest matching prefix wins
+    """
+
+    def __init__(self, device, latency=0):
+        self.device = device
+        self.latency = latency
+        # Names shown in the prompt, None for contexts the prompt does not show
+        self.context = []
+
+    @property
+    def prompt(self):
+        names = [name for name in self.context if name]
+        hostname = self.device.hostname
+        if not names:
+            return f"{hostname}-->"
+        if len(names) == 1:
+            return f"{hostname}-{names[0]}-->"
+        return f"{hostname}-{names[0]}:{names[-1]}-->"
+
+    def delay(self, command):
+        if not isinstance(self.latency, dict):
+            return self.latency
+        prefixes = [prefix for prefix in self.latency if command.startswith(prefix)]
+        if not prefixes:
+            return 0
+        return self.latency[max(prefixes, key=len)]
+
+    def navigate(self, command):
+        """Move to the context entered by command, returns False if it is not a navigation"""
+        words = command.split()
+        if command == "home":
+            self.context = []
+        elif command == "back":
+            self.context = self.context[:-1]
+        elif words[0] == "network-element" and len(words) == 2 and not self.context:
+            self.context = [words[1].upper()]
+        elif command in ("configure system", "configure communication", "admin config"):
+            if self.context:
+                return False
+            self.context = [None]
+        elif words[0] == "configure" and len(words) == 3:
+            if not self.context or not self.context[0]:
+                return False
+            if words[1] == "nte":
+                self.context = self.context[:1] + [self.device.nte]
+            elif len(self.context) >= 2 and self.device.exists(words[2]):
+                self.context.append(words[2])
+            else:
+                return False
+        else:
+            return False
+        return True
+
+    def execute(self, command):
+        """Return the output of command"""
+        if not command or command == "terminal length 0":
+            return ""
+        if self.navigate(command):
+            return ""
+        try:
+            output = self.device.output(self.context, command)
+        except Exception:
+            logger.exception("Simulated device failed on %r", command)
+            output = None
+        return ERROR if output is None else output
@@ -0,0 +1,108 @@
+"""CLI contexts and the navigation between them.
+
+A context is the tuple of commands that enter it from home, for example
+("network-element ne-1", "configure nte nte", "configure access-port access-1-1-1-3").
+The empty tuple is home, None is a context the driver lost track of.
+
+The prompt shows the innermost context: HOST--> at home, HOST-NE-1--> in the
+network element, and HOST-NE-1:<name>--> in the nte, an access-port or a flow.
+"""
+
+import re
+
+HOME = ()
+NETWORK_ELEMENT = ("network-element ne-1",)
+NTE = NETWORK_ELEMENT + ("configure nte nte",)
+SYSTEM = ("configure system",)
+ADMIN_CONFIG = ("admin config",)
+
+# The CLI name of a configured entity can extend the one in the command, e.g.
+# "configure nte nte" enters ntexg108-1-1-1
+PROMPT = re.compile(r"(?:-(?P<ne>NE-\d+))?(?::(?P<name>\S+?))?-->\s*$")
+
+
+def is_navigation(command):
+    return command in ("home", "back") or command.startswith(
+        ("network-element ", "configure ", "admin ")
+    )
+
+
+def enter(context, command):
+    """Return the context after command was sent in context"""
+    if command == "home":
+        return HOME
+    if context is None:
+        return None
+    if command == "back":
+        return context[:-1]
+    if command.startswith(("network-element ", "configure ", "admin ")):
+        return context + (command,)
+    return context
+
+
+def plan(current, target):
+    """Return the fewest navigation commands that move from current to target
+
+    Either steps back to the common parent and enters the rest of target, or goes
+    home and enters all of target. An unknown current context always goes home.
+    """
+    target = tuple(target)
+    if current == target:
+        return []
+
+    via_home = ["home"] + list(target)
+    if current is None:
+        return via_home
+
+    common = 0
+    for a, b in zip(current, target):
+        if a != b:
+            break
+        common += 1
+    via_back = ["back"] * (len(current) - common) + list(target[common:])
+
+    return via_back if len(via_back) < len(via_home) else via_home
+
+
+def expect_string(command):
+    """Pattern of the prompt after command, to read up to"""
+    words = command.split()
+    if words[0] == "network-element":
+        return rf"{re.escape(words[1].upper())}-->"
+    if words[0] == "configure" and len(words) == 3:
+        return rf":{re.escape(words[2])}\S*-->"
+    return r"-->"
+
+
+def expected_name(context):
+    """Name the prompt shows in context, None if it cannot be predicted"""
+    if not context:
+        return ""
+    words = context[-1].split()
+    if words[0] == "network-element":
+        return words[1].upper()
+    if words[0] == "configure" and len(words) == 3:
+        return words[2]
+    return None
+
+
+def prompt_name(prompt):
+    """Name of the innermost context shown by prompt, "" at home
+
+    Returns None when prompt is not an Adva prompt.
+    """
+    match = PROMPT.search(prompt)
+    if match is None:
+        return None
+    return match.group("name") or match.group("ne") or ""
+
+
+def matches(context, prompt):
+    """Whether prompt is the prompt of context, True when that cannot be told"""
+    expected = expected_name(context)
+    name = prompt_name(prompt)
+    if expected is None or name is None:
+        return True
+    if not expected:
+        return not name
+    return name.upper().startswith(expected.upper())
@@ -0,0 +1,80 @@
+"""Session scoped cache of command output."""
+
+from collections import OrderedDict
+from threading import Lock
+import time
+
+# Only read commands are cached, everything else changes the device or CLI context
+CACHEABLE_COMMANDS = ("show ", "list")
+
+# The MAC forwarding entries change with the traffic, they are not cached by default
+DEFAULT_COMMAND_TTLS = {"list fwd-entries": 0}
+
+
+class CommandCache(object):
+    """Cache of command output keyed by CLI context and command.
+
+    :param ttl: seconds an output stays valid
+    :param max_size: maximum number of outputs kept, least recently used are dropped
+    :param command_ttls: ttl per command prefix, the longest matching prefix wins.
+        A ttl of 0 disables caching for those commands. They are added to
+        DEFAULT_COMMAND_TTLS, and override the prefixes in both.
+    """
+
+    def __init__(self, ttl=60, max_size=256, command_ttls=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.command_ttls = dict(DEFAULT_COMMAND_TTLS, **(command_ttls or {}))
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_ttl(self, command):
+        """Return the ttl for command, 0 if it must not be cached"""
+        if not command.startswith(CACHEABLE_COMMANDS):
+            return 0
+
+        prefixes = [p for p in self.command_ttls if command.startswith(p)]
+        if prefixes:
+            return self.command_ttls[max(prefixes, key=len)]
+        return self.ttl
+
+    def get(self, context, command):
+        """Return the cached output, or None on a miss"""
+        key = (context, command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, context, command, output):
+        """Cache output, if the command is cacheable"""
+        ttl = self.get_ttl(command)
+        if not ttl:
+            return
+
+        with self._lock:
+            self._entries[(context, command)] = (time.monotonic() + ttl, output)
+            self._entries.move_to_end((context, command))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop all cached output"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
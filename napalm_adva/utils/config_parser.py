@@ -0,0 +1,307 @@
+"""Parser for the output of show running-config delta.
+
+The running config is a list of #CLI: blocks. Every block starts from home,
+and the indentation of each command is the CLI context it is entered in:
+
+    #
+    #CLI:FLOW-1-1-1-3-1  Edit
+    #
+    home
+    network-element ne-1
+      configure nte nte104_e-1-1-1
+        configure access-port access-1-1-1-3
+          configure flow flow-1-1-1-3-1
+            circuit-name "TESTING"
+"""
+
+import difflib
+import re
+import shlex
+
+BLOCK_HEADER = re.compile(r"^#CLI:(?P<name>.*?)\s{2,}(?P<action>\S+)\s*$")
+MGMT_TUNNEL = re.compile(
+    r'^add mgmttunnel\s\d\s"(?P<circuitname>\S+)"\s(?P<port>\S+).*\D+\s(?P<vlan>\d{0,4})'
+    r"\s\D+.*\s(?P<ipaddress>\S+)\s(?P<subnet>\S+)"
+)
+
+# The delta config only has a circuit name when one was set. The admin state a flow
+# is created with depends on the firmware, so it is read with show flow when missing
+FLOW_DEFAULTS = {
+    "adminstate": None,
+    "circuitname": "",
+}
+
+
+class ConfigNode(object):
+    """A command in the running config, with the commands entered in its context."""
+
+    def __init__(self, command, parent=None):
+        self.command = command
+        self.parent = parent
+        self.children = []
+
+    def __repr__(self):
+        return "ConfigNode(%r)" % self.command
+
+    def find(self, prefix):
+        """Return children whose command starts with prefix"""
+        return [c for c in self.children if c.command.startswith(prefix)]
+
+    def walk(self):
+        """Yield every node below this one, depth first"""
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+
+def parse_running_config(text):
+    """Parse show running-config delta into a tree of ConfigNode
+
+    Blocks entering the same context are merged, so the tree has a single node for
+    each context. The block names and actions are kept in root.blocks.
+    """
+    root = ConfigNode("home")
+    root.blocks = []
+
+    stack = [(-1, root)]
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+
+        if line.startswith("#"):
+            header = BLOCK_HEADER.match(line)
+            if header:
+                root.blocks.append((header.group("name"), header.group("action")))
+            stack = [(-1, root)]
+            continue
+
+        command = line.strip()
+        if command == "home":
+            stack = [(-1, root)]
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+
+        node = None
+        if command.startswith(("network-element ", "configure ")):
+            node = next((c for c in parent.children if c.command == command), None)
+        if node is None:
+            node = ConfigNode(command, parent)
+            parent.children.append(node)
+        stack.append((indent, node))
+
+    return root
+
+
+def _argument(node):
+    """Return the argument of a context command, e.g. the flow of configure flow X"""
+    return node.command.split()[-1]
+
+
+def get_flows(root):
+    """Return flows as network element -> nte -> port -> flow -> flow data
+
+    Flow data uses the keys of the show_flow template. Fields the config does not
+    carry are None, and need to be read with show flow.
+    """
+    result = {}
+    for ne in root.find("network-element "):
+        for nte in ne.find("configure nte "):
+            for port in nte.find("configure access-port "):
+                for flow in port.find("configure flow "):
+                    flow_data = {
+                        "adminstate": FLOW_DEFAULTS["adminstate"],
+                        "circuitname": FLOW_DEFAULTS["circuitname"],
+                        "vlan": None,
+                        "networkinterface": None,
+                        "accessinterface": _argument(port),
+                    }
+                    for command in flow.children:
+                        flow_data.update(_parse_flow_command(command.command))
+
+                    result.setdefault(_argument(ne), {}).setdefault(
+                        _argument(nte), {}
+                    ).setdefault(_argument(port), {})[_argument(flow)] = flow_data
+
+    return result
+
+
+def iter_flows(flows):
+    """Yield (flow name, flow data) from the get_flows tree, in config order"""
+    for ntes in flows.values():
+        for ports in ntes.values():
+            for port_flows in ports.values():
+                yield from port_flows.items()
+
+
+def _parse_flow_command(command):
+    """Return the flow data fields set by a command in a configure flow context"""
+    tokens = shlex.split(command)
+    keyword = tokens[0]
+    data = {}
+
+    if keyword == "circuit-name" and len(tokens) > 1:
+        data["circuitname"] = tokens[1]
+    elif keyword == "admin-state" and len(tokens) > 1:
+        data["adminstate"] = tokens[1]
+    elif keyword in ("access-interface", "ctag"):
+        for key, value in zip(tokens, tokens[1:]):
+            if key == "access-interface":
+                data["accessinterface"] = value
+            elif key == "network-interface":
+                data["networkinterface"] = value
+            elif key == "push":
+                data["vlan"] = value.split("-")[0]
+
+    return data
+
+
+def get_mgmt_tunnels(root):
+    """Return management tunnels, with the keys of the show_run_mgmttnl template"""
+    result = []
+    for node in root.walk():
+        match = MGMT_TUNNEL.match(node.command)
+        if match:
+            result.append(match.groupdict())
+    return result
+
+
+def _is_context(command):
+    return command.startswith(("network-element ", "configure "))
+
+
+# A name ending in an index, e.g. access-1-1-1-1, is a whole entity name
+ENTITY_NAME = re.compile(r"-\d+$")
+
+# Commands that create or remove an item, every one changes the config
+ACTIONS = ("add", "create", "delete", "remove", "no")
+
+
+def _find_context(parent, command):
+    """Return the child of parent entering the context of command
+
+    The CLI accepts a prefix of the name, e.g. configure nte nte enters
+    nte104_e-1-1-1, so the candidate may name a context by a prefix. A prefix only
+    matches when a single context starts with it, and an entity name such as
+    access-1-1-1-1 only matches itself, not access-1-1-1-10.
+    """
+    words = command.split()
+    name = words[-1].lower()
+    prefixed = []
+    for child in parent.children:
+        if not _is_context(child.command):
+            continue
+        child_words = child.command.split()
+        if child_words[:-1] != words[:-1]:
+            continue
+        if child_words[-1].lower() == name:
+            return child
+        if child_words[-1].lower().startswith(name):
+            prefixed.append(child)
+
+    if len(prefixed) == 1 and not ENTITY_NAME.search(name):
+        return prefixed[0]
+    return None
+
+
+def _find_setting(parent, command):
+    """Return the child of parent setting the same value as command
+
+    Commands starting with the same keyword set the same value, the later one wins.
+    add/delete commands create or remove items, they never replace another command.
+    """
+    keyword = command.split()[0]
+    if keyword in ACTIONS:
+        return None
+    for child in parent.children:
+        if not _is_context(child.command) and child.command.split()[0] == keyword:
+            return child
+    return None
+
+
+def _find_match(parent, command):
+    if _is_context(command):
+        return _find_context(parent, command)
+    return _find_setting(parent, command)
+
+
+def merge(running, candidate):
+    """Return a new tree with candidate applied on top of running
+
+    Context commands of candidate are matched to the ones of running, settings of
+    candidate replace the settings with the same keyword. add/delete commands are
+    always applied, the running config cannot tell whether they would succeed.
+    """
+    result = _copy(running)
+    _merge_into(result, candidate)
+    return result
+
+
+def _copy(node, parent=None):
+    copy = ConfigNode(node.command, parent)
+    copy.children = [_copy(child, copy) for child in node.children]
+    return copy
+
+
+def _merge_into(target, source):
+    for child in source.children:
+        match = _find_match(target, child.command)
+        if match is None:
+            target.children.append(_copy(child, target))
+        elif _is_context(child.command):
+            _merge_into(match, child)
+        else:
+            match.command = child.command
+
+
+def canonical(running, candidate):
+    """Return a copy of candidate naming its contexts like running does"""
+    result = _copy(candidate)
+    _rename_contexts(running, result)
+    return result
+
+
+def _rename_contexts(running, candidate):
+    for child in candidate.children:
+        if not _is_context(child.command):
+            continue
+        match = _find_match(running, child.command)
+        if match is not None:
+            child.command = match.command
+            _rename_contexts(match, child)
+
+
+def render(root):
+    """Return the lines of a tree, indented by their context"""
+    lines = []
+    for child in root.children:
+        _render(child, 0, lines)
+    return lines
+
+
+def _render(node, depth, lines):
+    lines.append("  " * depth + node.command)
+    for child in node.children:
+        _render(child, depth + 1, lines)
+
+
+def diff(running_config, candidate_config, replace=False):
+    """Unified diff between the running config and the result of loading candidate
+
+    With replace, candidate is the whole config, otherwise it is merged into the
+    running config. Returns "" when loading candidate would change nothing.
+    """
+    running = parse_running_config(running_config)
+    candidate = parse_running_config(candidate_config)
+    if replace:
+        result = canonical(running, candidate)
+    else:
+        result = merge(running, candidate)
+
+    lines = difflib.unified_diff(
+        render(running), render(result), "running", "candidate", lineterm=""
+    )
+    return "\n".join(lines)
@@ -0,0 +1,129 @@
+"""SSH sessions kept open between driver sessions."""
+
+from collections import defaultdict, deque
+import logging
+from threading import Lock
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool(object):
+    """Idle SSH sessions, keyed by (host, port, username).
+
+    A driver takes a session with acquire and gives it back with release, instead
+    of connecting and disconnecting. Sessions idle for longer than idle_timeout are
+    disconnected, and at most max_size idle sessions are kept, the sessions idle
+    the longest are disconnected first.
+
+    :param max_size: maximum number of idle sessions, across all keys
+    :param idle_timeout: seconds a session may stay idle
+    """
+
+    def __init__(self, max_size=64, idle_timeout=300):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+
+        self.hits = 0
+        self.misses = 0
+
+        # key -> deque of (released, connection), most recently released last
+        self._idle = defaultdict(deque)
+        self._lock = Lock()
+
+    def __len__(self):
+        return sum(len(idle) for idle in self._idle.values())
+
+    def acquire(self, key, connect, check=None):
+        """Return an idle session for key that passes check, or connect a new one
+
+        :param connect: callable returning a new session
+        :param check: callable taking a session, returns False or raises when the
+            session cannot be used
+        """
+        while True:
+            with self._lock:
+                evicted = self._evict()
+                idle = self._idle.get(key)
+                found = bool(idle)
+                if found:
+                    connection = idle.pop()[1]
+            _disconnect_all(evicted)
+            if not found:
+                break
+
+            try:
+                if check is None or check(connection):
+                    with self._lock:
+                        self.hits += 1
+                    return connection
+            except Exception:
+                logger.debug("Pooled session to %s failed its check", key[0], exc_info=True)
+            _disconnect(connection)
+
+        with self._lock:
+            self.misses += 1
+        return connect()
+
+    def release(self, key, connection):
+        """Give a session back for reuse"""
+        with self._lock:
+            self._idle[key].append((time.monotonic(), connection))
+            evicted = self._evict()
+        _disconnect_all(evicted)
+
+    def clear(self):
+        """Disconnect every idle session"""
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(deque)
+        _disconnect_all(connection for sessions in idle.values() for _, connection in sessions)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def _evict(self):
+        """Remove expired sessions, then the oldest until max_size are left
+
+        Returns the removed sessions, to disconnect without holding the lock.
+        """
+        expired = time.monotonic() - self.idle_timeout
+        evicted = []
+
+        for key, idle in list(self._idle.items()):
+            while idle and idle[0][0] < expired:
+                evicted.append(idle.popleft()[1])
+            if not idle:
+                del self._idle[key]
+
+        while len(self) > self.max_size:
+            key = min(self._idle, key=lambda k: self._idle[k][0][0])
+            evicted.append(self._idle[key].popleft()[1])
+            if not self._idle[key]:
+                del self._idle[key]
+
+        return evicted
+
+
+def _disconnect(connection):
+    try:
+        connection.disconnect()
+    except Exception:
+        logger.debug("Error disconnecting pooled session", exc_info=True)
+
+
+def _disconnect_all(connections):
+    for connection in connections:
+        _disconnect(connection)
+
+
+_pool = None
+_pool_lock = Lock()
+
+
+def get_pool(**kwargs):
+    """Return the process wide ConnectionPool, kwargs are used when it is created"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(**kwargs)
+        return _pool
@@ -0,0 +1,157 @@
+"""Compact MAC address table, for tables too large to keep as dicts."""
+
+from array import array
+
+# Bits of the flags column
+STATIC = 1
+ACTIVE = 2
+
+
+def mac_to_int(mac):
+    """48-bit integer of a MAC address such as "00:00:5e:00:01:0a" """
+    return int(mac.replace(":", ""), 16)
+
+
+def int_to_mac(value):
+    """MAC address of a 48-bit integer, in lower case as the device prints it"""
+    digits = "%012x" % value
+    return ":".join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+class MacEntry(object):
+    """One row of a MacTable."""
+
+    __slots__ = ("mac", "interface", "static", "active", "moves", "last_move")
+
+    def __init__(self, mac, interface, static, active, moves=-1, last_move=-1.0):
+        self.mac = mac
+        self.interface = interface
+        self.static = static
+        self.active = active
+        self.moves = moves
+        self.last_move = last_move
+
+    def __eq__(self, other):
+        if not isinstance(other, MacEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "MacEntry(%s)" % ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self.__slots__
+        )
+
+    def as_dict(self):
+        """The entry in the NAPALM get_mac_address_table format"""
+        return {
+            "mac": self.mac,
+            "interface": self.interface,
+            "vlan": -1,
+            "static": self.static,
+            "active": self.active,
+            "moves": self.moves,
+            "last_move": self.last_move,
+        }
+
+
+class MacTable(object):
+    """MAC address table stored column by column in arrays.
+
+    MACs are stored as 48-bit integers and interfaces as indexes into a list of
+    the distinct interface names, static and active share a byte of flags. That
+    is about 23 bytes per entry, against several hundred for a dict. The vlan is
+    always -1 on the FSP 150, so it is not stored.
+
+    Iterating yields a MacEntry per row, built on the fly. The index for lookups
+    by MAC is built on the first lookup.
+    """
+
+    def __init__(self, entries=()):
+        self.macs = array("Q")
+        self.interface_ids = array("H")
+        self.flags = array("B")
+        self.moves = array("i")
+        self.last_moves = array("d")
+        self.interfaces = []
+
+        self._interface_ids = {}
+        self._index = None
+        self.extend(entries)
+
+    @classmethod
+    def from_dicts(cls, entries):
+        """Table of entries in the NAPALM get_mac_address_table format"""
+        table = cls()
+        for entry in entries:
+            table.append_dict(entry)
+        return table
+
+    def append(self, mac, interface, static, active, moves=-1, last_move=-1.0):
+        interface_id = self._interface_ids.get(interface)
+        if interface_id is None:
+            interface_id = self._interface_ids[interface] = len(self.interfaces)
+            self.interfaces.append(interface)
+
+        self.macs.append(mac_to_int(mac))
+        self.interface_ids.append(interface_id)
+        self.flags.append((STATIC if static else 0) | (ACTIVE if active else 0))
+        self.moves.append(moves)
+        self.last_moves.append(last_move)
+        self._index = None
+
+    def append_dict(self, entry):
+        """Append an entry in the NAPALM get_mac_address_table format"""
+        self.append(
+            entry["mac"],
+            entry["interface"],
+            entry["static"],
+            entry["active"],
+            entry["moves"],
+            entry["last_move"],
+        )
+
+    def extend(self, entries):
+        """Append MacEntry records"""
+        for entry in entries:
+            self.append(
+                entry.mac,
+                entry.interface,
+                entry.static,
+                entry.active,
+                entry.moves,
+                entry.last_move,
+            )
+
+    def __len__(self):
+        return len(self.macs)
+
+    def __getitem__(self, row):
+        flags = self.flags[row]
+        return MacEntry(
+            int_to_mac(self.macs[row]),
+            self.interfaces[self.interface_ids[row]],
+            bool(flags & STATIC),
+            bool(flags & ACTIVE),
+            self.moves[row],
+            self.last_moves[row],
+        )
+
+    def __iter__(self):
+        for row in range(len(self.macs)):
+            yield self[row]
+
+    def __contains__(self, mac):
+        return self.get(mac) is not None
+
+    def get(self, mac, default=None):
+        """First entry of mac, the same MAC can be in several flows"""
+        if self._index is None:
+            self._index = {}
+            for row, value in enumerate(self.macs):
+                self._index.setdefault(value, row)
+        row = self._index.get(mac_to_int(mac))
+        return default if row is None else self[row]
+
+    def to_dicts(self):
+        """The table in the NAPALM get_mac_address_table format"""
+        return [entry.as_dict() for entry in self]
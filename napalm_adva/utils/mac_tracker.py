@@ -0,0 +1,88 @@
+"""MAC address table changes between polls."""
+
+import time
+
+
+class MacTracker(object):
+    """Remembers the MAC address table between polls, to report what changed.
+
+    Each MAC is kept as one tuple (interface, vlan, static, active, moves, last_move).
+    A MAC moves when it is seen on another interface than in the previous poll.
+
+    last_move is the Unix time of the poll that saw the move, -1.0 until a move was
+    seen. The remaining age of an entry restarts with every frame from the MAC, so
+    it tells when the MAC was last seen, not when it was learned.
+    """
+
+    def __init__(self):
+        self._index = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def update(self, entries, now=None):
+        """Record a full poll
+
+        :param entries: every entry of the MAC address table
+        :param now: time of the poll, defaults to the current time
+
+        Fills moves and last_move of every entry, and returns the entries, and a dict
+        of the entries "added", "removed" and "moved" since the previous poll. Moved
+        entries have a "previous_interface".
+        """
+        if now is None:
+            now = time.time()
+        previous = self._index
+        index = {}
+        table = []
+        changes = {"added": [], "removed": [], "moved": []}
+
+        for entry in entries:
+            mac = entry["mac"]
+            if mac in index:
+                # The same MAC in another flow, tracked by its first entry
+                entry["moves"], entry["last_move"] = index[mac][4], index[mac][5]
+                table.append(entry)
+                continue
+
+            known = previous.get(mac)
+            if known is None:
+                entry["moves"] = 0
+                entry["last_move"] = -1.0
+                changes["added"].append(entry)
+            elif known[0] != entry["interface"]:
+                entry["moves"] = known[4] + 1
+                entry["last_move"] = float(now)
+                changes["moved"].append(dict(entry, previous_interface=known[0]))
+            else:
+                entry["moves"], entry["last_move"] = known[4], known[5]
+
+            index[mac] = (
+                entry["interface"],
+                entry["vlan"],
+                entry["static"],
+                entry["active"],
+                entry["moves"],
+                entry["last_move"],
+            )
+            table.append(entry)
+
+        for mac, known in previous.items():
+            if mac not in index:
+                changes["removed"].append(_entry(mac, known))
+
+        self._index = index
+        return table, changes
+
+
+def _entry(mac, known):
+    interface, vlan, static, active, moves, last_move = known
+    return {
+        "mac": mac,
+        "interface": interface,
+        "vlan": vlan,
+        "static": static,
+        "active": active,
+        "moves": moves,
+        "last_move": last_move,
+    }
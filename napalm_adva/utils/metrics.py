@@ -0,0 +1,225 @@
+"""Latency, output size and round trip metrics of a driver session."""
+
+from bisect import bisect_left
+from collections import defaultdict, deque
+import functools
+import inspect
+import json
+import logging
+import re
+from threading import Lock
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Port, flow and other entity names, e.g. access-1-1-1-3 or ne-1
+_ENTITY = re.compile(r"\b[\w.]+?(?:-\d+)+\b")
+
+
+def command_key(command):
+    """Command with its entity names replaced, so per port commands share metrics
+
+    >>> command_key("show access-port access-1-1-1-3")
+    'show access-port <eid>'
+    """
+    if not isinstance(command, str):
+        return "; ".join(dict.fromkeys(command_key(c) for c in command))
+    return _ENTITY.sub("<eid>", command)
+
+
+class Histogram(object):
+    """Counts of observed values per bucket, with their count, sum, min and max"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # The last count is for values above the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class Metrics(object):
+    """Registry of the metrics of one or more driver sessions.
+
+    Records per command latency histograms and output bytes, parse time per
+    template, round trips per getter call and candidate transfers. Every getter
+    call is a span carrying the hostname, the duration and its round trips.
+
+    Each hook is called with the event name ("command", "parse", "span" or
+    "transfer") and a dict of its data, e.g. to forward them to a tracing system.
+
+    :param hooks: callables taking (event, data)
+    :param export: path to append a JSON summary to when the driver closes, or a
+        callable taking the summary
+    :param max_spans: number of most recent spans kept
+    :param buckets: upper bounds of the latency histogram buckets
+    """
+
+    def __init__(self, hooks=None, export=None, max_spans=1000, buckets=LATENCY_BUCKETS):
+        self.hooks = list(hooks or [])
+        self.export_to = export
+        self.buckets = buckets
+
+        self.spans = deque(maxlen=max_spans)
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.commands = defaultdict(lambda: Histogram(self.buckets))
+            self.output_bytes = defaultdict(int)
+            self.parse_time = defaultdict(lambda: Histogram(self.buckets))
+            self.getters = defaultdict(lambda: {"calls": 0, "errors": 0, "round_trips": 0})
+            self.getter_time = defaultdict(lambda: Histogram(self.buckets))
+            self.transfers = []
+            self.spans.clear()
+
+    def _emit(self, event, data):
+        for hook in self.hooks:
+            try:
+                hook(event, data)
+            except Exception:
+                logger.exception("Metrics hook %r failed on %s", hook, event)
+
+    def record_command(self, hostname, command, seconds, output):
+        """Record one exchange, command is a list for a pipelined batch"""
+        key = command_key(command)
+        size = len(output) if isinstance(output, str) else 0
+        with self._lock:
+            self.commands[key].observe(seconds)
+            self.output_bytes[key] += size
+        if self.hooks:
+            self._emit(
+                "command",
+                {"hostname": hostname, "command": key, "seconds": seconds, "bytes": size},
+            )
+
+    def record_parse(self, hostname, template_name, seconds):
+        with self._lock:
+            self.parse_time[template_name].observe(seconds)
+        if self.hooks:
+            self._emit(
+                "parse", {"hostname": hostname, "template": template_name, "seconds": seconds}
+            )
+
+    def record_transfer(self, hostname, transfer_metrics):
+        data = dict(transfer_metrics, hostname=hostname)
+        with self._lock:
+            self.transfers.append(data)
+        if self.hooks:
+            self._emit("transfer", data)
+
+    def record_span(self, span):
+        """Record a finished getter call, see instrument"""
+        with self._lock:
+            self.spans.append(span)
+            getter = self.getters[span["name"]]
+            getter["calls"] += 1
+            getter["errors"] += span["error"] is not None
+            getter["round_trips"] += span["round_trips"]
+            self.getter_time[span["name"]].observe(span["duration"])
+        if self.hooks:
+            self._emit("span", span)
+
+    def summary(self):
+        """Everything recorded, as a dict that serializes to JSON"""
+        with self._lock:
+            return {
+                "commands": {
+                    key: dict(histogram.summary(), bytes=self.output_bytes[key])
+                    for key, histogram in self.commands.items()
+                },
+                "parse": {name: h.summary() for name, h in self.parse_time.items()},
+                "getters": {
+                    name: dict(getter, duration=self.getter_time[name].summary())
+                    for name, getter in self.getters.items()
+                },
+                "transfers": list(self.transfers),
+            }
+
+    def export(self, hostname):
+        """Hand the summary of a session to export, if any"""
+        if self.export_to is None:
+            return
+        summary = dict(self.summary(), hostname=hostname, time=time.time())
+        if callable(self.export_to):
+            self.export_to(summary)
+        else:
+            with open(self.export_to, "a") as f:
+                f.write(json.dumps(summary, sort_keys=True) + "\n")
+
+
+def instrument(driver, metrics):
+    """Wrap every get_ method of driver in a span recorded to metrics
+
+    Only the instance is changed, so drivers without metrics are not slowed down.
+    Coroutine getters, like the ones of AsyncAdvaDriver, get coroutine wrappers.
+    """
+    for name in dir(type(driver)):
+        method = getattr(type(driver), name)
+        if name.startswith("get_") and callable(method):
+            setattr(driver, name, _span(driver, metrics, name, getattr(driver, name)))
+
+
+def _span(driver, metrics, name, method):
+    def finish(started, round_trips, error):
+        duration = time.perf_counter() - started
+        metrics.record_span(
+            {
+                "name": name,
+                "hostname": driver.hostname,
+                "start": time.time() - duration,
+                "duration": duration,
+                "round_trips": driver.round_trips - round_trips,
+                "error": error,
+            }
+        )
+
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            started, round_trips, error = time.perf_counter(), driver.round_trips, None
+            try:
+                return await method(*args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                finish(started, round_trips, error)
+
+    else:
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started, round_trips, error = time.perf_counter(), driver.round_trips, None
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                finish(started, round_trips, error)
+
+    return wrapper
@@ -0,0 +1,139 @@
+"""Native parsers for the "Label : value" outputs.
+
+show network-port/access-port, show system, show shelf-info and show flow list
+one right aligned "Label : value" per line. Their templates only match lines by
+label, so these parsers split each line once at " : " and look the label up,
+instead of running every template rule against every line.
+
+The parsers return the same rows as the templates they replace, see
+test/unit/test_native_parser.py.
+"""
+
+import re
+
+NON_SPACE = re.compile(r"\S+")
+DIGITS = re.compile(r"\d+")
+ANY = re.compile(r".+")
+# Up to the last non-space, SFP values such as "Not Available" contain spaces
+TEXT = re.compile(r".*\S")
+UPTIME = re.compile(
+    r"(?:(?P<uptimedays>\d+) days)?\s*(?:(?P<uptimehours>\d+) hrs)?\s*"
+    r"(?:(?P<uptimeminutes>\d+) mins)?\s*(?:(?P<uptimeseconds>\d+) secs)?"
+)
+
+# Template name -> (header, label -> (field, value regex))
+# A field of None means the regex has named groups, one for each field
+LABELS = {
+    "show_port_details": (
+        [
+            "adminstate",
+            "operationalstate",
+            "alias",
+            "macaddress",
+            "mtu",
+            "speed",
+            "sfpname",
+            "sfpvendor",
+            "sfppartnumber",
+            "sfpserial",
+            "sfprevision",
+            "sfpdate",
+            "sfpconnector",
+            "sfplinklength",
+            "sfpmediatype",
+            "sfpwavelength",
+        ],
+        {
+            "Admin State": ("adminstate", NON_SPACE),
+            "Operational State": ("operationalstate", NON_SPACE),
+            "Alias": ("alias", NON_SPACE),
+            "MAC Address": ("macaddress", NON_SPACE),
+            "MTU (bytes)": ("mtu", DIGITS),
+            "Negotiated Port Speed": ("speed", NON_SPACE),
+            "SFP Name": ("sfpname", TEXT),
+            "SFP Vendor Name": ("sfpvendor", TEXT),
+            "SFP Part Number": ("sfppartnumber", TEXT),
+            "SFP Serial Number": ("sfpserial", TEXT),
+            "SFP Hardware Revision": ("sfprevision", TEXT),
+            "SFP Mfg Date": ("sfpdate", TEXT),
+            "SFP Connector Type": ("sfpconnector", TEXT),
+            "SFP Link Length (m)": ("sfplinklength", TEXT),
+            "SFP Media Type": ("sfpmediatype", TEXT),
+            "SFP Laser Wave Length (nm)": ("sfpwavelength", TEXT),
+        },
+    ),
+    "show_system": (
+        [
+            "hostname",
+            "model",
+            "version",
+            "uptimedays",
+            "uptimehours",
+            "uptimeminutes",
+            "uptimeseconds",
+        ],
+        {
+            "System Name": ("hostname", NON_SPACE),
+            "System Description": ("model", ANY),
+            "Release Version": ("version", NON_SPACE),
+            "System Up Time": (None, UPTIME),
+        },
+    ),
+    "show_shelf_info": (
+        ["serial"],
+        {
+            "Backplane USI": ("serial", NON_SPACE),
+        },
+    ),
+    "show_flow": (
+        ["adminstate", "circuitname", "vlan", "networkinterface", "accessinterface"],
+        {
+            "Admin State": ("adminstate", NON_SPACE),
+            "Circuit Name": ("circuitname", NON_SPACE),
+            "C-Tag": ("vlan", DIGITS),
+            "Network Interface": ("networkinterface", NON_SPACE),
+            "Access Interface": ("accessinterface", NON_SPACE),
+        },
+    ),
+}
+
+# Label whose line ends the output, like the -> Record End of its template
+END_LABELS = {
+    "show_port_details": "SFP Laser Wave Length (nm)",
+}
+
+
+def parse_labels(template_name, raw_text):
+    """Parse raw_text in one pass, returns the rows template_name would return"""
+    header, labels = LABELS[template_name]
+    end_label = END_LABELS.get(template_name)
+    record = dict.fromkeys(header, "")
+
+    for line in raw_text.splitlines():
+        index = line.find(" : ")
+        if index < 0:
+            continue
+        name = line[:index].lstrip()
+        label = labels.get(name)
+        if label is None:
+            continue
+
+        field, regex = label
+        match = regex.match(line, index + 3)
+        if match is None:
+            continue
+
+        if field is None:
+            for key, value in match.groupdict().items():
+                record[key] = value or ""
+        else:
+            record[field] = match.group()
+        if name == end_label:
+            break
+
+    # Like TextFSM, an empty record is not returned
+    return [record] if any(record.values()) else []
+
+
+def supports(template_name):
+    return template_name in LABELS
@@ -0,0 +1,60 @@
+"""Read timeouts learned from the observed command latencies."""
+
+from threading import Lock
+
+from napalm_adva.utils.metrics import command_key
+
+# Generating the configuration can take a while on large devices
+COMMAND_TIMEOUTS = {"show running-config": 120}
+
+
+class ReadTimeouts(object):
+    """Seconds to wait for the prompt after each command.
+
+    Like a TCP retransmission timeout, the timeout of a command is its smoothed
+    latency plus 4 times the latency variation, between minimum and maximum. Until
+    a command was observed, its timeout is the one of the longest matching prefix
+    in command_timeouts, or initial. Commands that only differ in the port or flow
+    share their latencies, see metrics.command_key.
+
+    :param initial: seconds for commands not observed yet
+    :param minimum: lowest timeout. It defaults to the 10 seconds netmiko waits,
+        so a hiccup after fast responses never times out sooner than it used to
+    :param maximum: highest timeout
+    :param command_timeouts: initial timeout per command prefix
+    """
+
+    def __init__(self, initial=10, minimum=10, maximum=600, command_timeouts=None):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.command_timeouts = dict(COMMAND_TIMEOUTS, **(command_timeouts or {}))
+
+        # command key -> (smoothed latency, latency variation)
+        self._latencies = {}
+        self._lock = Lock()
+
+    def get(self, command):
+        """Return the read timeout of command, in seconds"""
+        latency = self._latencies.get(command_key(command))
+        if latency is None:
+            prefixes = [p for p in self.command_timeouts if command.startswith(p)]
+            if prefixes:
+                return self.command_timeouts[max(prefixes, key=len)]
+            return self.initial
+
+        smoothed, variation = latency
+        return min(self.maximum, max(self.minimum, smoothed + 4 * variation))
+
+    def observe(self, command, seconds):
+        """Record that the prompt followed command after seconds"""
+        key = command_key(command)
+        with self._lock:
+            latency = self._latencies.get(key)
+            if latency is None:
+                self._latencies[key] = (seconds, seconds / 2)
+            else:
+                smoothed, variation = latency
+                variation = 0.75 * variation + 0.25 * abs(smoothed - seconds)
+                smoothed = 0.875 * smoothed + 0.125 * seconds
+                self._latencies[key] = (smoothed, variation)
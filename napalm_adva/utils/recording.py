@@ -0,0 +1,198 @@
+"""Record device sessions with their timings, and replay them."""
+
+from collections import defaultdict
+import json
+import os
+import re
+import time
+
+from napalm_adva.utils import cli_context
+
+# Written next to the outputs, lists every exchange in order
+INDEX = "recording.json"
+
+
+def output_filename(command):
+    """File of the output of command, as read by the napalm test doubles"""
+    return "{}.txt".format(re.sub("[^a-zA-Z0-9]", "_", command)[0:150])
+
+
+class RecordingConnection(object):
+    """Wraps a netmiko connection and records every exchange into directory.
+
+    Each output is written to the file the test doubles read for its command, see
+    output_filename, so a recording can be used as mocked_data directly. Outputs
+    that differ from an earlier output of the same command get a numbered file.
+    save writes the index, with the command, the CLI context it ran in, the
+    expected prompt and the elapsed seconds of every exchange.
+
+    :param connection: netmiko connection
+    :param driver: AdvaDriver owning the connection, for its CLI context
+    :param directory: created if missing
+    """
+
+    def __init__(self, connection, driver, directory):
+        self.connection = connection
+        self.driver = driver
+        self.directory = directory
+        self.entries = []
+
+        self._files = defaultdict(dict)
+        # Start and commands of a pipelined batch, until its output is read
+        self._pending = None
+        os.makedirs(directory, exist_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def _record(self, method, command, expect_string, started, output):
+        key = command if isinstance(command, str) else " ; ".join(command)
+        files = self._files[key]
+        filename = files.get(output)
+        if filename is None:
+            filename = output_filename(key)
+            if files:
+                filename = "%s_%d.txt" % (filename[:-4], len(files))
+            files[output] = filename
+            with open(os.path.join(self.directory, filename), "w") as f:
+                f.write(output)
+
+        context = self.driver._cli_context
+        self.entries.append(
+            {
+                "method": method,
+                "command": command,
+                "context": None if context is None else list(context),
+                "expect_string": expect_string,
+                "elapsed": round(time.perf_counter() - started, 6),
+                "file": filename,
+            }
+        )
+
+    def send_command(self, command, expect_string=None, **kwargs):
+        started = time.perf_counter()
+        output = self.connection.send_command(command, expect_string=expect_string, **kwargs)
+        self._record("send_command", command, expect_string, started, output)
+        return output
+
+    def send_command_timing(self, command, **kwargs):
+        started = time.perf_counter()
+        output = self.connection.send_command_timing(command, **kwargs)
+        self._record("send_command_timing", command, None, started, output)
+        return output
+
+    def send_multiline(self, commands, expect_string=None, **kwargs):
+        started = time.perf_counter()
+        output = self.connection.send_multiline(commands, expect_string=expect_string, **kwargs)
+        self._record("send_multiline", list(commands), expect_string, started, output)
+        return output
+
+    def write_channel(self, out_data):
+        self._pending = (time.perf_counter(), out_data.splitlines())
+        self.connection.write_channel(out_data)
+
+    def read_until_pattern(self, pattern="", **kwargs):
+        output = self.connection.read_until_pattern(pattern=pattern, **kwargs)
+        started, commands = self._pending or (time.perf_counter(), [])
+        self._pending = None
+        self._record("batch", commands, pattern, started, output)
+        return output
+
+    def save(self):
+        """Write the index of the recording"""
+        with open(os.path.join(self.directory, INDEX), "w") as f:
+            json.dump({"hostname": self.driver.hostname, "entries": self.entries}, f, indent=2)
+            f.write("\n")
+
+
+class ReplayConnection(object):
+    """Netmiko-like connection serving a recording.
+
+    Each command gets the outputs recorded for it in the same CLI context, in the
+    order they were recorded, starting over when they run out. The context is
+    followed from the navigation commands, like on the device. Without a recorded
+    context, or for mocked_data without an index, the output file of the command
+    is served.
+
+    :param directory: recording, see RecordingConnection
+    :param speed: None to answer at once, 1 to take the recorded time of every
+        exchange, 10 to take a tenth of it
+    """
+
+    def __init__(self, directory, speed=1):
+        self.directory = directory
+        self.speed = speed
+        self.exchanges = 0
+
+        self._context = cli_context.HOME
+        self._pending_commands = []
+        # Recorded exchanges by (context, command), and by command alone
+        self._entries = defaultdict(list)
+        self._by_command = defaultdict(list)
+        self._served = defaultdict(int)
+        self._outputs = {}
+
+        index = os.path.join(directory, INDEX)
+        if os.path.exists(index):
+            with open(index) as f:
+                for entry in json.load(f)["entries"]:
+                    command = entry["command"]
+                    if not isinstance(command, str):
+                        command = tuple(command)
+                    context = None if entry["context"] is None else tuple(entry["context"])
+                    self._entries[(context, command)].append(entry)
+                    self._by_command[command].append(entry)
+
+    def _output(self, filename):
+        if filename not in self._outputs:
+            with open(os.path.join(self.directory, filename)) as f:
+                self._outputs[filename] = f.read()
+        return self._outputs[filename]
+
+    def _replay(self, command):
+        self.exchanges += 1
+        entries = self._entries.get((self._context, command)) or self._by_command.get(command)
+
+        if entries:
+            key = (self._context, command)
+            entry = entries[self._served[key] % len(entries)]
+            self._served[key] += 1
+            filename, elapsed = entry["file"], entry["elapsed"]
+        elif isinstance(command, str) and os.path.exists(
+            os.path.join(self.directory, output_filename(command))
+        ):
+            filename, elapsed = output_filename(command), 0
+        elif isinstance(command, str) and cli_context.is_navigation(command):
+            filename, elapsed = None, 0
+        else:
+            raise IOError("No recorded output for %r in %s" % (command, self.directory))
+
+        if self.speed and elapsed:
+            time.sleep(elapsed / self.speed)
+        output = "" if filename is None else self._output(filename)
+
+        for sent in [command] if isinstance(command, str) else command:
+            self._context = cli_context.enter(self._context, sent)
+        return output
+
+    def send_command(self, command, **kwargs):
+        return self._replay(command)
+
+    def send_command_timing(self, command, **kwargs):
+        return self._replay(command)
+
+    def send_multiline(self, commands, **kwargs):
+        return self._replay(tuple(commands))
+
+    def write_channel(self, out_data):
+        self._pending_commands = out_data.splitlines()
+
+    def read_until_pattern(self, pattern="", **kwargs):
+        commands, self._pending_commands = tuple(self._pending_commands), []
+        return self._replay(commands)
+
+    def is_alive(self):
+        return True
+
+    def disconnect(self):
+        pass
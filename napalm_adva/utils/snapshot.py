@@ -0,0 +1,46 @@
+"""Planning the reads of several getters at once, see AdvaDriver.get_snapshot."""
+
+from itertools import permutations
+
+from napalm_adva.utils import cli_context
+
+# Up to this many contexts every order is tried, beyond that the nearest comes next
+EXACT_CONTEXTS = 6
+
+
+def _navigation(current, contexts):
+    """Number of navigation commands to visit contexts in order, from current"""
+    total = 0
+    for context in contexts:
+        total += len(cli_context.plan(current, context))
+        current = context
+    return total
+
+
+def plan(current, commands):
+    """Group commands by CLI context, in the order that navigates the least
+
+    :param current: context the CLI is in
+    :param commands: (context, command) pairs, duplicates are read once
+
+    Returns a list of (context, commands). Of the orders with the fewest navigation
+    commands, the one closest to the order the contexts were requested in is used.
+    """
+    groups = {}
+    for context, command in commands:
+        group = groups.setdefault(tuple(context), [])
+        if command not in group:
+            group.append(command)
+
+    if len(groups) <= EXACT_CONTEXTS:
+        order = min(permutations(groups), key=lambda order: _navigation(current, order))
+    else:
+        order = []
+        remaining = list(groups)
+        while remaining:
+            context = min(remaining, key=lambda c: len(cli_context.plan(current, c)))
+            remaining.remove(context)
+            order.append(context)
+            current = context
+
+    return [(context, groups[context]) for context in order]
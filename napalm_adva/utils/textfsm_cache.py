@@ -0,0 +1,100 @@
+"""Process wide cache of compiled TextFSM templates.
+
+napalm.base.helpers.textfsm_extractor opens and compiles the template on every
+call. textfsm_extractor here has the same signature and lookup rules, but compiles
+each template once and reuses it. A compiled template holds parser state, so
+every template has a lock and is reset before each parse.
+"""
+
+import os
+import sys
+from threading import Lock
+
+import textfsm
+
+from napalm.base.exceptions import TemplateNotImplemented
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "textfsm_templates")
+
+
+class CompiledTemplate(object):
+    """A compiled TextFSM template, safe to share between threads."""
+
+    def __init__(self, template_path):
+        with open(template_path) as f:
+            self.fsm = textfsm.TextFSM(f)
+        self.header = [h.lower() for h in self.fsm.header]
+        self.lock = Lock()
+
+    def parse(self, raw_text):
+        """Return the rows matched in raw_text as dicts"""
+        with self.lock:
+            self.fsm.Reset()
+            rows = self.fsm.ParseText(raw_text)
+            return [dict(zip(self.header, row)) for row in rows]
+
+
+_templates = {}
+_template_paths = {}
+_lock = Lock()
+
+
+def _template_dirs(cls):
+    """Template directories for a driver class, like napalm textfsm_extractor"""
+    for c in cls.mro():
+        if c is object:
+            continue
+        module = sys.modules[c.__module__].__file__
+        if module:
+            yield os.path.join(os.path.dirname(os.path.abspath(module)), "utils/textfsm_templates")
+
+
+def _find_template(cls, template_name):
+    key = (cls, template_name)
+    if key not in _template_paths:
+        for template_dir in _template_dirs(cls):
+            template_path = os.path.join(template_dir, f"{template_name}.tpl")
+            if os.path.exists(template_path):
+                _template_paths[key] = os.path.realpath(template_path)
+                break
+        else:
+            raise TemplateNotImplemented(
+                "TextFSM template {template_name}.tpl is not defined under {path}".format(
+                    template_name=template_name, path=TEMPLATE_DIR
+                )
+            )
+    return _template_paths[key]
+
+
+def get_template(template_path):
+    """Return the compiled template for template_path, compiling it on first use"""
+    template = _templates.get(template_path)
+    if template is None:
+        with _lock:
+            template = _templates.get(template_path)
+            if template is None:
+                template = CompiledTemplate(template_path)
+                _templates[template_path] = template
+    return template
+
+
+def warm_templates(template_dir=TEMPLATE_DIR):
+    """Compile every template in template_dir, returns the template names"""
+    names = []
+    for filename in sorted(os.listdir(template_dir)):
+        if filename.endswith(".tpl"):
+            get_template(os.path.realpath(os.path.join(template_dir, filename)))
+            names.append(filename[: -len(".tpl")])
+    return names
+
+
+def textfsm_extractor(cls, template_name, raw_text):
+    """
+    Applies a TextFSM template over a raw text and return the matching table.
+
+    :param cls: Instance of the driver class
+    :param template_name: Specifies the name of the template to be used
+    :param raw_text: Text output as the devices prompts on the CLI
+    :return: table-like list of entries
+    """
+    return get_template(_find_template(cls.__class__, template_name)).parse(raw_text)
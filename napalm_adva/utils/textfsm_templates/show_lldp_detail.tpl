@@ -1,4 +1,4 @@
-Value LocalPort (\w*-\d-\d-\d-\d)
+Value LocalPort (\w*-\d+-\d+-\d+-\d+)
 Value RemoteChassisID (\S+)
 Value RemoteHostname (\S+)
 Value RemotePort (\S+)
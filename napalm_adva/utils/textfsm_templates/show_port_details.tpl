@@ -4,6 +4,16 @@ Value Alias (\S+)
 Value MacAddress (\S+)
 Value MTU (\d+)
 Value Speed (\S+)
+Value SfpName (.*\S)
+Value SfpVendor (.*\S)
+Value SfpPartNumber (.*\S)
+Value SfpSerial (.*\S)
+Value SfpRevision (.*\S)
+Value SfpDate (.*\S)
+Value SfpConnector (.*\S)
+Value SfpLinkLength (.*\S)
+Value SfpMediaType (.*\S)
+Value SfpWavelength (.*\S)
 
 Start
   ^\s*Admin State : ${AdminState}
@@ -11,4 +21,14 @@ Start
   ^\s*Alias : ${Alias}
   ^\s*MAC Address : ${MacAddress}
   ^\s*MTU \(bytes\) : ${MTU}
-  ^\s*Negotiated Port Speed : ${Speed}
\ No newline at end of file
+  ^\s*Negotiated Port Speed : ${Speed}
+  ^\s*SFP Name : ${SfpName}
+  ^\s*SFP Vendor Name : ${SfpVendor}
+  ^\s*SFP Part Number : ${SfpPartNumber}
+  ^\s*SFP Serial Number : ${SfpSerial}
+  ^\s*SFP Hardware Revision : ${SfpRevision}
+  ^\s*SFP Mfg Date : ${SfpDate}
+  ^\s*SFP Connector Type : ${SfpConnector}
+  ^\s*SFP Link Length \(m\) : ${SfpLinkLength}
+  ^\s*SFP Media Type : ${SfpMediaType}
+  ^\s*SFP Laser Wave Length \(nm\) : ${SfpWavelength} -> Record End
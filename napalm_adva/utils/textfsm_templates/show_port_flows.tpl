@@ -1,4 +1,4 @@
-Value Flow (flow-\d-\d-\d-\d-\d)
+Value Flow (flow-\d+-\d+-\d+-\d+-\d+)
 
 Start
   ^\|${Flow}\s*\|.* -> Record
\ No newline at end of file
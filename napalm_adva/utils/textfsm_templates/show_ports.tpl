@@ -1,4 +1,4 @@
-Value Port (\w*-\d-\d-\d-\d)
+Value Port (\w*-\d+-\d+-\d+-\d+)
 
 Start
   ^\|${Port}\s*\| -> Record
\ No newline at end of file
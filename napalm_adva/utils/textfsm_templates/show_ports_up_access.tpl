@@ -1,4 +1,4 @@
-Value Port (access-\d-\d-\d-\d)
+Value Port (access-\d+-\d+-\d+-\d+)
 
 Start
   ^\|${Port}\s*\|in-service -> Record
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Files served to the device over TFTP."""
+
+from contextlib import contextmanager
+import logging
+import tempfile
+from threading import BoundedSemaphore, Event, Lock, Thread
+import time
+import uuid
+
+import tftpy
+
+logger = logging.getLogger(__name__)
+
+# tftpy select() timeout, also the retransmit timeout of a session. Stopping the
+# server takes up to this long, so keep it short.
+SOCKET_TIMEOUT = 1
+
+
+class TftpTransfer(object):
+    """A file served over TFTP, the server signals when the device has it.
+
+    tftpy reads the file one block at a time, and closes it when the session ends.
+    A transfer is successful when the file was read to the end before it was
+    closed, which happens once the device ACKs the last block.
+    """
+
+    def __init__(self, content):
+        if isinstance(content, str):
+            content = content.encode()
+        self.content = content
+
+        self.done = Event()
+        self.success = False
+        self.bytes = 0
+        self.started = None
+        self.finished = None
+
+    def open(self):
+        """Return a new file object for a download request"""
+        return _TransferFile(self)
+
+    def wait(self, timeout=None):
+        """Wait for the transfer to end, returns False on timeout"""
+        return self.done.wait(timeout)
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def metrics(self):
+        return {"bytes": self.bytes, "duration": self.duration, "success": self.success}
+
+
+class TftpService(object):
+    """A long lived TFTP server, shared by every driver in the process.
+
+    Each candidate is served under a one-time filename, "<token>-<destfile>", so
+    concurrent pushes never see each other's files. The driver renames it to
+    destfile on the device once it is downloaded. tftpy runs all sessions in one
+    select loop; max_transfers bounds how many are in flight, further transfers wait
+    for a free slot.
+    """
+
+    def __init__(self, listenip="", listenport=69, max_transfers=32):
+        self.listenip = listenip
+        self.listenport = listenport
+
+        self._transfers = {}
+        self._slots = BoundedSemaphore(max_transfers)
+        self._lock = Lock()
+        self._server = None
+        self._thread = None
+        self._root = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the server, if it is not running already"""
+        with self._lock:
+            if self.running:
+                return
+
+            self._root = tempfile.TemporaryDirectory()
+            self._server = tftpy.TftpServer(tftproot=self._root.name, dyn_file_func=self._handler)
+            self._thread = Thread(
+                target=self._server.listen,
+                kwargs={
+                    "listenip": self.listenip,
+                    "listenport": self.listenport,
+                    "timeout": SOCKET_TIMEOUT,
+                },
+                name="napalm-adva-tftp",
+            )
+            self._thread.daemon = True
+            self._thread.start()
+
+            if not self._server.is_running.wait(SOCKET_TIMEOUT * 5):
+                raise RuntimeError("TFTP server did not start")
+            # listenport 0 binds a free port
+            self.listenport = self._server.listenport
+
+    def stop(self):
+        with self._lock:
+            if self.running:
+                self._server.stop(now=True)
+                self._thread.join()
+            if self._root is not None:
+                self._root.cleanup()
+                self._root = None
+
+    @contextmanager
+    def serve(self, content, destfile="candidate", timeout=None):
+        """Serve content for the duration of the with block
+
+        Yields the one-time filename to request, and the TftpTransfer.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise RuntimeError("No free TFTP transfer slot within %s seconds" % timeout)
+
+        filename = f"{uuid.uuid4().hex}-{destfile}"
+        transfer = TftpTransfer(content)
+        try:
+            self.start()
+            with self._lock:
+                self._transfers[filename] = transfer
+            yield filename, transfer
+        finally:
+            with self._lock:
+                self._transfers.pop(filename, None)
+            self._slots.release()
+
+    def _handler(self, fn, raddress=None, rport=None):
+        with self._lock:
+            transfer = self._transfers.get(fn)
+        if transfer is None:
+            logger.warning("TFTP request from %s for unknown file %s", raddress, fn)
+            return None
+        return transfer.open()
+
+
+_service = None
+_service_lock = Lock()
+
+
+def get_service(**kwargs):
+    """Return the process wide TftpService, kwargs are used when it is created"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TftpService(**kwargs)
+        return _service
+
+
+class _TransferFile(object):
+    """File object handed to tftpy, reports back to its TftpTransfer
+
+    tftpy locks the file it serves with flock, so this is backed by a temporary file
+    rather than held in memory.
+    """
+
+    def __init__(self, transfer):
+        self.transfer = transfer
+        self.file = tempfile.TemporaryFile()
+        self.file.write(transfer.content)
+        self.file.seek(0)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def read(self, size=-1):
+        if self.transfer.started is None:
+            self.transfer.started = time.monotonic()
+        return self.file.read(size)
+
+    def close(self):
+        if not self.file.closed:
+            transfer = self.transfer
+            transfer.bytes = self.file.tell()
+            transfer.success = transfer.bytes == len(transfer.content)
+            transfer.finished = time.monotonic()
+            self.file.close()
+            transfer.done.set()
@@ -0,0 +1,114 @@
+"""Ways to get a candidate config onto the device."""
+
+import re
+import time
+
+from napalm.base.exceptions import (
+    CommandErrorException,
+    MergeConfigException,
+    ReplaceConfigException,
+)
+
+from napalm_adva.utils import cli_context
+
+# Candidates up to this size are sent over the SSH session in auto mode
+INBAND_MAX_BYTES = 2048
+
+# Start of the output of a command the CLI rejected
+CLI_ERROR = re.compile(r"^\s*(?:error|invalid|failure)\b", re.IGNORECASE | re.MULTILINE)
+
+
+class TftpTransport(object):
+    """Serves the candidate over TFTP, the device downloads it as a config file.
+
+    The candidate is staged on the device, validated there and committed with
+    load candidate or restart-with-configfile.
+    """
+
+    name = "tftp"
+    staged = True
+
+    def put(self, driver, content, destfile="candidate"):
+        driver._transfer_file(content, destfile)
+
+
+class CliTransport(object):
+    """Sends the commands of a merge candidate over the SSH session at commit.
+
+    Nothing is written to the device when the candidate is loaded, so there is no
+    setup cost, but the device does not validate the candidate before the commit.
+    When the CLI rejects a command, the commands before it stay applied.
+
+    Like in a config file, the indentation of a command is the context it runs in,
+    entered by the less indented commands above it, see config_parser. The driver
+    navigates to that context before each command.
+    """
+
+    name = "cli"
+    staged = False
+
+    def put(self, driver, content, destfile="candidate"):
+        pass
+
+    def apply(self, driver, content):
+        """Send every command of content, returns the transfer metrics"""
+        started = time.perf_counter()
+        for command, context in commands(content):
+            try:
+                output = driver.send_command(command, context=context)
+            except CommandErrorException as e:
+                raise MergeConfigException("%r failed: %s" % (command, e))
+            if CLI_ERROR.search(output):
+                raise MergeConfigException("%r failed: %s" % (command, output.strip()))
+
+        return {
+            "transport": self.name,
+            "bytes": len(content.encode()),
+            "duration": time.perf_counter() - started,
+            "success": True,
+        }
+
+
+def commands(content):
+    """Yield (command, context) for every command of a candidate
+
+    Navigation commands are not yielded, they are part of the context of the
+    commands below them. home and a line starting at the left margin return to
+    the top of the CLI.
+    """
+    # (indentation, context) of the commands that entered a context
+    stack = [(-1, cli_context.HOME)]
+    for line in content.splitlines():
+        command = line.strip()
+        if not command or command.startswith("#"):
+            continue
+        if command == "home":
+            stack = [(-1, cli_context.HOME)]
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        while stack[-1][0] >= indent:
+            stack.pop()
+        context = stack[-1][1]
+
+        if command == "back":
+            stack = stack[:-1] or [(-1, cli_context.HOME)]
+        elif cli_context.is_navigation(command):
+            stack.append((indent, cli_context.enter(context, command)))
+        else:
+            yield command, context
+
+
+def select(mode, content, replace=False, inband_max_bytes=INBAND_MAX_BYTES):
+    """Return the transport for a candidate
+
+    :param mode: "tftp", "cli", or "auto" for cli up to inband_max_bytes and tftp
+        above. Replacing the config needs a config file, so always uses tftp.
+    """
+    if mode == "cli" and replace:
+        raise ReplaceConfigException("A replace candidate cannot be sent over the CLI")
+    if mode == "cli" or (
+        mode == "auto" and not replace and len(content.encode()) <= inband_max_bytes
+    ):
+        return CliTransport()
+    return TftpTransport()
@@ -27,4 +27,5 @@ setup(
     url="https://github.com/sohonet/napalm-adva",
     include_package_data=True,
     install_requires=reqs,
+    extras_require={"async": ["asyncssh"]},
 )
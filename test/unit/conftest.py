@@ -7,6 +7,7 @@ from napalm.base.test import conftest as parent_conftest
 from napalm.base.test.double import BaseTestDouble
 
 from napalm_adva import adva
+from napalm_adva.utils import cli_context
 
 
 @pytest.fixture(scope='class')
@@ -20,6 +21,26 @@ def set_device_parameters(request):
     request.cls.patched_driver = PatchedAdvaDriver
     request.cls.vendor = 'adva'
     parent_conftest.set_device_parameters(request)
+    # Every test swaps the mocked data under the one device, nothing can be shared
+    request.cls.device.port_details_ttl = 0
+
+
+@pytest.fixture
+def make_driver():
+    """Factory of patched drivers for the tests of a single feature
+
+    make_driver(test, outputs=None, **optional_args) reads the mocked data of test,
+    e.g. "test_get_facts". outputs maps commands to the output the device returns
+    instead, without a test every other command returns nothing. The commands sent
+    are recorded in driver.device.sent.
+    """
+    def make(test=None, outputs=None, **optional_args):
+        driver = PatchedAdvaDriver("test", "admin", "pwd", optional_args=optional_args)
+        driver.device.current_test = test
+        driver.device.current_test_case = "default"
+        driver.device.outputs = dict(outputs or {})
+        return driver
+    return make
 
 
 def pytest_generate_tests(metafunc):
@@ -51,6 +72,14 @@ class PatchedAdvaDriver(adva.AdvaDriver):
 class FakeAdvaDevice(BaseTestDouble):
     """Adva device test double."""
 
+    prompt = "FAKE-ADVA-->"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_commands = []
+        self.outputs = {}
+        self.sent = []
+
     # def run_commands(self, command_list, encoding='json'):
     #     """Fake run_commands."""
     #     result = list()
@@ -67,13 +96,36 @@ class FakeAdvaDevice(BaseTestDouble):
     #     return result
 
     def send_command(self, command, **kwargs):
+        self.sent.append(command)
+        if command in self.outputs or self.current_test is None:
+            return self.outputs.get(command, "")
         filename = "{}.txt".format(self.sanitize_text(command))
-        full_path = self.find_file(filename)
+        try:
+            full_path = self.find_file(filename)
+        except IOError:
+            # Getters share one device, and navigate from where the last one left
+            if cli_context.is_navigation(command):
+                return ""
+            raise
         result = self.read_txt_file(full_path)
         return str(result)
 
     def send_command_timing(self, command, **kwargs):
         return self.send_command(command, **kwargs)
 
+    def write_channel(self, out_data):
+        self.pending_commands.extend(out_data.splitlines())
+
+    def read_until_pattern(self, pattern="", **kwargs):
+        """Echo every pending command followed by its output, like a real CLI"""
+        # The prompt before the first command was read with the previous command
+        output = ""
+        for command in self.pending_commands:
+            if output:
+                output += f"{self.prompt} "
+            output += f"{command}\n{self.send_command(command)}\n"
+        self.pending_commands = []
+        return output + self.prompt
+
     def disconnect(self):
         pass
\ No newline at end of file
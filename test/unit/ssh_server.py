@@ -0,0 +1,34 @@
+"""Stand-in Adva CLI served over SSH, for the async driver tests."""
+
+from napalm_adva.simulator import SimulatedDevice, create_server
+
+from conftest import FakeAdvaDevice
+
+
+class FakeAdvaCLI(SimulatedDevice):
+    """Simulated device answering each command from mocked_data.
+
+    The username selects the mocked_data test, so sessions of one server can serve
+    different devices. Commands without mocked data return no output.
+    """
+
+    hostname = "FAKE-ADVA"
+
+    def __init__(self, current_test):
+        self.device = FakeAdvaDevice()
+        self.device.current_test = current_test
+        self.device.current_test_case = "default"
+
+    def output(self, context, command):
+        try:
+            output = self.device.send_command(command)
+        except IOError:
+            return ""
+        # The mocked data was captured with the prompts, the simulator prints its own
+        lines = output.replace("\r\n", "\n").splitlines(keepends=True)
+        return "".join(line for line in lines if "-->" not in line)
+
+
+async def start_server(host="127.0.0.1", port=0):
+    """Start the SSH server, returns it and the port it listens on"""
+    return await create_server(FakeAdvaCLI, host, port)
@@ -0,0 +1,132 @@
+"""Tests for AsyncAdvaDriver against a stand-in SSH server."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("asyncssh")
+
+from napalm_adva.async_adva import AsyncAdvaDriver  # noqa: E402
+
+from conftest import PatchedAdvaDriver  # noqa: E402
+from ssh_server import start_server  # noqa: E402
+
+GETTERS = [
+    ("test_get_facts", "get_facts"),
+    ("test_get_interfaces", "get_interfaces"),
+    ("test_get_interfaces_ip", "get_interfaces_ip"),
+    ("test_get_lldp_neighbors", "get_lldp_neighbors"),
+    ("test_get_mac_address_table", "get_mac_address_table"),
+    ("test_get_sfp_inventory", "get_sfp_inventory"),
+    ("test_get_vlans", "get_vlans"),
+    ("test_get_config", "get_config"),
+]
+
+
+def _expected(test, getter):
+    driver = PatchedAdvaDriver("test", "admin", "pwd")
+    driver.device.current_test = test
+    driver.device.current_test_case = "default"
+    return getattr(driver, getter)()
+
+
+def _driver(port, test, **optional_args):
+    # The stand-in server serves the mocked_data test named by the username
+    return AsyncAdvaDriver(
+        "127.0.0.1", test, "pwd", timeout=10, optional_args=dict(port=port, **optional_args)
+    )
+
+
+async def _run(test, getter, **optional_args):
+    server, port = await start_server()
+    try:
+        async with _driver(port, test, **optional_args) as driver:
+            return await getattr(driver, getter)()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.parametrize("test, getter", GETTERS)
+def test_getters_match_sync_driver(test, getter):
+    assert asyncio.run(_run(test, getter)) == _expected(test, getter)
+
+
+def test_get_interfaces_batched():
+    result = asyncio.run(_run("test_get_interfaces", "get_interfaces", batch_port_details=True))
+    assert result == _expected("test_get_interfaces", "get_interfaces")
+
+
+def test_iter_mac_address_table():
+    async def run():
+        server, port = await start_server()
+        try:
+            async with _driver(port, "test_get_mac_address_table") as driver:
+                return [e async for e in driver.iter_mac_address_table(mac_prefix="00:00:5e")]
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert [e["mac"] for e in asyncio.run(run())] == ["00:00:5e:00:01:0a"]
+
+
+def test_get_mac_address_table_compact():
+    table = asyncio.run(_run("test_get_mac_address_table", "get_mac_address_table_compact"))
+    assert table.to_dicts() == _expected("test_get_mac_address_table", "get_mac_address_table")
+
+
+def test_get_snapshot():
+    async def run():
+        server, port = await start_server()
+        try:
+            async with _driver(port, "test_get_interfaces") as driver:
+                return await driver.get_snapshot(["get_interfaces", "get_sfp_inventory"])
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    expected = _expected("test_get_interfaces", "get_interfaces")
+    assert asyncio.run(run())["get_interfaces"] == expected
+
+
+def test_is_alive():
+    assert asyncio.run(_run("test_get_facts", "is_alive")) == {"is_alive": True}
+
+
+def test_open_fails():
+    async def run():
+        server, port = await start_server()
+        server.close()
+        await server.wait_closed()
+        await _driver(port, "test_get_facts").open()
+
+    from napalm.base.exceptions import ConnectionException
+
+    with pytest.raises(ConnectionException):
+        asyncio.run(run())
+
+
+def test_many_sessions_on_one_loop():
+    sessions = 200
+
+    async def poll(port, test, getter):
+        async with _driver(port, test) as driver:
+            return test, getter, await getattr(driver, getter)(), driver.round_trips
+
+    async def run():
+        server, port = await start_server()
+        try:
+            return await asyncio.gather(
+                *(poll(port, *GETTERS[i % len(GETTERS)]) for i in range(sessions))
+            )
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    results = asyncio.run(run())
+
+    assert len(results) == sessions
+    expected = {(test, getter): _expected(test, getter) for test, getter in GETTERS}
+    for test, getter, result, round_trips in results:
+        assert result == expected[(test, getter)]
+        assert round_trips > 0
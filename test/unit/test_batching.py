@@ -0,0 +1,47 @@
+"""Tests for pipelined command batching."""
+
+import pytest
+
+from napalm.base.exceptions import CommandErrorException
+
+
+def test_get_interfaces_batched_matches_sequential(make_driver):
+    sequential = make_driver("test_get_interfaces")
+    batched = make_driver("test_get_interfaces", batch_port_details=True)
+
+    assert batched.get_interfaces() == sequential.get_interfaces()
+    assert sequential.round_trips == 7
+    assert batched.round_trips == 2
+
+
+def test_split_batch_output(make_driver):
+    driver = make_driver("test_get_interfaces")
+    output = (
+        "HOST--> show a\n"
+        "line 1\n"
+        "line 2\n"
+        "HOST--> show b\n"
+        "HOST--> show c\n"
+        "line 3\n"
+        "HOST-->"
+    )
+
+    assert driver._split_batch_output(output, ["show a", "show b", "show c"]) == [
+        "line 1\nline 2",
+        "",
+        "line 3",
+    ]
+
+
+def test_split_batch_output_without_first_prompt(make_driver):
+    driver = make_driver("test_get_interfaces")
+    output = "show a\nline 1\nHOST--> show b\nline 2\nHOST-->"
+
+    assert driver._split_batch_output(output, ["show a", "show b"]) == ["line 1", "line 2"]
+
+
+def test_split_batch_output_missing_command(make_driver):
+    driver = make_driver("test_get_interfaces")
+
+    with pytest.raises(CommandErrorException):
+        driver._split_batch_output("HOST--> show a\nline 1\nHOST-->", ["show a", "show b"])
@@ -0,0 +1,210 @@
+"""Tests for CLI context tracking and navigation planning."""
+
+import pytest
+
+from napalm.base.exceptions import CommandErrorException
+
+from napalm_adva import AdvaDriver
+from napalm_adva.simulator import SyntheticDevice
+from napalm_adva.simulator.connection import SimulatedConnection
+from napalm_adva.utils import cli_context
+from napalm_adva.utils.cli_context import HOME, NETWORK_ELEMENT, NTE
+
+from conftest import FakeAdvaDevice
+
+PORT = NTE + ("configure access-port access-1-1-1-3",)
+FLOW = PORT + ("configure flow flow-1-1-1-3-1",)
+
+
+@pytest.mark.parametrize(
+    "current, target, commands",
+    [
+        (HOME, HOME, []),
+        (HOME, NTE, ["network-element ne-1", "configure nte nte"]),
+        (NTE, HOME, ["home"]),
+        (NETWORK_ELEMENT, HOME, ["home"]),
+        (FLOW, PORT, ["back"]),
+        (
+            FLOW,
+            PORT[:-1] + ("configure access-port access-1-1-1-4",),
+            ["back", "back", "configure access-port access-1-1-1-4"],
+        ),
+        (FLOW, ("admin config",), ["home", "admin config"]),
+        (None, NETWORK_ELEMENT, ["home", "network-element ne-1"]),
+    ],
+)
+def test_plan(current, target, commands):
+    assert cli_context.plan(current, target) == commands
+
+
+def test_enter():
+    assert cli_context.enter(HOME, "network-element ne-1") == NETWORK_ELEMENT
+    assert cli_context.enter(FLOW, "back") == PORT
+    assert cli_context.enter(FLOW, "home") == HOME
+    assert cli_context.enter(PORT, "list flows") == PORT
+    assert cli_context.enter(None, "back") is None
+    assert cli_context.enter(None, "home") == HOME
+
+
+@pytest.mark.parametrize(
+    "prompt, name",
+    [
+        ("AD-FSP150XG108-C-1-LDP00-GB-->", ""),
+        ("AD-FSP150XG108-C-1-LDP00-GB-NE-1-->", "NE-1"),
+        ("AD-FSP150XG108-C-1-LDP00-GB-NE-1:ntexg108-1-1-1-->", "ntexg108-1-1-1"),
+        ("AD-FSP150XG108-C-1-LDP00-GB-NE-1:flow-1-1-1-3-1--> ", "flow-1-1-1-3-1"),
+        ("Password:", None),
+    ],
+)
+def test_prompt_name(prompt, name):
+    assert cli_context.prompt_name(prompt) == name
+
+
+def test_matches():
+    assert cli_context.matches(HOME, "HOST-->")
+    assert not cli_context.matches(HOME, "HOST-NE-1-->")
+    assert cli_context.matches(NETWORK_ELEMENT, "HOST-NE-1-->")
+    assert cli_context.matches(NTE, "HOST-NE-1:ntexg108-1-1-1-->")
+    assert not cli_context.matches(FLOW, "HOST-NE-1:access-1-1-1-3-->")
+    # The prompt of configure system is not known
+    assert cli_context.matches(("configure system",), "HOST-->")
+
+
+def test_get_facts_round_trips(make_driver):
+    driver = make_driver("test_get_facts")
+
+    driver.get_facts()
+
+    # show system, show ports, network-element ne-1, show shelf-info
+    assert driver.round_trips == 4
+    assert driver._cli_context == NETWORK_ELEMENT
+
+
+def test_get_mac_address_table_round_trips(make_driver):
+    driver = make_driver("test_get_mac_address_table")
+
+    assert driver.get_mac_address_table() == driver.device.expected_result
+    # network-element, configure nte, show ports, configure access-port, list flows,
+    # configure flow, list fwd-entries
+    assert driver.round_trips == 7
+
+
+@pytest.mark.parametrize(
+    "test, getter, round_trips",
+    [
+        # show ports, and the details of its 6 ports
+        ("test_get_interfaces", "get_interfaces", 7),
+        ("test_get_sfp_inventory", "get_sfp_inventory", 7),
+        ("test_get_interfaces_ip", "get_interfaces_ip", 1),
+        # The flow partition, show flow of the 2 flows, the mgmttnl partition
+        ("test_get_vlans", "get_vlans", 4),
+        ("test_get_lldp_neighbors", "get_lldp_neighbors", 1),
+        # The running and the startup config
+        ("test_get_config", "get_config", 2),
+    ],
+)
+def test_getter_round_trips(make_driver, test, getter, round_trips):
+    driver = make_driver(test)
+
+    getattr(driver, getter)()
+
+    # Every command is read from home, no navigation
+    assert driver.round_trips == round_trips
+    assert driver._cli_context == HOME
+
+
+@pytest.mark.parametrize(
+    "getter, round_trips",
+    [
+        # show ports, the flow partition, show flow of the 2 flows, the mgmttnl partition
+        ("get_interfaces_vlans", 5),
+        ("get_static_routes", 1),
+    ],
+)
+def test_simulated_getter_round_trips(getter, round_trips):
+    driver = AdvaDriver("test", "admin", "pwd")
+    driver.device = SimulatedConnection(SyntheticDevice(ports=4, flows=2))
+
+    getattr(driver, getter)()
+
+    assert driver.round_trips == round_trips
+    assert driver._cli_context == HOME
+
+
+def test_send_command_without_context_runs_from_home(make_driver):
+    driver = make_driver("test_get_facts")
+    driver.get_facts()
+    round_trips = driver.round_trips
+
+    # get_facts left the CLI in NE-1, the command goes home first
+    driver.send_command("show system")
+    assert driver.device.sent[-2:] == ["home", "show system"]
+    assert driver.round_trips == round_trips + 2
+
+    # Callers navigating themselves stay where they went
+    driver.send_command("network-element ne-1")
+    driver.send_command("show shelf-info")
+    assert driver.device.sent[-2:] == ["network-element ne-1", "show shelf-info"]
+    assert driver._cli_context == NETWORK_ELEMENT
+
+
+def test_send_command_list_returns_home(make_driver):
+    driver = make_driver("test_get_facts")
+    driver.device.send_multiline = lambda commands, **kwargs: driver.device.sent.extend(commands)
+
+    driver.send_command(["network-element ne-1", "show shelf-info"])
+
+    assert driver.device.sent == ["network-element ne-1", "show shelf-info", "home"]
+    assert driver._cli_context == HOME
+
+
+def test_commands_stay_in_context(make_driver):
+    driver = make_driver("test_get_facts")
+    driver.get_facts()
+    round_trips = driver.round_trips
+
+    driver.send_command("show shelf-info", context=NETWORK_ELEMENT)
+    assert driver.round_trips == round_trips + 1
+
+    driver.send_command("show system", context=HOME)
+    assert driver.round_trips == round_trips + 3
+    assert driver._cli_context == HOME
+
+
+class WrongPromptDevice(FakeAdvaDevice):
+    """Lands in the wrong context the first time the network element is entered"""
+
+    def __init__(self):
+        super().__init__()
+        self.commands = []
+
+    def send_command(self, command, **kwargs):
+        self.commands.append(command)
+        if command == "network-element ne-1" and self.commands.count(command) == 1:
+            return "HOST--> network-element ne-1\nHOST-NE-1:access-1-1-1-3-->"
+        return super().send_command(command, **kwargs)
+
+
+def test_prompt_mismatch_goes_home(make_driver):
+    driver = make_driver("test_get_facts")
+    driver.device = WrongPromptDevice()
+    driver.device.current_test = "test_get_facts"
+    driver.device.current_test_case = "default"
+
+    driver.send_command("show shelf-info", context=NETWORK_ELEMENT)
+
+    assert driver.device.commands == [
+        "network-element ne-1",
+        "home",
+        "network-element ne-1",
+        "show shelf-info",
+    ]
+    assert driver._cli_context == NETWORK_ELEMENT
+
+
+def test_prompt_mismatch_twice_raises(make_driver):
+    driver = make_driver("test_get_facts")
+    driver.device.send_command = lambda command, **kwargs: "HOST-NE-1:flow-1-1-1-3-1-->"
+
+    with pytest.raises(CommandErrorException):
+        driver.send_command("show shelf-info", context=NETWORK_ELEMENT)
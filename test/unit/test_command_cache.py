@@ -0,0 +1,90 @@
+"""Tests for the command output cache."""
+
+from napalm_adva.utils.command_cache import CommandCache
+
+from conftest import PatchedAdvaDriver
+
+
+def test_cache_hit_and_miss():
+    cache = CommandCache()
+
+    assert cache.get((), "show ports") is None
+    cache.set((), "show ports", "output")
+    assert cache.get((), "show ports") == "output"
+    assert cache.get(("network-element ne-1",), "show ports") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+def test_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("napalm_adva.utils.command_cache.time.monotonic", lambda: now[0])
+    cache = CommandCache(ttl=10, command_ttls={"show running-config": 60, "show ports": 0})
+
+    cache.set((), "show system", "system")
+    cache.set((), "show running-config delta", "config")
+    cache.set((), "show ports", "ports")
+    cache.set((), "configure system", "")
+    assert len(cache) == 2
+
+    now[0] += 30
+    assert cache.get((), "show system") is None
+    assert cache.get((), "show running-config delta") == "config"
+
+
+def test_fwd_entries_not_cached_by_default():
+    cache = CommandCache()
+
+    cache.set(("network-element ne-1",), "list fwd-entries", "entries")
+    assert cache.get(("network-element ne-1",), "list fwd-entries") is None
+    assert CommandCache(command_ttls={"list fwd-entries": 5}).get_ttl("list fwd-entries") == 5
+
+
+def test_cache_max_size():
+    cache = CommandCache(max_size=2)
+
+    cache.set((), "show a", "a")
+    cache.set((), "show b", "b")
+    cache.get((), "show a")
+    cache.set((), "show c", "c")
+
+    assert cache.get((), "show a") == "a"
+    assert cache.get((), "show b") is None
+    assert cache.get((), "show c") == "c"
+
+
+def test_driver_cache_saves_round_trips():
+    driver = PatchedAdvaDriver("test", "admin", "pwd", optional_args={"command_cache": True})
+    driver.device.current_test = "test_get_config"
+    driver.device.current_test_case = "default"
+
+    config = driver.get_config()
+
+    assert config["running"] == config["startup"]
+    assert driver.round_trips == 1
+    assert driver.command_cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    driver.discard_config()
+    assert len(driver.command_cache) == 0
+
+
+def test_driver_cache_keyed_by_context():
+    driver = PatchedAdvaDriver("test", "admin", "pwd", optional_args={"command_cache": True})
+    driver.device.current_test = "test_get_facts"
+    driver.device.current_test_case = "default"
+
+    driver.get_facts()
+    assert driver._cli_context == ("network-element ne-1",)
+    driver.send_command("show ports", context=("network-element ne-1",))
+    driver.send_command("home")
+    assert driver._cli_context == ()
+
+    # show shelf-info and show ports in NE-1 are cached apart from show ports in home
+    assert len(driver.command_cache) == 4
+
+
+def test_driver_reads_mac_table_every_call(make_driver):
+    driver = make_driver("test_get_mac_address_table", command_cache=True)
+
+    assert driver.get_mac_address_table() == driver.get_mac_address_table()
+
+    assert driver.device.sent.count("list fwd-entries") == 2
@@ -0,0 +1,138 @@
+"""Tests for compare_config and skipping commits that change nothing."""
+
+import os
+
+from napalm_adva.utils import config_parser
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+with open(
+    os.path.join(
+        MOCKED_DATA, "test_get_vlans", "default", "show_running_config_delta_partition_flow.txt"
+    )
+) as f:
+    RUNNING = f.read()
+
+# load candidate has no mocked output
+LOADED = {"load candidate": ""}
+
+CIRCUIT_NAME = """home
+network-element ne-1
+  configure nte nte
+    configure access-port access-1-1-1-3
+      configure flow flow-1-1-1-3-1
+        circuit-name "{}"
+"""
+
+
+def test_merge_without_changes():
+    assert config_parser.diff(RUNNING, CIRCUIT_NAME.format("TESTING")) == ""
+
+
+def test_merge_diff():
+    diff = config_parser.diff(RUNNING, CIRCUIT_NAME.format("RENAMED")).splitlines()
+
+    assert diff[:2] == ["--- running", "+++ candidate"]
+    assert '-        circuit-name "TESTING"' in diff
+    assert '+        circuit-name "RENAMED"' in diff
+    # configure nte nte enters the nte of the running config
+    assert len([line for line in diff if line.startswith("+")]) == 2
+
+
+def test_merge_adds_context():
+    candidate = "configure system\n  prompt \"CPE\"\n"
+
+    diff = config_parser.diff(RUNNING, candidate).splitlines()
+
+    assert diff[-2:] == ["+configure system", '+  prompt "CPE"']
+
+
+ALIAS = """home
+network-element ne-1
+  configure nte nte104_e-1-1-1
+    configure access-port access-1-1-1-{}
+      alias "CUSTOMER"
+"""
+
+
+def test_entity_names_match_exactly():
+    running = ALIAS.format(10)
+    candidate = ALIAS.format(1)
+
+    diff = config_parser.diff(running, candidate).splitlines()
+    assert "+    configure access-port access-1-1-1-1" in diff
+    assert "+    configure access-port access-1-1-1-1" in config_parser.diff(
+        running, candidate, replace=True
+    ).splitlines()
+    assert config_parser.diff(running, running) == ""
+
+
+def test_prefix_must_name_one_context():
+    running = ALIAS.format(3) + ALIAS.format(4)
+    candidate = ALIAS.format(3).replace("nte104_e-1-1-1", "nte").replace(
+        "access-1-1-1-3", "access"
+    )
+
+    # configure nte nte is the only nte, configure access-port access is ambiguous
+    diff = config_parser.diff(running, candidate).splitlines()
+    assert "-  configure nte nte" not in diff
+    assert "+    configure access-port access" in diff
+
+
+def test_delete_is_always_a_change():
+    running = """#
+#CLI:MGMTTNL-1  Delete
+#
+home
+network-element ne-1
+  delete mgmttnl mgmt_tnl-1
+"""
+    candidate = "network-element ne-1\n  delete mgmttnl mgmt_tnl-1\n"
+
+    assert "+  delete mgmttnl mgmt_tnl-1" in config_parser.diff(running, candidate).splitlines()
+
+
+def test_replace_diff():
+    diff = config_parser.diff(RUNNING, CIRCUIT_NAME.format("TESTING"), replace=True)
+
+    # The flow of access-1-1-1-4 and the interfaces of the other flow are removed
+    assert "-    configure access-port access-1-1-1-4" in diff.splitlines()
+    assert not any(line.startswith("+") for line in diff.splitlines()[2:])
+
+
+def test_compare_config_reads_running_once(make_driver):
+    driver = make_driver("test_get_config", LOADED)
+    sent = driver.device.sent
+    driver.merge_candidate = 'configure system\n  prompt "CPE"\n'
+
+    assert '+  prompt "CPE"' in driver.compare_config()
+    assert '+  prompt "CPE"' in driver.compare_config()
+    assert sent.count("show running-config delta") == 1
+
+    driver.discard_config()
+    assert driver.compare_config() == ""
+
+
+def test_skip_noop_commit(make_driver):
+    driver = make_driver("test_get_config", LOADED, skip_noop_commits=True)
+    sent = driver.device.sent
+    driver.merge_candidate = 'configure system\n  prompt "ADVA-PREPROVISIONED"\n'
+
+    driver.commit_config()
+
+    assert driver.commit_skipped
+    assert "load candidate" not in sent
+    assert not driver.merge_candidate
+
+
+def test_commit_with_changes(make_driver):
+    driver = make_driver("test_get_config", LOADED, skip_noop_commits=True)
+    sent = driver.device.sent
+    driver.merge_candidate = 'configure system\n  prompt "CPE"\n'
+
+    driver.commit_config()
+
+    assert not driver.commit_skipped
+    assert "load candidate" in sent
+    # The running config changed, compare_config reads it again
+    assert driver._running_config is None
@@ -0,0 +1,87 @@
+"""Tests for the running config parser."""
+
+import os
+
+from napalm_adva.utils import config_parser
+
+from conftest import PatchedAdvaDriver
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+
+
+def _read(test, filename):
+    with open(os.path.join(MOCKED_DATA, test, "default", filename)) as f:
+        return f.read()
+
+
+def test_parse_running_config_blocks():
+    root = config_parser.parse_running_config(
+        _read("test_get_vlans", "show_running_config_delta_partition_mgmttnl.txt")
+    )
+
+    assert root.blocks == [
+        ("MANAGEMENT TUNNEL-1", "Delete"),
+        ("MANAGEMENT TUNNEL-1", "Create"),
+    ]
+    # Both blocks configure communication, they are merged in the tree
+    assert [c.command for c in root.find("configure communication")] == [
+        "configure communication"
+    ]
+
+
+def test_get_flows():
+    root = config_parser.parse_running_config(
+        _read("test_get_vlans", "show_running_config_delta_partition_flow.txt")
+    )
+
+    assert config_parser.get_flows(root) == {
+        "ne-1": {
+            "nte104_e-1-1-1": {
+                "access-1-1-1-3": {
+                    "flow-1-1-1-3-1": {
+                        "adminstate": None,
+                        "circuitname": "TESTING",
+                        "vlan": "2101",
+                        "networkinterface": "network-1-1-1-2",
+                        "accessinterface": "access-1-1-1-3",
+                    }
+                },
+                "access-1-1-1-4": {
+                    "flow-1-1-1-4-1": {
+                        "adminstate": None,
+                        "circuitname": "GE104RFCTEST",
+                        "vlan": "2222",
+                        "networkinterface": None,
+                        "accessinterface": "access-1-1-1-4",
+                    }
+                },
+            }
+        }
+    }
+
+
+def test_get_mgmt_tunnels():
+    root = config_parser.parse_running_config(
+        _read("test_get_interfaces_ip", "show_running_config_delta_partition_mgmttnl.txt")
+    )
+
+    assert config_parser.get_mgmt_tunnels(root) == [
+        {
+            "circuitname": "DCN",
+            "port": "network-1-1-1-1",
+            "vlan": "433",
+            "ipaddress": "10.32.31.195",
+            "subnet": "255.255.255.0",
+        }
+    ]
+
+
+def test_get_vlans_only_shows_incomplete_flows():
+    driver = PatchedAdvaDriver("test", "admin", "pwd")
+    driver.device.current_test = "test_get_vlans"
+    driver.device.current_test_case = "default"
+
+    driver.get_vlans()
+
+    # flow partition, show flow for the two flows without admin-state, mgmttnl partition
+    assert driver.round_trips == 4
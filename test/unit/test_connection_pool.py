@@ -0,0 +1,148 @@
+"""Tests for the SSH connection pool."""
+
+import pytest
+
+from napalm_adva.adva import AdvaDriver
+from napalm_adva.utils import connection_pool
+from napalm_adva.utils.connection_pool import ConnectionPool
+
+from conftest import PatchedAdvaDriver
+
+KEY = ("cpe-1", 22, "admin")
+
+
+class FakeConnection(object):
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.commands = []
+        self.disconnected = False
+
+    def is_alive(self):
+        return self.alive
+
+    def send_command(self, command, **kwargs):
+        self.commands.append(command)
+        return ""
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+def test_acquire_reuses_released_session():
+    pool = ConnectionPool()
+    first = pool.acquire(KEY, FakeConnection)
+    pool.release(KEY, first)
+
+    assert pool.acquire(KEY, FakeConnection) is first
+    assert pool.acquire(KEY, FakeConnection) is not first
+    assert pool.stats() == {"hits": 1, "misses": 2, "size": 0}
+
+
+def test_sessions_are_keyed_by_host_port_and_user():
+    pool = ConnectionPool()
+    session = FakeConnection()
+    pool.release(KEY, session)
+
+    assert pool.acquire(("cpe-1", 22, "other"), FakeConnection) is not session
+    assert pool.acquire(KEY, FakeConnection) is session
+
+
+def test_failed_check_reconnects():
+    pool = ConnectionPool()
+    dead = FakeConnection()
+    pool.release(KEY, dead)
+
+    session = pool.acquire(KEY, FakeConnection, check=lambda c: False)
+
+    assert session is not dead
+    assert dead.disconnected
+
+
+def test_check_raising_reconnects():
+    pool = ConnectionPool()
+    dead = FakeConnection()
+    pool.release(KEY, dead)
+
+    def check(connection):
+        raise OSError("Socket is closed")
+
+    assert pool.acquire(KEY, FakeConnection, check=check) is not dead
+    assert dead.disconnected
+
+
+def test_idle_eviction(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("napalm_adva.utils.connection_pool.time.monotonic", lambda: now[0])
+    pool = ConnectionPool(idle_timeout=60)
+    session = FakeConnection()
+    pool.release(KEY, session)
+
+    now[0] += 61
+    assert pool.acquire(KEY, FakeConnection) is not session
+    assert session.disconnected
+    assert len(pool) == 0
+
+
+def test_max_size_evicts_longest_idle(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("napalm_adva.utils.connection_pool.time.monotonic", lambda: now[0])
+    pool = ConnectionPool(max_size=2)
+    sessions = [FakeConnection() for i in range(3)]
+    for i, session in enumerate(sessions):
+        now[0] += 1
+        pool.release(("cpe-%d" % i, 22, "admin"), session)
+
+    assert len(pool) == 2
+    assert [s.disconnected for s in sessions] == [True, False, False]
+
+    pool.clear()
+    assert len(pool) == 0
+    assert all(s.disconnected for s in sessions)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = ConnectionPool()
+    monkeypatch.setattr(connection_pool, "_pool", pool)
+    return pool
+
+
+def test_driver_reuses_session(pool, monkeypatch):
+    connects = []
+
+    def connect(self):
+        connects.append(FakeConnection())
+        return connects[-1]
+
+    monkeypatch.setattr(PatchedAdvaDriver, "open", AdvaDriver.open)
+    monkeypatch.setattr(PatchedAdvaDriver, "_connect", connect)
+
+    for i in range(3):
+        driver = PatchedAdvaDriver("cpe-1", "admin", "pwd", optional_args={"connection_pool": True})
+        driver.open()
+        session = driver.device
+        driver.send_command("network-element ne-1")
+        driver.close()
+        assert driver.device is None
+
+    assert len(connects) == 1
+    # The health check returns the reused session to home
+    assert session.commands == ["network-element ne-1", "home"] * 2 + ["network-element ne-1"]
+    assert driver._cli_context == ("network-element ne-1",)
+    assert pool.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+
+def test_driver_reconnects_dead_session(pool, monkeypatch):
+    monkeypatch.setattr(PatchedAdvaDriver, "open", AdvaDriver.open)
+    monkeypatch.setattr(PatchedAdvaDriver, "_connect", lambda self: FakeConnection())
+
+    driver = PatchedAdvaDriver("cpe-1", "admin", "pwd", optional_args={"connection_pool": True})
+    driver.open()
+    dead = driver.device
+    driver.close()
+    dead.alive = False
+
+    driver.open()
+
+    assert driver.device is not dead
+    assert dead.disconnected
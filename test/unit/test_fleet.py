@@ -0,0 +1,160 @@
+"""Tests for the fleet runner."""
+
+import time
+
+from napalm.base.exceptions import ConnectionException
+
+from napalm_adva.fleet import DeadlineExceeded, FleetRunner
+
+from conftest import FakeAdvaDevice, PatchedAdvaDriver
+
+
+class SlowAdvaDevice(FakeAdvaDevice):
+    """Fake device that takes latency seconds to answer every command"""
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def send_command(self, command, **kwargs):
+        time.sleep(self.latency)
+        return super().send_command(command, **kwargs)
+
+
+class FleetAdvaDriver(PatchedAdvaDriver):
+    """Patched driver that selects the mocked data of each getter"""
+
+    def __init__(self, hostname, username, password, timeout=60, optional_args=None):
+        super().__init__(hostname, username, password, timeout, optional_args)
+        self.device = SlowAdvaDevice(self.optional_args.get("latency", 0))
+
+    def open(self):
+        if self.hostname.startswith("unreachable"):
+            raise ConnectionException("Cannot connect to switch: %s" % self.hostname)
+
+    def __getattribute__(self, name):
+        if name.startswith("get_"):
+            device = object.__getattribute__(self, "device")
+            device.current_test = f"test_{name}"
+            device.current_test_case = "default"
+        return object.__getattribute__(self, name)
+
+
+def _inventory(count, latency=0.0, prefix="cpe"):
+    return [
+        {
+            "hostname": f"{prefix}-{i}",
+            "username": "admin",
+            "password": "pwd",
+            "optional_args": {"latency": latency},
+        }
+        for i in range(count)
+    ]
+
+
+def test_fleet_results():
+    inventory = _inventory(3) + _inventory(1, prefix="unreachable")
+    runner = FleetRunner(inventory, ["get_facts", "get_vlans", "get_users"], driver=FleetAdvaDriver)
+
+    results = runner.run_all()
+
+    assert len(results) == 4
+    assert results["cpe-0"].results["get_facts"]["vendor"] == "Adva"
+    assert "2101" in results["cpe-0"].results["get_vlans"]
+    assert isinstance(results["cpe-0"].errors["get_users"], NotImplementedError)
+    assert isinstance(results["unreachable-0"].errors["open"], ConnectionException)
+    assert results["unreachable-0"].results == {}
+
+
+def test_fleet_concurrency():
+    # get_facts sends 5 commands, 50 devices at 20ms per command
+    runner = FleetRunner(
+        _inventory(50, latency=0.02), ["get_facts"], max_workers=50, driver=FleetAdvaDriver
+    )
+
+    start = time.monotonic()
+    results = list(runner.run())
+
+    assert len(results) == 50
+    assert all(result.ok for result in results)
+    assert time.monotonic() - start < 50 * 5 * 0.02 / 4
+
+
+def test_fleet_streams_results():
+    inventory = _inventory(1, latency=0.0, prefix="fast") + _inventory(
+        1, latency=0.2, prefix="slow"
+    )
+    runner = FleetRunner(inventory, ["get_facts"], driver=FleetAdvaDriver)
+
+    assert [result.hostname for result in runner.run()] == ["fast-0", "slow-0"]
+
+
+def test_fleet_device_timeout():
+    runner = FleetRunner(
+        _inventory(1, latency=0.05),
+        ["get_facts", "get_vlans"],
+        device_timeout=0.1,
+        driver=FleetAdvaDriver,
+    )
+
+    result = runner.run_all()["cpe-0"]
+
+    assert "get_facts" in result.results
+    assert isinstance(result.errors["get_vlans"], DeadlineExceeded)
+
+
+def test_fleet_deadline():
+    inventory = _inventory(1, prefix="fast") + _inventory(4, latency=0.2, prefix="slow")
+    runner = FleetRunner(
+        inventory, ["get_facts"], max_workers=2, deadline=0.3, driver=FleetAdvaDriver
+    )
+
+    start = time.monotonic()
+    results = runner.run_all()
+
+    assert time.monotonic() - start < 0.6
+    assert results["fast-0"].ok
+    assert isinstance(results["slow-3"].errors["deadline"], DeadlineExceeded)
+
+
+def test_fleet_deadline_with_slow_consumer():
+    inventory = (
+        _inventory(1, prefix="a")
+        + _inventory(1, latency=0.05, prefix="b")
+        + _inventory(1, latency=0.5, prefix="c")
+    )
+    runner = FleetRunner(inventory, ["get_facts"], deadline=0.5, driver=FleetAdvaDriver)
+
+    results = []
+    for result in runner.run():
+        results.append(result)
+        if len(results) == 1:
+            # b finishes while the consumer is busy, after the deadline it is still yielded
+            time.sleep(0.6)
+
+    assert [result.hostname for result in results] == ["a-0", "b-0", "c-0"]
+    assert results[1].ok
+    assert isinstance(results[2].errors["deadline"], DeadlineExceeded)
+
+
+class CountingAdvaDriver(FleetAdvaDriver):
+    """Counts the get_facts calls of every driver"""
+
+    calls = []
+
+    def get_facts(self):
+        self.calls.append(self.hostname)
+        return super().get_facts()
+
+
+def test_fleet_stops_when_the_consumer_stops():
+    inventory = _inventory(1, prefix="fast") + _inventory(1, latency=0.05, prefix="slow")
+    runner = FleetRunner(inventory, ["get_facts"] * 10, driver=CountingAdvaDriver)
+
+    for result in runner.run():
+        break
+    time.sleep(0.5)
+
+    assert result.hostname == "fast-0"
+    # get_facts takes 4 commands, slow-0 stops after the one it was running
+    assert CountingAdvaDriver.calls.count("slow-0") <= 2
@@ -0,0 +1,54 @@
+"""Tests for the filterable MAC address table generator."""
+
+import types
+
+import pytest
+
+BOTH = ["bc:d7:a5:cf:30:40", "00:00:5e:00:01:0a"]
+
+
+def test_iter_is_a_generator(make_driver):
+    driver = make_driver("test_get_mac_address_table")
+    entries = driver.iter_mac_address_table()
+
+    assert isinstance(entries, types.GeneratorType)
+    assert driver.round_trips == 0
+    assert next(entries)["mac"] == "bc:d7:a5:cf:30:40"
+
+
+def test_no_filters_matches_get_mac_address_table(make_driver):
+    driver = make_driver("test_get_mac_address_table")
+    assert list(driver.iter_mac_address_table()) == driver.device.expected_result
+
+
+@pytest.mark.parametrize(
+    "filters, macs",
+    [
+        ({"port": "access-1-1-1-7"}, BOTH),
+        ({"port": ["access-1-1-1-7", "access-1-1-1-8"]}, BOTH),
+        ({"flow": "flow-1-1-1-7-1"}, BOTH),
+        ({"mac_prefix": "00:00:5E"}, ["00:00:5e:00:01:0a"]),
+        ({"static": False}, BOTH),
+        ({"static": True}, []),
+    ],
+)
+def test_filters(filters, macs, make_driver):
+    driver = make_driver("test_get_mac_address_table")
+    assert [e["mac"] for e in driver.iter_mac_address_table(**filters)] == macs
+
+
+@pytest.mark.parametrize(
+    "filters, round_trips",
+    [
+        # network-element, configure nte and show ports only
+        ({"port": "access-1-1-1-3"}, 3),
+        ({"flow": "flow-1-1-1-3-1"}, 3),
+        # The port is entered and its flows listed, but not its flow
+        ({"flow": "flow-1-1-1-7-2"}, 5),
+    ],
+)
+def test_filters_skip_navigation(filters, round_trips, make_driver):
+    driver = make_driver("test_get_mac_address_table")
+
+    assert list(driver.iter_mac_address_table(**filters)) == []
+    assert driver.round_trips == round_trips
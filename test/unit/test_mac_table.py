@@ -0,0 +1,58 @@
+"""Tests for the compact MAC address table."""
+
+from napalm_adva.utils.mac_table import MacEntry, MacTable, int_to_mac, mac_to_int
+
+TEST = "test_get_mac_address_table"
+
+
+def test_mac_conversion():
+    assert mac_to_int("00:00:5e:00:01:0a") == 0x00005E00010A
+    assert int_to_mac(0x00005E00010A) == "00:00:5e:00:01:0a"
+    assert int_to_mac(mac_to_int("FF:FF:FF:FF:FF:FF")) == "ff:ff:ff:ff:ff:ff"
+
+
+def test_matches_get_mac_address_table(make_driver):
+    table = make_driver(TEST).get_mac_address_table_compact()
+
+    assert isinstance(table, MacTable)
+    assert table.to_dicts() == make_driver(TEST).get_mac_address_table()
+
+
+def test_mac_tracking(make_driver):
+    table = make_driver(TEST, mac_tracking=True).get_mac_address_table_compact()
+
+    assert [e.moves for e in table] == [0, 0]
+    assert [e.last_move for e in table] == [-1.0, -1.0]
+
+
+def test_iteration_and_lookup(make_driver):
+    table = make_driver(TEST).get_mac_address_table_compact()
+
+    assert len(table) == 2
+    assert [e.mac for e in table] == ["bc:d7:a5:cf:30:40", "00:00:5e:00:01:0a"]
+    assert table.get("00:00:5E:00:01:0A") == MacEntry(
+        "00:00:5e:00:01:0a", "access-1-1-1-7", False, True
+    )
+    assert "bc:d7:a5:cf:30:40" in table
+    assert table.get("aa:aa:aa:aa:aa:aa") is None
+
+
+def test_interfaces_are_interned():
+    table = MacTable(
+        MacEntry(int_to_mac(i), "access-1-1-1-%d" % (i % 3), i % 2 == 0, True) for i in range(30)
+    )
+    table.append("aa:aa:aa:aa:aa:aa", "network-1-1-1-1", True, False, 2, 1000.0)
+
+    assert table.interfaces == [
+        "access-1-1-1-0", "access-1-1-1-1", "access-1-1-1-2", "network-1-1-1-1"
+    ]
+    assert table[7] == MacEntry("00:00:00:00:00:07", "access-1-1-1-1", False, True)
+    assert table.get("aa:aa:aa:aa:aa:aa").as_dict() == {
+        "mac": "aa:aa:aa:aa:aa:aa",
+        "interface": "network-1-1-1-1",
+        "vlan": -1,
+        "static": True,
+        "active": False,
+        "moves": 2,
+        "last_move": 1000.0,
+    }
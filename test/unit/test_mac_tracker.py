@@ -0,0 +1,101 @@
+"""Tests for incremental MAC address table polling."""
+
+from napalm_adva.utils.mac_tracker import MacTracker
+
+from conftest import PatchedAdvaDriver
+
+MAC_1 = "aa:aa:aa:aa:aa:01"
+MAC_2 = "aa:aa:aa:aa:aa:02"
+MAC_3 = "aa:aa:aa:aa:aa:03"
+
+
+def _entry(mac, interface, static=False):
+    return {
+        "mac": mac,
+        "interface": interface,
+        "vlan": -1,
+        "static": static,
+        "active": True,
+        "moves": -1,
+        "last_move": -1.0,
+    }
+
+
+def _poll(tracker, rows, now):
+    return tracker.update([_entry(*row) for row in rows], now=now)
+
+
+def test_first_poll_adds_everything():
+    tracker = MacTracker()
+
+    table, changes = _poll(tracker, [(MAC_1, "access-1-1-1-3"), (MAC_2, "access-1-1-1-4")], 1000.0)
+
+    assert [e["mac"] for e in changes["added"]] == [MAC_1, MAC_2]
+    assert changes["removed"] == changes["moved"] == []
+    # Nothing moved yet
+    assert [(e["moves"], e["last_move"]) for e in table] == [(0, -1.0), (0, -1.0)]
+    assert len(tracker) == 2
+
+
+def test_unchanged_poll_reports_nothing():
+    tracker = MacTracker()
+    _poll(tracker, [(MAC_1, "access-1-1-1-3")], 1000.0)
+
+    table, changes = _poll(tracker, [(MAC_1, "access-1-1-1-3")], 1200.0)
+
+    assert changes == {"added": [], "removed": [], "moved": []}
+    assert table[0]["moves"] == 0
+    assert table[0]["last_move"] == -1.0
+
+
+def test_move_and_remove():
+    tracker = MacTracker()
+    _poll(tracker, [(MAC_1, "access-1-1-1-3"), (MAC_2, "access-1-1-1-3")], 1000.0)
+
+    table, changes = _poll(tracker, [(MAC_1, "network-1-1-1-1"), (MAC_3, "access-1-1-1-3")], 1100.0)
+
+    moved = changes["moved"][0]
+    assert moved["mac"] == MAC_1
+    assert moved["previous_interface"] == "access-1-1-1-3"
+    assert moved["moves"] == 1
+    # The time of the poll that saw the move
+    assert moved["last_move"] == 1100.0
+    assert [e["mac"] for e in changes["removed"]] == [MAC_2]
+    assert changes["removed"][0]["interface"] == "access-1-1-1-3"
+    assert [e["mac"] for e in changes["added"]] == [MAC_3]
+    assert table[0]["moves"] == 1
+
+
+def test_last_move_kept_until_the_next_move():
+    tracker = MacTracker()
+    _poll(tracker, [(MAC_1, "access-1-1-1-3")], 1000.0)
+    _poll(tracker, [(MAC_1, "access-1-1-1-4")], 1100.0)
+
+    table, changes = _poll(tracker, [(MAC_1, "access-1-1-1-4")], 1200.0)
+
+    assert changes["moved"] == []
+    assert (table[0]["moves"], table[0]["last_move"]) == (1, 1100.0)
+
+
+def test_driver_mac_tracking():
+    driver = PatchedAdvaDriver("test", "admin", "pwd", optional_args={"mac_tracking": True})
+    driver.device.current_test = "test_get_mac_address_table"
+    driver.device.current_test_case = "default"
+
+    table = driver.get_mac_address_table()
+    expected = driver.device.expected_result
+    assert [e["mac"] for e in table] == [e["mac"] for e in expected]
+    assert all(e["moves"] == 0 and e["last_move"] == -1.0 for e in table)
+
+    assert driver.get_mac_address_table_changes() == {"added": [], "removed": [], "moved": []}
+
+
+def test_driver_changes_start_tracking():
+    driver = PatchedAdvaDriver("test", "admin", "pwd")
+    driver.device.current_test = "test_get_mac_address_table"
+    driver.device.current_test_case = "default"
+
+    changes = driver.get_mac_address_table_changes()
+
+    assert len(changes["added"]) == 2
+    assert driver.mac_tracker is not None
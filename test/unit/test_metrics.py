@@ -0,0 +1,108 @@
+"""Tests for the driver metrics."""
+
+import asyncio
+import json
+
+import pytest
+
+from napalm_adva.utils.metrics import Histogram, Metrics, command_key
+
+
+def test_command_key():
+    assert command_key("show access-port access-1-1-1-3") == "show access-port <eid>"
+    assert command_key("network-element ne-1") == "network-element <eid>"
+    assert command_key("show running-config delta") == "show running-config delta"
+    assert command_key(["show access-port access-1-1-1-3", "show access-port access-1-1-1-4"]) == (
+        "show access-port <eid>"
+    )
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    summary = histogram.summary()
+    assert summary["buckets"] == {"0.1": 2, "1": 1, "+Inf": 1}
+    assert summary["count"] == 4
+    assert (summary["min"], summary["max"]) == (0.05, 3)
+
+
+def test_disabled_by_default(make_driver):
+    driver = make_driver("test_get_facts")
+
+    assert driver.metrics is None
+    # The getters are not wrapped
+    assert "get_facts" not in vars(driver)
+    driver.get_facts()
+
+
+def test_getter_metrics(make_driver):
+    events = []
+    driver = make_driver(
+        "test_get_interfaces", metrics={"hooks": [lambda event, data: events.append(event)]}
+    )
+
+    driver.get_interfaces()
+
+    summary = driver.metrics.summary()
+    assert summary["getters"]["get_interfaces"]["calls"] == 1
+    assert summary["getters"]["get_interfaces"]["round_trips"] == driver.round_trips
+    assert summary["commands"]["show access-port <eid>"]["count"] == 4
+    assert summary["commands"]["show ports"]["bytes"] > 0
+    assert summary["parse"]["show_port_details"]["count"] == 6
+
+    span = driver.metrics.spans[-1]
+    assert (span["name"], span["hostname"], span["error"]) == ("get_interfaces", "test", None)
+    assert events[-1] == "span" and "command" in events and "parse" in events
+
+
+def test_getter_error_span(make_driver):
+    driver = make_driver("test_get_facts", metrics=True)
+    driver.device.current_test = "test_missing"
+
+    with pytest.raises(IOError):
+        driver.get_facts()
+
+    assert driver.metrics.spans[-1]["error"] == "OSError"
+    assert driver.metrics.summary()["getters"]["get_facts"]["errors"] == 1
+
+
+def test_shared_registry_and_export(tmp_path, make_driver):
+    path = tmp_path / "metrics.jsonl"
+    registry = Metrics(export=str(path))
+    driver = make_driver("test_get_facts", metrics=registry)
+
+    driver.get_facts()
+    driver.close()
+
+    assert driver.metrics is registry
+    summary = json.loads(path.read_text())
+    assert summary["hostname"] == "test"
+    assert summary["getters"]["get_facts"]["calls"] == 1
+
+
+def test_async_spans():
+    pytest.importorskip("asyncssh")
+    from napalm_adva.async_adva import AsyncAdvaDriver
+    from ssh_server import start_server
+
+    async def run():
+        server, port = await start_server()
+        try:
+            async with AsyncAdvaDriver(
+                "127.0.0.1",
+                "test_get_facts",
+                "pwd",
+                timeout=10,
+                optional_args={"port": port, "metrics": True},
+            ) as driver:
+                await driver.get_facts()
+                return driver.metrics.summary()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    summary = asyncio.run(run())
+    assert summary["getters"]["get_facts"]["calls"] == 1
+    assert summary["commands"]["show system"]["count"] == 1
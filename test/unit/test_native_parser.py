@@ -0,0 +1,77 @@
+"""Equivalence tests for the native parsers against their TextFSM templates."""
+
+import glob
+import os
+
+import pytest
+
+from napalm_adva import AdvaDriver
+from napalm_adva.utils import native_parser
+from napalm_adva.utils.textfsm_cache import textfsm_extractor
+
+from conftest import PatchedAdvaDriver
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+MOCKED_FILES = sorted(glob.glob(os.path.join(MOCKED_DATA, "*", "*", "*.txt")))
+
+EDGE_CASES = [
+    "",
+    "Alias :",
+    "Alias :  two-spaces",
+    "  Alias : first second",
+    "OAM Admin State : enabled",
+    "Admin State  : in-service",
+    "Admin State : in-service\nAdmin State : management",
+    "C-Tag : 3-0",
+    "C-Tag : none",
+    "System Description : FSP 150-GE104(E)  ",
+    "System Up Time : 3 hrs 1 secs",
+    "System Up Time : unknown",
+    # Lines after the wave length are not read
+    "Admin State : in-service\nSFP Laser Wave Length (nm) : 1310\nAdmin State : management",
+    "SFP Laser Wave Length (nm) : 1310\nAlias : after",
+    "SFP Laser Wave Length (nm) :\nAlias : after",
+]
+
+
+@pytest.mark.parametrize("template_name", sorted(native_parser.LABELS))
+@pytest.mark.parametrize(
+    "filename", MOCKED_FILES, ids=[os.path.relpath(f, MOCKED_DATA) for f in MOCKED_FILES]
+)
+def test_mocked_data(template_name, filename):
+    driver = AdvaDriver("test", "admin", "pwd")
+    with open(filename) as f:
+        raw_text = f.read()
+
+    assert native_parser.parse_labels(template_name, raw_text) == textfsm_extractor(
+        driver, template_name, raw_text
+    )
+
+
+@pytest.mark.parametrize("template_name", sorted(native_parser.LABELS))
+@pytest.mark.parametrize("raw_text", EDGE_CASES)
+def test_edge_cases(template_name, raw_text):
+    driver = AdvaDriver("test", "admin", "pwd")
+
+    assert native_parser.parse_labels(template_name, raw_text) == textfsm_extractor(
+        driver, template_name, raw_text
+    )
+
+
+@pytest.mark.parametrize(
+    "getter", ["get_facts", "get_interfaces", "get_vlans"],
+)
+def test_native_driver(getter):
+    results = []
+    for parser in ("textfsm", "native"):
+        driver = PatchedAdvaDriver("test", "admin", "pwd", optional_args={"parser": parser})
+        driver.device.current_test = f"test_{getter}"
+        driver.device.current_test_case = "default"
+        results.append(getattr(driver, getter)())
+
+    assert results[0] == results[1]
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        AdvaDriver("test", "admin", "pwd", optional_args={"parser": "regex"})
@@ -0,0 +1,89 @@
+"""Tests for the prompt-driven reads and their adaptive timeouts."""
+
+import pytest
+from napalm.base.exceptions import CommandTimeoutException
+from netmiko.exceptions import ReadTimeout
+
+from napalm_adva.adva import _strip_banner
+from napalm_adva.utils.read_timeouts import ReadTimeouts
+
+from conftest import PatchedAdvaDriver
+
+
+def test_initial_timeouts():
+    timeouts = ReadTimeouts(initial=10, command_timeouts={"show ports": 3})
+
+    assert timeouts.get("show system") == 10
+    assert timeouts.get("show ports") == 3
+    assert timeouts.get("show running-config delta") == 120
+
+
+def test_learned_timeouts():
+    timeouts = ReadTimeouts(minimum=0.5, maximum=30)
+
+    for _ in range(20):
+        timeouts.observe("show access-port access-1-1-1-3", 0.2)
+    # Shared by every port, and converges to the latency plus a margin
+    assert 0.5 <= timeouts.get("show access-port access-1-1-1-9") < 1
+
+    timeouts.observe("show running-config delta", 100)
+    assert timeouts.get("show running-config delta") == 30
+
+
+def test_slow_response_after_fast_ones(make_driver):
+    driver = make_driver("test_get_facts")
+    latencies = {"show system": 0.01}
+    send_command = driver.device.send_command
+
+    def slow_send_command(command, **kwargs):
+        # Answers at once, but would have taken latencies[command] on a device
+        if latencies.get(command, 0) > kwargs["read_timeout"]:
+            raise ReadTimeout("Pattern not detected")
+        return send_command(command, **kwargs)
+
+    driver.device.send_command = slow_send_command
+    for _ in range(20):
+        driver.send_command("show system")
+
+    latencies["show system"] = 8
+    assert "System Name" in driver.send_command("show system")
+
+
+def test_strip_banner():
+    config = "#\n#CLI:SUBNETWORK  Edit\n#\n"
+
+    assert _strip_banner("Preparing configuration file...\n\n" + config) == config
+    assert _strip_banner("Preparing configuration file...\r\n\r\n" + config) == config
+    assert _strip_banner(config) == config
+
+
+def test_reads_wait_for_the_prompt():
+    driver = PatchedAdvaDriver("test", "admin", "pwd")
+    driver.device.current_test = "test_get_facts"
+    driver.device.current_test_case = "default"
+    calls = []
+    send_command = driver.device.send_command
+
+    def recording_send_command(command, **kwargs):
+        calls.append((command, kwargs))
+        return send_command(command, **kwargs)
+
+    driver.device.send_command = recording_send_command
+    driver.device.send_command_timing = None
+
+    driver.get_facts()
+    driver.send_command_timing("show ports")
+
+    assert all(kwargs["expect_string"] and kwargs["read_timeout"] for _, kwargs in calls)
+    assert "show ports" in [command for command, _ in calls]
+
+
+def test_read_timeout():
+    driver = PatchedAdvaDriver("test", "admin", "pwd")
+
+    def send_command(command, **kwargs):
+        raise ReadTimeout("Pattern not detected")
+
+    driver.device.send_command = send_command
+    with pytest.raises(CommandTimeoutException):
+        driver.send_command("show system")
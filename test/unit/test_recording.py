@@ -0,0 +1,81 @@
+"""Tests for session recording and replay."""
+
+import json
+import os
+import time
+
+from napalm_adva.adva import AdvaDriver
+from napalm_adva.simulator import SyntheticDevice
+from napalm_adva.simulator.connection import SimulatedConnection
+from napalm_adva.utils.recording import INDEX, ReplayConnection
+
+from conftest import FakeAdvaDevice
+
+MOCKED_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mocked_data")
+
+GETTERS = ("get_facts", "get_interfaces", "get_vlans", "get_mac_address_table", "get_config")
+
+
+def _record(tmp_path, monkeypatch, latency=0):
+    device = SyntheticDevice(ports=6, flows=8, fwd_entries=24)
+    monkeypatch.setattr(AdvaDriver, "_connect", lambda self: SimulatedConnection(device, latency))
+
+    driver = AdvaDriver("sim", "admin", "pwd", optional_args={"record": str(tmp_path)})
+    driver.open()
+    results = {getter: getattr(driver, getter)() for getter in GETTERS}
+    driver.close()
+    return driver, results
+
+
+def test_record(tmp_path, monkeypatch):
+    driver, _ = _record(tmp_path, monkeypatch)
+
+    assert isinstance(driver.device, SimulatedConnection)
+    with open(tmp_path / INDEX) as f:
+        entries = json.load(f)["entries"]
+    assert len(entries) == driver.round_trips
+
+    list_flows = [e for e in entries if e["command"] == "list flows"]
+    assert list_flows[0]["context"][-1] == "configure access-port access-1-1-1-3"
+    # Every access port has other flows, in numbered files
+    assert len({e["file"] for e in list_flows}) == 4
+    assert all(e["elapsed"] >= 0 for e in entries)
+
+    # Readable by the test double, like mocked_data
+    fake = FakeAdvaDevice()
+    fake.find_file = lambda filename: os.path.join(tmp_path, filename)
+    assert "System Name : SIM-FSP150XG108" in fake.send_command("show system")
+
+
+def test_replay(tmp_path, monkeypatch):
+    _, results = _record(tmp_path, monkeypatch)
+
+    driver = AdvaDriver("sim", "admin", "pwd")
+    driver.device = ReplayConnection(str(tmp_path), speed=None)
+
+    for getter in GETTERS:
+        assert getattr(driver, getter)() == results[getter]
+
+
+def test_replay_timings(tmp_path, monkeypatch):
+    _record(tmp_path, monkeypatch, latency={"list fwd-entries": 0.01})
+
+    def replay(speed):
+        driver = AdvaDriver("sim", "admin", "pwd")
+        driver.device = ReplayConnection(str(tmp_path), speed=speed)
+        start = time.perf_counter()
+        driver.get_mac_address_table()
+        return time.perf_counter() - start
+
+    # 8 flows with fwd-entries
+    assert replay(1) >= 0.08
+    assert replay(None) < 0.08
+
+
+def test_replay_mocked_data():
+    driver = AdvaDriver("test", "admin", "pwd")
+    driver.device = ReplayConnection(os.path.join(MOCKED_DATA, "test_get_vlans", "default"))
+
+    with open(os.path.join(MOCKED_DATA, "test_get_vlans", "default", "expected_result.json")) as f:
+        expected = json.load(f)
+    assert driver.get_vlans() == expected
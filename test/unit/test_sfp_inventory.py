@@ -0,0 +1,66 @@
+"""Tests for get_sfp_inventory, and the port details it shares with get_interfaces."""
+
+
+def test_get_sfp_inventory(make_driver):
+    inventory = make_driver("test_get_sfp_inventory").get_sfp_inventory()
+
+    assert sorted(inventory) == ["network-1-1-1-1", "network-1-1-1-2"]
+    assert inventory["network-1-1-1-1"] == {
+        "name": "XFP-10G-LR",
+        "vendor": "FINISAR CORP.",
+        "part_number": "FTLX1471D3BCL",
+        "serial_number": "UMK0F4P",
+        "hardware_revision": "A",
+        "manufacture_date": "2019-03-14",
+        "connector": "lc",
+        "media_type": "single-mode",
+        "link_length": 10000,
+        "wavelength": 1310,
+    }
+    # Not Available fields
+    assert inventory["network-1-1-1-2"]["manufacture_date"] == ""
+    assert inventory["network-1-1-1-2"]["link_length"] == -1
+
+
+def test_port_details_shared_by_default(make_driver):
+    driver = make_driver("test_get_sfp_inventory")
+
+    driver.get_interfaces()
+    round_trips = driver.round_trips
+    driver.get_sfp_inventory()
+
+    assert driver.round_trips == round_trips
+
+
+def test_port_details_read_every_call(make_driver):
+    driver = make_driver("test_get_sfp_inventory", port_details_ttl=0)
+
+    driver.get_interfaces()
+    round_trips = driver.round_trips
+    driver.get_sfp_inventory()
+
+    assert driver.round_trips == 2 * round_trips
+
+
+def test_port_details_expire(monkeypatch, make_driver):
+    now = [1000.0]
+    monkeypatch.setattr("napalm_adva.adva.time.monotonic", lambda: now[0])
+    driver = make_driver("test_get_sfp_inventory")
+
+    driver.get_interfaces()
+    round_trips = driver.round_trips
+    now[0] += 11
+    driver.get_sfp_inventory()
+
+    assert driver.round_trips == 2 * round_trips
+
+
+def test_config_change_reads_port_details_again(make_driver):
+    driver = make_driver("test_get_sfp_inventory")
+
+    driver.get_interfaces()
+    round_trips = driver.round_trips
+    driver.discard_config()
+    driver.get_sfp_inventory()
+
+    assert driver.round_trips == 2 * round_trips
@@ -0,0 +1,157 @@
+"""Tests for the FSP 150 CLI simulator."""
+
+import asyncio
+from importlib.util import find_spec
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from napalm_adva.adva import AdvaDriver
+from napalm_adva.simulator import SyntheticDevice
+from napalm_adva.simulator.connection import SimulatedConnection
+from napalm_adva.simulator.session import ERROR, CLISession
+
+needs_asyncssh = pytest.mark.skipif(
+    find_spec("asyncssh") is None, reason="the SSH server needs asyncssh"
+)
+
+
+def test_synthetic_device_size():
+    device = SyntheticDevice(ports=64, flows=100, fwd_entries=1000)
+
+    assert len(device.ports) == 64
+    assert len(device.flows) == 100
+    assert sum(len(entries) for entries in device.fwd_entries.values()) == 1000
+    assert "flow-1-1-1-3-2" in device.flows
+    assert device.ports["access-1-1-1-64"]["adminstate"] == "in-service"
+
+
+def test_session_navigation():
+    session = CLISession(SyntheticDevice(ports=4, flows=2, fwd_entries=4))
+
+    session.execute("network-element ne-1")
+    session.execute("configure nte nte")
+    session.execute("configure access-port access-1-1-1-3")
+    assert session.prompt == "SIM-FSP150XG108-NE-1:access-1-1-1-3-->"
+    assert "flow-1-1-1-3-1" in session.execute("list flows")
+
+    session.execute("configure flow flow-1-1-1-3-1")
+    assert session.execute("list fwd-entries").count("02:00:") == 2
+
+    session.execute("back")
+    assert session.execute("configure flow flow-1-1-1-9-1") == ERROR
+    assert session.prompt == "SIM-FSP150XG108-NE-1:access-1-1-1-3-->"
+
+    session.execute("home")
+    assert session.prompt == "SIM-FSP150XG108-->"
+    session.execute("admin config")
+    assert session.prompt == "SIM-FSP150XG108-->"
+    assert session.execute("show bogus") == ERROR
+
+
+def test_session_latency():
+    session = CLISession(SyntheticDevice(), latency={"show": 0.5, "show ports": 0.1})
+
+    assert session.delay("show ports") == 0.1
+    assert session.delay("show system") == 0.5
+    assert session.delay("home") == 0
+
+
+@needs_asyncssh
+def test_latency_delays_output():
+    from napalm_adva.simulator import server
+
+    class Process(object):
+        def __init__(self):
+            self.stdin = asyncio.Queue()
+            self.stdin.readline = self.stdin.get
+            self.stdout = self
+            self.written = []
+
+        def write(self, data):
+            self.written.append(data)
+
+        def exit(self, status):
+            pass
+
+    async def run():
+        process = Process()
+        for line in ("show system\n", ""):
+            process.stdin.put_nowait(line)
+        start = time.monotonic()
+        await server._handle(CLISession(SyntheticDevice(), latency=0.2), process)
+        return time.monotonic() - start, "".join(process.written)
+
+    elapsed, written = asyncio.run(run())
+    assert elapsed >= 0.2
+    assert "Release Version : 13.7.1-84" in written
+
+
+@needs_asyncssh
+def test_driver_against_simulator():
+    from napalm_adva.simulator import AdvaSimulator
+
+    device = SyntheticDevice(ports=12, flows=15, fwd_entries=45)
+
+    with AdvaSimulator(device) as simulator:
+        driver = AdvaDriver(
+            "127.0.0.1", "admin", "pwd", timeout=10, optional_args={"port": simulator.port}
+        )
+        driver.open()
+        try:
+            facts = driver.get_facts()
+            vlans = driver.get_vlans()
+            mac_address_table = driver.get_mac_address_table()
+            lldp_neighbors = driver.get_lldp_neighbors()
+        finally:
+            driver.close()
+
+    assert facts["hostname"] == "SIM-FSP150XG108"
+    assert facts["interface_list"] == list(device.ports)
+    # The flows and the management tunnel
+    assert len(vlans) == 16 and "433" in vlans
+    assert vlans["1014"] == {"name": "SIM-15", "interfaces": ["network-1-1-1-1", "access-1-1-1-7"]}
+    assert len(mac_address_table) == 45
+    assert sum(entry["static"] for entry in mac_address_table) == 4
+    assert sorted(lldp_neighbors) == ["network-1-1-1-1", "network-1-1-1-2"]
+
+
+def test_simulated_connection():
+    device = SyntheticDevice(ports=12, flows=15, fwd_entries=45)
+    driver = AdvaDriver("sim", "admin", "pwd")
+    driver.device = SimulatedConnection(device, latency={"list": 0.001})
+
+    assert len(driver.get_mac_address_table()) == 45
+    assert driver.get_facts()["interface_list"] == list(device.ports)
+    assert len(driver.get_interfaces()) == 12
+    assert driver.device.exchanges == driver.round_trips
+
+
+@needs_asyncssh
+def test_server_only_listens_on_loopback():
+    from napalm_adva.simulator import create_server
+
+    with pytest.raises(ValueError, match="loopback"):
+        asyncio.run(create_server(SyntheticDevice(), host="0.0.0.0"))
+
+
+def test_simulated_connection_without_asyncssh():
+    script = (
+        "import sys\n"
+        "sys.modules['asyncssh'] = None\n"
+        "from napalm_adva import AdvaDriver\n"
+        "from napalm_adva.simulator import SyntheticDevice\n"
+        "from napalm_adva.simulator.connection import SimulatedConnection\n"
+        "driver = AdvaDriver('sim', 'admin', 'pwd')\n"
+        "driver.device = SimulatedConnection(SyntheticDevice())\n"
+        "print(driver.get_facts()['hostname'])\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "SIM-FSP150XG108"
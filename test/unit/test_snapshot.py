@@ -0,0 +1,108 @@
+"""Tests for get_snapshot and its command planner."""
+
+import pytest
+
+from napalm_adva import AdvaDriver
+from napalm_adva.adva import SNAPSHOT_BATCH_SIZE, SNAPSHOT_GETTERS
+from napalm_adva.simulator import SyntheticDevice
+from napalm_adva.simulator.connection import SimulatedConnection
+from napalm_adva.utils import cli_context, snapshot
+
+GETTERS = SNAPSHOT_GETTERS + (
+    "get_sfp_inventory",
+    "get_static_routes",
+    "get_config",
+    "get_mac_address_table",
+)
+
+
+def test_plan():
+    commands = [
+        (cli_context.HOME, "show system"),
+        (cli_context.NETWORK_ELEMENT, "show shelf-info"),
+        (cli_context.HOME, "show ports"),
+        (cli_context.NTE, "show ports"),
+        (cli_context.HOME, "show ports"),
+    ]
+
+    assert snapshot.plan(cli_context.NETWORK_ELEMENT, commands) == [
+        (cli_context.NETWORK_ELEMENT, ["show shelf-info"]),
+        (cli_context.NTE, ["show ports"]),
+        (cli_context.HOME, ["show system", "show ports"]),
+    ]
+
+
+class CountingConnection(SimulatedConnection):
+    """Counts how often each command is sent"""
+
+    def __init__(self, device):
+        super().__init__(device)
+        self.sent = []
+        # Commands in each pipelined write
+        self.writes = []
+
+    def send_command(self, command, **kwargs):
+        self.sent.append(command)
+        return super().send_command(command, **kwargs)
+
+    def write_channel(self, out_data):
+        self.sent.extend(out_data.splitlines())
+        self.writes.append(len(out_data.splitlines()))
+        super().write_channel(out_data)
+
+
+def _driver(**optional_args):
+    driver = AdvaDriver("test", "admin", "pwd", optional_args=optional_args)
+    driver.device = CountingConnection(SyntheticDevice(ports=16, fwd_entries=20))
+    return driver
+
+
+@pytest.mark.parametrize("getters", [SNAPSHOT_GETTERS, GETTERS])
+@pytest.mark.parametrize("optional_args", [{}, {"port_details_ttl": 0}, {"parser": "native"}])
+def test_matches_getters_one_by_one(getters, optional_args):
+    one_by_one = _driver(**optional_args)
+    expected = {getter: getattr(one_by_one, getter)() for getter in getters}
+
+    assert _driver(**optional_args).get_snapshot(getters) == expected
+
+
+def test_reads_every_output_once():
+    driver = _driver(batch_port_details=True)
+
+    driver.get_snapshot()
+
+    sent = [c for c in driver.device.sent if not cli_context.is_navigation(c)]
+    assert len(sent) == len(set(sent))
+    # home, network element, and back home for the port details and flows
+    assert driver.round_trips == 5
+    assert driver._snapshot is None
+
+
+def test_port_details_one_by_one_without_batch_port_details():
+    driver = _driver()
+
+    driver.get_snapshot()
+
+    # The 16 port details are sent one at a time, the flows in one write
+    assert driver.round_trips == 4 + 16 + 1
+    assert driver.device.writes == [5, 1] + [1] * 16 + [len(driver.device.session.device.flows)]
+
+
+def test_batch_size():
+    driver = _driver(batch_port_details=True)
+    device = SyntheticDevice(ports=100)
+    driver.device = CountingConnection(device)
+
+    driver.get_snapshot()
+
+    # The port details and flows, in writes of at most 64 commands
+    assert driver.device.writes[2:] == [64, 64, 64, len(device.ports) + len(device.flows) - 192]
+
+
+def test_getter_without_declaration():
+    driver = _driver()
+
+    result = driver.get_snapshot(["get_facts", "get_mac_address_table_changes"])
+
+    assert sorted(result) == ["get_facts", "get_mac_address_table_changes"]
+    assert len(result["get_mac_address_table_changes"]["added"]) == 20
@@ -0,0 +1,47 @@
+"""Tests for the compiled TextFSM template cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import os
+
+from napalm.base.helpers import textfsm_extractor as napalm_textfsm_extractor
+import pytest
+
+from napalm_adva import AdvaDriver
+from napalm_adva.utils import textfsm_cache
+
+MOCKED_DATA = os.path.join(os.path.dirname(__file__), "mocked_data")
+TEMPLATES = textfsm_cache.warm_templates()
+
+
+def test_warm_templates():
+    assert "show_port_details" in TEMPLATES
+    assert len(textfsm_cache._templates) >= len(TEMPLATES)
+
+
+@pytest.mark.parametrize("template_name", TEMPLATES)
+def test_same_result_as_napalm(template_name):
+    driver = AdvaDriver("test", "admin", "pwd")
+    for filename in glob.glob(os.path.join(MOCKED_DATA, "*", "*", "*.txt")):
+        with open(filename) as f:
+            raw_text = f.read()
+        assert textfsm_cache.textfsm_extractor(
+            driver, template_name, raw_text
+        ) == napalm_textfsm_extractor(driver, template_name, raw_text)
+
+
+def test_parse_from_threads():
+    driver = AdvaDriver("test", "admin", "pwd")
+    with open(os.path.join(MOCKED_DATA, "test_get_interfaces/default/show_ports.txt")) as f:
+        raw_text = f.read()
+    expected = textfsm_cache.textfsm_extractor(driver, "show_ports", raw_text)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(
+                lambda _: textfsm_cache.textfsm_extractor(driver, "show_ports", raw_text),
+                range(200),
+            )
+        )
+
+    assert all(result == expected for result in results)
@@ -0,0 +1,284 @@
+"""Tests for TFTP transfers."""
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import subprocess
+import sys
+from threading import Thread
+
+from napalm.base.exceptions import (
+    CommandErrorException,
+    CommandTimeoutException,
+    MergeConfigException,
+)
+import pytest
+import tftpy
+
+from napalm_adva.utils import tftp
+from napalm_adva.utils.tftp import SOCKET_TIMEOUT, TftpService, TftpTransfer
+
+from conftest import FakeAdvaDevice, PatchedAdvaDriver
+
+
+def _serve(tmp_path, dyn_file_func):
+    server = tftpy.TftpServer(tftproot=str(tmp_path), dyn_file_func=dyn_file_func)
+    thread = Thread(
+        target=server.listen,
+        kwargs={"listenip": "127.0.0.1", "listenport": 0, "timeout": SOCKET_TIMEOUT},
+    )
+    thread.daemon = True
+    thread.start()
+    server.is_running.wait(5)
+    return server, thread
+
+
+def test_transfer_signals_completion(tmp_path):
+    content = "configure system\n" * 200  # several blocks
+    transfer = TftpTransfer(content)
+    server, thread = _serve(tmp_path, lambda fn, raddress=None, rport=None: transfer.open())
+
+    output = io.BytesIO()
+    tftpy.TftpClient("127.0.0.1", server.listenport).download("candidate", output)
+
+    assert transfer.wait(5)
+    assert transfer.success
+    assert output.getvalue() == content.encode()
+    assert transfer.metrics()["bytes"] == len(content)
+    assert transfer.duration >= 0
+
+    server.stop(now=True)
+    thread.join()
+
+
+def test_transfer_timeout():
+    transfer = TftpTransfer("configure system\n")
+
+    assert not transfer.wait(0.01)
+    assert transfer.metrics() == {"bytes": 0, "duration": None, "success": False}
+
+
+def test_transfer_incomplete():
+    transfer = TftpTransfer("configure system\n" * 100)
+
+    f = transfer.open()
+    f.read(512)
+    f.close()
+
+    assert transfer.wait(0)
+    assert not transfer.success
+    assert transfer.bytes == 512
+
+
+def _download(service, filename):
+    output = io.BytesIO()
+    tftpy.TftpClient("127.0.0.1", service.listenport).download(filename, output)
+    return output.getvalue()
+
+
+def test_service_concurrent_transfers():
+    service = TftpService(listenip="127.0.0.1", listenport=0)
+
+    def push(index):
+        content = f"# candidate {index}\n" * 100
+        with service.serve(content) as (filename, transfer):
+            assert filename.endswith("-candidate")
+            assert _download(service, filename) == content.encode()
+            assert transfer.wait(5) and transfer.success
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(push, range(16)))
+        assert service._transfers == {}
+    finally:
+        service.stop()
+
+
+def test_service_bounded_transfers():
+    service = TftpService(listenip="127.0.0.1", listenport=0, max_transfers=1)
+    try:
+        with service.serve("a\n"):
+            with pytest.raises(RuntimeError):
+                with service.serve("b\n", timeout=0.01):
+                    pass
+    finally:
+        service.stop()
+
+
+def test_service_unknown_file():
+    service = TftpService(listenip="127.0.0.1", listenport=0)
+    try:
+        with service.serve("a\n") as (filename, transfer):
+            pass
+        with pytest.raises(tftpy.TftpException):
+            _download(service, filename)
+    finally:
+        service.stop()
+
+
+def _listing(*files):
+    """Output of list in admin config, a table like every list of the CLI"""
+    rows = "".join(f"|{name:<40}|1024      |\n" for name in files)
+    return (
+        "ADVA-ADMIN-CONFIG--> list\n"
+        f"|{'File Name':<40}|Size      |\n"
+        f"|{'-' * 40}|----------|\n" + rows
+    )
+
+
+class TransferAdvaDevice(FakeAdvaDevice):
+    """Downloads from the TFTP server when asked to transfer a file, and keeps the
+    files on its flash
+    """
+
+    def __init__(self, service, files=()):
+        super().__init__()
+        self.service = service
+        self.downloaded = None
+        self.files = list(files)
+
+    def send_command(self, command, **kwargs):
+        self.sent.append(command)
+        words = command.split()
+        if command.startswith("transfer-file tftp get"):
+            self.downloaded = _download(self.service or tftp._service, words[5])
+            self.files.append(words[5])
+        elif command == "list":
+            return _listing(*self.files)
+        elif words[0] == "delete":
+            self.files.remove(words[1])
+        elif words[0] == "rename":
+            if words[2] in self.files:
+                return "Error: file exists"
+            self.files[self.files.index(words[1])] = words[2]
+        return ""
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = TftpService(listenip="127.0.0.1", listenport=0)
+    monkeypatch.setattr(tftp, "_service", service)
+    yield service
+    service.stop()
+
+
+def _shared_driver(monkeypatch, device, **optional_args):
+    driver = PatchedAdvaDriver(
+        "test", "admin", "pwd", optional_args=dict(shared_tftp=True, **optional_args)
+    )
+    driver.device = device
+    monkeypatch.setattr(driver, "_get_ipaddress", lambda: "127.0.0.1")
+    return driver
+
+
+def test_driver_shared_tftp(monkeypatch, service):
+    driver = _shared_driver(monkeypatch, TransferAdvaDevice(service))
+
+    driver._transfer_file("configure system\n")
+
+    assert driver.device.downloaded.endswith(b"configure system\n")
+    assert driver.transfer_metrics["success"]
+    assert driver.transfer_metrics["bytes"] == len(driver.device.downloaded)
+    # The one-time filename is renamed to the candidate on the device
+    filename = next(c for c in driver.device.sent if c.startswith("transfer-file")).split()[5]
+    assert filename.endswith("-candidate")
+    assert driver.device.sent[-1] == f"rename {filename} candidate"
+    assert driver.device.files == ["candidate"]
+
+
+def test_driver_shared_tftp_listen_options(monkeypatch):
+    monkeypatch.setattr(tftp, "_service", None)
+    driver = _shared_driver(
+        monkeypatch, TransferAdvaDevice(None), tftp_listen_address="127.0.0.1", tftp_listen_port=0
+    )
+
+    try:
+        driver._transfer_file("configure system\n")
+        assert tftp._service.listenip == "127.0.0.1"
+        assert tftp._service.listenport != 69
+    finally:
+        tftp._service.stop()
+
+    assert driver.transfer_metrics["success"]
+
+
+def test_driver_shared_tftp_replaces_the_previous_candidate(monkeypatch, service):
+    driver = _shared_driver(monkeypatch, TransferAdvaDevice(service, ["running", "candidate"]))
+
+    driver._transfer_file("configure system\n")
+    driver._transfer_file("configure snmp\n")
+
+    assert driver.device.sent.count("delete candidate") == 2
+    assert driver.device.files == ["running", "candidate"]
+    assert driver.device.downloaded.endswith(b"configure snmp\n")
+
+
+def test_rename_error_deletes_the_downloaded_file(make_driver):
+    driver = make_driver(
+        outputs={
+            "list": _listing("abc-candidate"),
+            "rename abc-candidate candidate": "Error: file not found",
+        }
+    )
+
+    with pytest.raises(CommandErrorException, match="abc-candidate"):
+        driver._rename_file("abc-candidate", "candidate")
+    assert driver.device.sent[-1] == "delete abc-candidate"
+
+
+class StalledAdvaDevice(TransferAdvaDevice):
+    """Creates the file, but never finishes the download"""
+
+    def send_command(self, command, **kwargs):
+        if command.startswith("transfer-file tftp get"):
+            self.sent.append(command)
+            self.files.append(command.split()[5])
+            return ""
+        return super().send_command(command, **kwargs)
+
+
+def test_failed_transfer_deletes_the_downloaded_file(monkeypatch, service):
+    driver = _shared_driver(monkeypatch, StalledAdvaDevice(service))
+    driver.transfer_timeout = 0.01
+
+    with pytest.raises(CommandTimeoutException):
+        driver._transfer_file("configure system\n")
+    assert driver.device.files == []
+
+
+@pytest.mark.parametrize(
+    "listing",
+    ["", _listing("abc-candidate", "running"), _listing("candidate.old"), "candidate-1"],
+)
+def test_validate_needs_the_exact_candidate(listing, make_driver):
+    driver = make_driver(outputs={"list": listing})
+
+    with pytest.raises(MergeConfigException, match="not transferred"):
+        driver._validate_candidate("configure system\n")
+
+
+def test_validate_candidate_in_the_file_table(make_driver):
+    driver = make_driver(
+        outputs={
+            "list": _listing("running", "candidate"),
+            "show configfile candidate": "# DO NOT EDIT THIS LINE. FILE_TYPE=CONFIGURATION_FILE\n"
+            "configure system\n",
+        }
+    )
+
+    driver._validate_candidate("configure system\n")
+
+
+def test_getters_do_not_import_tftpy():
+    script = (
+        "import sys\n"
+        "from napalm_adva import AdvaDriver\n"
+        "AdvaDriver('test', 'admin', 'pwd')\n"
+        "print('tftpy' in sys.modules)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "False"
@@ -0,0 +1,148 @@
+"""Tests for choosing and using candidate transports."""
+
+from napalm.base.exceptions import MergeConfigException, ReplaceConfigException
+import pytest
+
+from napalm_adva.utils import transport
+
+from conftest import PatchedAdvaDriver
+
+CANDIDATE = 'configure system\n  prompt "CPE"\n'
+
+
+def test_select():
+    large = CANDIDATE * 1000
+
+    assert transport.select("tftp", CANDIDATE).name == "tftp"
+    assert transport.select("cli", large).name == "cli"
+    assert transport.select("auto", CANDIDATE).name == "cli"
+    assert transport.select("auto", large).name == "tftp"
+    assert transport.select("auto", CANDIDATE, inband_max_bytes=10).name == "tftp"
+    # Only a config file can replace the config
+    assert transport.select("auto", CANDIDATE, replace=True).name == "tftp"
+    with pytest.raises(ReplaceConfigException):
+        transport.select("cli", CANDIDATE, replace=True)
+
+
+def test_invalid_transport():
+    with pytest.raises(ValueError):
+        PatchedAdvaDriver("test", "admin", "pwd", optional_args={"candidate_transport": "scp"})
+
+
+def test_cli_merge(make_driver):
+    driver = make_driver(candidate_transport="auto")
+    sent = driver.device.sent
+
+    driver.load_merge_candidate(config="# comment\n" + CANDIDATE)
+    # Nothing is sent until the commit
+    assert sent == []
+
+    driver.commit_config()
+
+    assert sent == ["configure system", 'prompt "CPE"']
+    assert driver.transfer_metrics["transport"] == "cli"
+    assert driver.transfer_metrics["bytes"] == len("# comment\n" + CANDIDATE)
+    assert driver.transfer_metrics["success"]
+
+
+def test_cli_merge_error(make_driver):
+    driver = make_driver(
+        outputs={'prompt "CPE"': "Error: Invalid command"}, candidate_transport="cli"
+    )
+    driver.load_merge_candidate(config=CANDIDATE)
+
+    with pytest.raises(MergeConfigException, match="prompt"):
+        driver.commit_config()
+
+
+def test_cli_merge_follows_the_indentation(make_driver):
+    driver = make_driver(candidate_transport="cli")
+    candidate = (
+        "configure system\n"
+        '  prompt "CPE"\n'
+        "configure snmp\n"
+        '  community "public"\n'
+        "network-element ne-1\n"
+        "  configure nte nte\n"
+        "    configure access-port access-1-1-1-3\n"
+        '      alias "CUSTOMER"\n'
+        "    configure access-port access-1-1-1-4\n"
+        '      alias "SPARE"\n'
+        "home\n"
+        'syslog-server "192.0.2.1"\n'
+    )
+    driver.load_merge_candidate(config=candidate)
+
+    driver.commit_config()
+
+    assert driver.device.sent == [
+        "configure system",
+        'prompt "CPE"',
+        "home",
+        "configure snmp",
+        'community "public"',
+        "home",
+        "network-element ne-1",
+        "configure nte nte",
+        "configure access-port access-1-1-1-3",
+        'alias "CUSTOMER"',
+        "back",
+        "configure access-port access-1-1-1-4",
+        'alias "SPARE"',
+        "home",
+        'syslog-server "192.0.2.1"',
+    ]
+
+
+def test_commands_contexts():
+    candidate = "configure system\n  prompt \"CPE\"\n  back\nconfigure snmp\n"
+
+    assert list(transport.commands(candidate)) == [('prompt "CPE"', ("configure system",))]
+    assert list(transport.commands("back\nhome\nshow system\n")) == [("show system", ())]
+
+
+def test_tftp_merge(monkeypatch, make_driver):
+    driver = make_driver(outputs={"list": "candidate"})
+    sent = driver.device.sent
+    transfers = []
+    monkeypatch.setattr(
+        driver, "_transfer_file", lambda content, destfile: transfers.append(content)
+    )
+    monkeypatch.setattr(driver, "_validate_candidate", lambda candidate: None)
+
+    driver.load_merge_candidate(config=CANDIDATE)
+    driver.commit_config()
+
+    assert transfers == [CANDIDATE]
+    assert "load candidate" in sent
+
+
+def test_ipaddress_option():
+    driver = PatchedAdvaDriver("test", "admin", "pwd", optional_args={"tftp_address": "192.0.2.1"})
+
+    assert driver._get_ipaddress() == "192.0.2.1"
+
+
+def test_ipaddress_of_ssh_session():
+    driver = PatchedAdvaDriver("test", "admin", "pwd")
+
+    class Socket(object):
+        def getsockname(self):
+            return ("198.51.100.7", 40000)
+
+    class Transport(object):
+        sock = Socket()
+
+    class RemoteConn(object):
+        def get_transport(self):
+            return Transport()
+
+    driver.device.remote_conn = RemoteConn()
+
+    assert driver._get_ipaddress() == "198.51.100.7"
+
+
+def test_ipaddress_route_to_device():
+    driver = PatchedAdvaDriver("127.0.0.1", "admin", "pwd")
+
+    assert driver._get_ipaddress() == "127.0.0.1"